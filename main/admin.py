@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import Application, Question, TestSession, ApplicantAnswer
-from .models import ApplicationSetting, AuditLog, AuditTemplate
+from .models import ApplicationSetting, AuditLog, AuditTemplate, DiscordOutbox, ApplicationJob
 
 
 @admin.register(Application)
@@ -12,7 +12,8 @@ class ApplicationAdmin(admin.ModelAdmin):
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-	list_display = ('id', 'text', 'correct_index')
+	list_display = ('id', 'text', 'correct_index', 'category', 'difficulty')
+	list_filter = ('category', 'difficulty')
 	search_fields = ('text',)
 
 
@@ -43,3 +44,16 @@ class AuditLogAdmin(admin.ModelAdmin):
 class AuditTemplateAdmin(admin.ModelAdmin):
 	list_display = ('key', 'updated_at')
 	search_fields = ('key',)
+
+
+@admin.register(DiscordOutbox)
+class DiscordOutboxAdmin(admin.ModelAdmin):
+	list_display = ('id', 'channel_id', 'status', 'attempts', 'created_at', 'sent_at')
+	list_filter = ('status',)
+
+
+@admin.register(ApplicationJob)
+class ApplicationJobAdmin(admin.ModelAdmin):
+	list_display = ('id', 'application', 'step', 'status', 'attempts', 'updated_at')
+	list_filter = ('status', 'step')
+	exclude = ('payload',)
@@ -0,0 +1,84 @@
+"""Cached access to the ApplicationSetting singleton (id=1).
+
+apply.html and apply_test.html poll apply_status_api every few seconds, so the
+row is read far more often than it changes. It is kept in the cache and, for
+LOCAL_TTL seconds, in process memory. Every save/delete writes the new row
+through to the cache (see signals.py). With a shared cache (REDIS_URL) other
+processes pick up a change within LOCAL_TTL seconds; the per-process LocMem
+cache can't see writes made elsewhere (an admin on another web worker, a
+reopen applied by discord_worker), so there the entry only lives for
+UNSHARED_CACHE_TTL seconds.
+"""
+import copy
+import threading
+import time
+
+from django.core.cache import cache
+
+from .checks import cache_is_shared
+from .models import ApplicationSetting
+
+CACHE_KEY = 'apply_setting'
+CACHE_TTL = 60 * 60
+UNSHARED_CACHE_TTL = 10
+LOCAL_TTL = 2.0
+
+_local = {'setting': None, 'expires': 0.0}
+_lock = threading.Lock()
+
+
+def _cache_ttl():
+    return CACHE_TTL if cache_is_shared() else UNSHARED_CACHE_TTL
+
+
+def _remember(setting):
+    with _lock:
+        _local['setting'] = setting
+        _local['expires'] = time.monotonic() + LOCAL_TTL
+
+
+def get_setting():
+    """The ApplicationSetting row, created on first use.
+
+    Returns a copy, so callers may modify and save() it.
+    """
+    with _lock:
+        if _local['setting'] is not None and _local['expires'] > time.monotonic():
+            return copy.copy(_local['setting'])
+    setting = cache.get(CACHE_KEY)
+    if setting is None:
+        setting, _ = ApplicationSetting.objects.get_or_create(id=1)
+        cache.set(CACHE_KEY, setting, _cache_ttl())
+    _remember(setting)
+    return copy.copy(setting)
+
+
+def store(setting):
+    """Write-through after a save (called from the post_save signal)."""
+    if setting.pk != 1:
+        return
+    setting = copy.copy(setting)
+    cache.set(CACHE_KEY, setting, _cache_ttl())
+    _remember(setting)
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+    with _lock:
+        _local['setting'] = None
+        _local['expires'] = 0.0
+
+
+def etag(request=None):
+    # is_open() flips when a closed setting's reopen_at passes, before the
+    # worker saves the row, so it is part of the validator
+    setting = get_setting()
+    state = 'o' if setting.is_open() else 'c'
+    return f'"s{int(setting.updated_at.timestamp() * 1_000_000)}{state}"'
+
+
+def last_modified(request=None):
+    setting = get_setting()
+    if setting.status == 'closed' and setting.is_open():
+        return max(setting.updated_at, setting.reopen_at)
+    return setting.updated_at
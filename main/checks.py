@@ -0,0 +1,58 @@
+"""System checks for deployment settings the app relies on."""
+import os
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.db import connections
+
+from . import search
+
+
+def cache_is_shared():
+    """False for the per-process LocMem (and dummy) caches."""
+    backend = settings.CACHES['default']['BACKEND']
+    return not backend.endswith(('LocMemCache', 'DummyCache'))
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Several web workers need a cache they all see.
+
+    Discord OAuth outcomes (discord_oauth.py) are written by the worker that
+    ran the exchange and read by whichever worker answers the handshake poll;
+    the unread versions, question bank version and application setting are
+    shared the same way. With the per-process LocMem cache a poll landing on
+    another worker finds nothing and the login times out.
+    """
+    try:
+        workers = int(os.getenv('WEB_CONCURRENCY') or 1)
+    except ValueError:
+        workers = 1
+    if workers > 1 and not cache_is_shared():
+        return [Error(
+            f'WEB_CONCURRENCY={workers} with the per-process LocMem cache.',
+            hint='Set REDIS_URL so all workers share one cache, or run a single worker.',
+            id='main.E001',
+        )]
+    return []
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs, databases=None, **kwargs):
+    """SQLite drops the FTS sync triggers when a migration rebuilds
+    main_application; search then silently misses new and edited rows.
+
+    A warning rather than an error, so the migration that reinstalls them
+    can still run.
+    """
+    warnings = []
+    for alias in databases or []:
+        missing = search.missing_triggers(connections[alias])
+        if missing:
+            warnings.append(Warning(
+                f'Applicant search triggers missing on {alias!r}: {", ".join(missing)}.',
+                hint='Add a migration step after the one that rebuilt main_application that calls '
+                     'main.search.install_index(schema_editor).',
+                id='main.W002',
+            ))
+    return warnings
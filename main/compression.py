@@ -0,0 +1,119 @@
+"""Compression of dynamic HTML and JSON responses.
+
+WhiteNoise only compresses collected static files; rendered pages and API
+bodies went out as-is. CompressionMiddleware sits after WhiteNoise (static
+responses never reach it) and compresses text responses of at least
+settings.COMPRESS_MIN_BYTES: brotli when the client accepts it and the
+optional `brotli` package is installed, gzip otherwise.
+
+BREACH: a page can leak a secret when it is compressed together with input
+the attacker controls. Django masks the CSRF token differently in every
+response, and gzip output here gets random filename padding (Django's "Heal
+The Breach" mitigation). Brotli has no such padding, so responses that
+rendered a CSRF token are only ever gzipped, and a CSRF-bearing response to a
+request carrying input (query string or POST body) is not compressed at all.
+
+minify_template() is used by the optional minifying template loaders (see
+template_loaders.py); it strips indentation and blank lines from template
+source, leaving <pre>, <textarea>, <script> and <style> bodies untouched.
+"""
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json',
+}
+GZIP_RANDOM_BYTES = 100
+BROTLI_QUALITY = 5  # dynamic content: favour speed over the last few percent
+
+_accepts_br = re.compile(r'\bbr\b')
+_accepts_gzip = re.compile(r'\bgzip\b')
+
+
+def _reflects_input(request):
+    return bool(request.META.get('QUERY_STRING')) or request.method == 'POST'
+
+
+def choose_encoding(request, response):
+    """'br', 'gzip' or None for this request/response pair."""
+    accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    carries_csrf = bool(request.META.get('CSRF_COOKIE_USED'))
+    if carries_csrf and _reflects_input(request):
+        return None
+    if brotli is not None and not carries_csrf and not response.streaming and _accepts_br.search(accept):
+        return 'br'
+    if _accepts_gzip.search(accept):
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+        if response.streaming:
+            if response.is_async:
+                return response
+        elif len(response.content) < getattr(settings, 'COMPRESS_MIN_BYTES', 1024):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, response)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, max_random_bytes=GZIP_RANDOM_BYTES)
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=GZIP_RANDOM_BYTES)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+_PROTECTED = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I)
+_INDENT = re.compile(r'[ \t]*\n\s*')
+
+
+def minify_template(source):
+    """Drop indentation, trailing spaces and blank lines outside protected tags.
+
+    Every newline run is kept as a single newline, so whitespace between
+    inline elements (and JavaScript line breaks) still separates them.
+    """
+    parts = _PROTECTED.split(source)
+    out = []
+    # split() yields text, whole protected element, tag name, text, ...
+    for i in range(0, len(parts), 3):
+        out.append(_INDENT.sub('\n', parts[i]))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out)
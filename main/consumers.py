@@ -0,0 +1,86 @@
+from asgiref.sync import async_to_sync
+from channels.generic.websocket import JsonWebsocketConsumer
+from channels.layers import get_channel_layer
+from django.db import models
+import logging
+
+from .models import User, Assignment
+
+logger = logging.getLogger(__name__)
+
+
+def chat_group_name(a_id, b_id):
+    """Group shared by both participants of a conversation (order independent)."""
+    lo, hi = sorted((int(a_id), int(b_id)))
+    return f'chat_{lo}_{hi}'
+
+
+def serialize_message(msg):
+    """Same shape as chat_messages_api so the page can reuse one render path."""
+    return {
+        'id': msg.id,
+        'content': msg.content,
+        'sender_id': msg.sender_id,
+        'timestamp': msg.created_at.isoformat(),
+    }
+
+
+def push_chat_message(msg):
+    """Push a freshly created Message to every open socket of both participants.
+
+    Failures are logged and swallowed: the polling fallback in chat.html will
+    still pick the message up.
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    try:
+        async_to_sync(layer.group_send)(
+            chat_group_name(msg.sender_id, msg.receiver_id),
+            {'type': 'chat.message', 'message': serialize_message(msg)},
+        )
+    except Exception:
+        logger.exception('push_chat_message: failed to push message %s', msg.id)
+
+
+class ChatConsumer(JsonWebsocketConsumer):
+    """WebSocket for a single conversation: ws/chat/<other_id>/.
+
+    Uses the same session key ('uid') and assignment check as chat_view.
+    The socket is push-only; sending still goes through the chat_view POST.
+    """
+
+    def connect(self):
+        self.group_name = None
+        session = self.scope.get('session')
+        uid = session.get('uid') if session is not None else None
+        other_id = self.scope['url_route']['kwargs']['other_id']
+        user = User.objects.filter(id=uid).first() if uid else None
+        other = User.objects.filter(id=other_id).first()
+        if not user or not other:
+            self.close()
+            return
+
+        if not user.has_dashboard_access():
+            is_assigned = Assignment.objects.filter(
+                models.Q(trainer=user, cadet=other) | models.Q(trainer=other, cadet=user)
+            ).exists()
+            if not is_assigned:
+                self.close()
+                return
+
+        self.group_name = chat_group_name(user.id, other.id)
+        async_to_sync(self.channel_layer.group_add)(self.group_name, self.channel_name)
+        self.accept()
+
+    def disconnect(self, code):
+        if self.group_name:
+            async_to_sync(self.channel_layer.group_discard)(self.group_name, self.channel_name)
+
+    def receive_json(self, content, **kwargs):
+        # keep-alive pings from the browser
+        if content.get('type') == 'ping':
+            self.send_json({'type': 'pong'})
+
+    def chat_message(self, event):
+        self.send_json({'type': 'message', 'message': event['message']})
@@ -0,0 +1,125 @@
+"""Maintenance of the Conversation summary table.
+
+A new Message updates its pair's row with one F() UPDATE (creating the row on
+the first message). Bulk read-marking resets the reader's unread counter, and
+anything else (edits, deletes) recounts just that pair, once per pair when
+the transaction commits: deleting a user cascades into every message they
+sent or received, which would otherwise recount the pair per message.
+"""
+import functools
+import weakref
+
+from asgiref.local import Local
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q
+
+from .models import Conversation, Message
+
+
+def _pair(a_id, b_id):
+    return (a_id, b_id) if a_id < b_id else (b_id, a_id)
+
+
+def _unread_field(receiver_id, low_id):
+    return 'unread_low' if receiver_id == low_id else 'unread_high'
+
+
+def record_message(msg):
+    """Account for a newly created message."""
+    low, high = _pair(msg.sender_id, msg.receiver_id)
+    changes = {
+        'message_count': F('message_count') + 1,
+        'last_message': msg,
+        'last_message_at': msg.created_at,
+    }
+    if not msg.is_read:
+        field = _unread_field(msg.receiver_id, low)
+        changes[field] = F(field) + 1
+    if Conversation.objects.filter(user_low_id=low, user_high_id=high).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            Conversation.objects.create(user_low_id=low, user_high_id=high)
+    except IntegrityError:
+        pass  # created concurrently; the update below still applies
+    Conversation.objects.filter(user_low_id=low, user_high_id=high).update(**changes)
+
+
+def mark_read(reader_id, other_id):
+    """Reader has read everything other sent them."""
+    low, high = _pair(reader_id, other_id)
+    Conversation.objects.filter(user_low_id=low, user_high_id=high).update(**{_unread_field(reader_id, low): 0})
+
+
+def rebuild_pair(a_id, b_id):
+    """Recount one conversation from its messages."""
+    low, high = _pair(a_id, b_id)
+    msgs = Message.objects.filter(Q(sender_id=low, receiver_id=high) | Q(sender_id=high, receiver_id=low))
+    stats = msgs.aggregate(
+        total=Count('id'),
+        last_id=Max('id'),
+        unread_low=Count('id', filter=Q(receiver_id=low, is_read=False)),
+        unread_high=Count('id', filter=Q(receiver_id=high, is_read=False)),
+    )
+    if not stats['total']:
+        Conversation.objects.filter(user_low_id=low, user_high_id=high).delete()
+        return
+    last = Message.objects.only('id', 'created_at').get(id=stats['last_id'])
+    Conversation.objects.update_or_create(user_low_id=low, user_high_id=high, defaults={
+        'message_count': stats['total'],
+        'last_message': last,
+        'last_message_at': last.created_at,
+        'unread_low': stats['unread_low'],
+        'unread_high': stats['unread_high'],
+    })
+
+
+def _rebuild_pairs(pairs):
+    try:
+        for low, high in pairs:
+            rebuild_pair(low, high)
+    finally:
+        pairs.clear()
+
+
+# weak reference to the on_commit callback of the current transaction; Django
+# drops the callback on rollback, which drops its set of pairs with it
+_pending = Local()
+
+
+def schedule_rebuild(a_id, b_id):
+    """rebuild_pair() when the current transaction commits, once per pair.
+
+    Outside a transaction the pair is recounted right away.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        rebuild_pair(a_id, b_id)
+        return
+    ref = getattr(_pending, 'callback', None)
+    callback = ref() if ref else None
+    # an emptied set means the callback already ran
+    if callback is None or not callback.args[0]:
+        callback = functools.partial(_rebuild_pairs, set())
+        _pending.callback = weakref.ref(callback)
+        transaction.on_commit(callback)
+    callback.args[0].add(_pair(a_id, b_id))
+
+
+def rebuild_all():
+    """Recount every conversation (repair after bulk edits that skip signals)."""
+    pairs = set()
+    for sender_id, receiver_id in Message.objects.values_list('sender_id', 'receiver_id').distinct():
+        pairs.add(_pair(sender_id, receiver_id))
+    stale = [c.id for c in Conversation.objects.only('id', 'user_low_id', 'user_high_id')
+             if (c.user_low_id, c.user_high_id) not in pairs]
+    Conversation.objects.filter(id__in=stale).delete()
+    for low, high in pairs:
+        rebuild_pair(low, high)
+    return len(pairs)
+
+
+def for_user(user_id):
+    """Conversations of a user, most recent first."""
+    return (Conversation.objects.filter(Q(user_low_id=user_id) | Q(user_high_id=user_id))
+            .select_related('user_low', 'user_high', 'last_message')
+            .order_by(F('last_message_at').desc(nulls_last=True)))
@@ -0,0 +1,59 @@
+"""Cached data behind the dashboard JSON endpoints.
+
+partners() is the assigned trainer/cadet list with unread message counts
+(one query). It is cached under the user's unread version (see unread.py),
+which is bumped by new/read messages, by assignment changes and when a
+partner's username or full name is saved, so neither the cached list nor
+the endpoint's ETag (built from the same version) goes stale.
+
+evaluation_stats() is a cadet's evaluation count and average, dropped from
+the cache whenever one of their evaluations is saved or deleted.
+"""
+from django.core.cache import cache
+from django.db.models import Avg, Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Evaluation, Message, User
+from . import unread
+
+PARTNERS_KEY = 'partners:{}:{}'
+PARTNERS_TTL = 60
+EVALUATIONS_KEY = 'evaluation_stats:{}'
+EVALUATIONS_TTL = 60 * 60
+
+
+def partners(user, version=None):
+    """[{id, username, full_name, unread_count}] for the user's assignments."""
+    version = version if version is not None else unread.get_version(user.id)
+    key = PARTNERS_KEY.format(user.id, version)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    if user.rank == 'cadet':
+        qs = User.objects.filter(trainer_assignments__cadet=user)
+    else:
+        qs = User.objects.filter(cadet_assignments__trainer=user)
+    unread_from = (Message.objects.filter(receiver=user, sender=OuterRef('pk'), is_read=False)
+                   .values('sender').annotate(n=Count('id')).values('n'))
+    data = list(qs.annotate(
+        unread_count=Coalesce(Subquery(unread_from, output_field=IntegerField()), Value(0)),
+    ).order_by('full_name', 'id').values('id', 'username', 'full_name', 'unread_count'))
+    cache.set(key, data, PARTNERS_TTL)
+    return data
+
+
+def evaluation_stats(cadet_id):
+    """{'count': n, 'average': mean score or None} for a cadet."""
+    key = EVALUATIONS_KEY.format(cadet_id)
+    stats = cache.get(key)
+    if stats is None:
+        row = Evaluation.objects.filter(cadet_id=cadet_id).aggregate(count=Count('id'), average=Avg('score'))
+        average = row['average']
+        stats = {'count': row['count'], 'average': round(average, 1) if average is not None else None}
+        cache.set(key, stats, EVALUATIONS_TTL)
+    return stats
+
+
+def invalidate_evaluations(cadet_id):
+    cache.delete(EVALUATIONS_KEY.format(cadet_id))
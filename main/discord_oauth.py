@@ -0,0 +1,104 @@
+"""Discord OAuth code exchange off the request path.
+
+The callback used to exchange the code and fetch /users/@me inside the
+request, sleeping between 429 retries, so a burst of logins during a rate
+limit tied up every web worker. Now the callback only starts the exchange on
+a small background pool and renders a handshake page that polls status():
+
+- the exchange goes through the shared pooled DiscordClient (auth=False),
+  which honours Retry-After and the per-bucket limits;
+- the outcome is cached per code (hashed), so a double-submitted callback
+  reuses it instead of exchanging again.
+
+The handshake poll may land on another web worker than the exchange, so with
+more than one worker the cache must be shared (REDIS_URL); the main.E001
+system check refuses LocMem with WEB_CONCURRENCY > 1.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+
+from . import discord_utils
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'discord_oauth:{}'
+RESULT_TTL = 300  # Discord codes expire after 10 minutes anyway
+EXCHANGE_WORKERS = 4
+
+PENDING = 'pending'
+OK = 'ok'
+ERROR = 'error'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=EXCHANGE_WORKERS, thread_name_prefix='discord-oauth')
+    return _executor
+
+
+def code_token(code):
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+def exchange(code, redirect_uri):
+    """Blocking code exchange + identify. Returns the outcome dict."""
+    client_id = os.getenv('DISCORD_CLIENT_ID', '').strip()
+    client_secret = os.getenv('DISCORD_CLIENT_SECRET', '').strip()
+    if not client_id or not client_secret:
+        return {'state': ERROR, 'message': 'Discord OAuth غير مهيأ بشكل صحيح.'}
+
+    client = discord_utils.get_client()
+    token_res = client.request('POST', '/oauth2/token', auth=False, data={
+        'client_id': client_id,
+        'client_secret': client_secret,
+        'grant_type': 'authorization_code',
+        'code': code,
+        'redirect_uri': redirect_uri,
+    }, headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    if token_res is None or token_res.status_code >= 400:
+        return {'state': ERROR, 'message': 'فشل التحقق مع Discord.'}
+    access_token = token_res.json().get('access_token')
+    if not access_token:
+        return {'state': ERROR, 'message': 'لم يتم استلام access token.'}
+
+    user_res = client.request('GET', '/users/@me', route='/users/@me (oauth)', auth=False,
+                              headers={'Authorization': f'Bearer {access_token}'})
+    if user_res is None or user_res.status_code >= 400:
+        return {'state': ERROR, 'message': 'فشل جلب بيانات المستخدم من Discord.'}
+    user = user_res.json()
+    if not user.get('id'):
+        return {'state': ERROR, 'message': 'لم يتم استلام Discord ID.'}
+    return {'state': OK, 'discord_id': str(user['id']), 'username': user.get('username', '')}
+
+
+def _run(token, code, redirect_uri):
+    try:
+        outcome = exchange(code, redirect_uri)
+    except Exception:
+        logger.exception('discord oauth: exchange failed')
+        outcome = {'state': ERROR, 'message': 'حدث خطأ غير متوقع أثناء تسجيل الدخول.'}
+    cache.set(CACHE_KEY.format(token), outcome, RESULT_TTL)
+
+
+def start(code, redirect_uri):
+    """Start exchanging `code` unless it already is (or was). Returns its token."""
+    token = code_token(code)
+    if cache.add(CACHE_KEY.format(token), {'state': PENDING}, RESULT_TTL):
+        _get_executor().submit(_run, token, code, redirect_uri)
+    return token
+
+
+def status(token):
+    """Outcome dict for a token; state is PENDING, OK or ERROR (None if unknown)."""
+    return cache.get(CACHE_KEY.format(token)) if token else None
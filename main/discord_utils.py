@@ -1,14 +1,23 @@
 import os
+import re
+import time
 import logging
+import threading
+from collections import OrderedDict
+
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from . import metrics
+
 # load .env from project root when present (no secrets committed to repo)
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-DISCORD_API_BASE = 'https://discord.com/api/v10'
+# overridable so a local stub can stand in (see the loadtest command)
+DISCORD_API_BASE = os.getenv('DISCORD_API_BASE', 'https://discord.com/api/v10')
 _raw_token = os.getenv('DISCORD_BOT_TOKEN')
 # sanitize token: remove any leading 'Bot ' if present and trim
 BOT_TOKEN = None
@@ -27,6 +36,260 @@ if BOT_TOKEN:
         'Content-Type': 'application/json'
     }
 
+_SNOWFLAKE_RE = re.compile(r'\d+')
+
+
+def normalize_id(value) -> str:
+    """Accept <@123...>, <@!123...>, 123... or a numeric string and return the snowflake."""
+    m = _SNOWFLAKE_RE.search(str(value))
+    return m.group(0) if m else str(value)
+
+
+class _Bucket:
+    """Rate-limit state for one Discord bucket (route + major parameter)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = None  # unknown until the first response
+        self.reset_at = 0.0    # time.monotonic() when the bucket refills
+
+
+class _LRUCache:
+    """Small thread-safe LRU map (user id -> DM channel id)."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiscordClient:
+    """Discord REST client with a pooled session and per-route rate limiting.
+
+    - One requests.Session (keep-alive connection pool) per client.
+    - Rate-limit state is tracked per bucket from the X-RateLimit-* headers;
+      a request to an exhausted bucket waits for the reset instead of failing.
+    - 429 responses are retried after Retry-After (global limits pause every route).
+    - DM channel ids are cached so repeat DMs skip the channel-creation call.
+    """
+
+    def __init__(self, token=None, base_url=DISCORD_API_BASE, timeout=10,
+                 max_retries=3, max_wait=60.0, pool_size=20, dm_cache_size=1024):
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if token:
+            self.session.headers['Authorization'] = f'Bot {token}'
+
+        self.dm_channels = _LRUCache(dm_cache_size)
+        self._buckets = {}
+        self._route_to_bucket = {}
+        self._buckets_lock = threading.Lock()
+        self._global_reset_at = 0.0
+
+    # --- rate limiting ---
+    def _bucket(self, route_key):
+        with self._buckets_lock:
+            key = self._route_to_bucket.get(route_key, route_key)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+            return bucket
+
+    def _acquire(self, bucket):
+        """Block until the bucket (and the global limit) allow one more request.
+
+        Returns False if that would mean waiting longer than max_wait. The lock
+        is only held to read and take a slot, never while sleeping, so one long
+        Retry-After doesn't serialise every thread on the route behind it.
+        """
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with bucket.lock:
+                now = time.monotonic()
+                wait = max(self._global_reset_at - now, 0.0)
+                if bucket.remaining is not None and bucket.remaining <= 0 and bucket.reset_at > now:
+                    wait = max(wait, bucket.reset_at - now)
+                if wait <= 0:
+                    if bucket.remaining is not None:
+                        if bucket.reset_at <= now:
+                            bucket.remaining = None  # refilled; the next response tells us the real value
+                        else:
+                            bucket.remaining -= 1
+                    return True
+            if now + wait > deadline:
+                return False
+            # re-checked afterwards: other threads may have used the refill
+            time.sleep(wait)
+
+    def _update(self, route_key, bucket, major, response):
+        headers = response.headers
+        bucket_hash = headers.get('X-RateLimit-Bucket')
+        if bucket_hash:
+            shared_key = f'{bucket_hash}:{major}'
+            with self._buckets_lock:
+                if self._route_to_bucket.get(route_key) != shared_key:
+                    self._route_to_bucket[route_key] = shared_key
+                    self._buckets.setdefault(shared_key, bucket)
+                    bucket = self._buckets[shared_key]
+        try:
+            remaining = headers.get('X-RateLimit-Remaining')
+            reset_after = headers.get('X-RateLimit-Reset-After')
+            with bucket.lock:
+                if remaining is not None:
+                    bucket.remaining = int(remaining)
+                if reset_after is not None:
+                    bucket.reset_at = time.monotonic() + float(reset_after)
+        except ValueError:
+            pass
+        return bucket
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            value = response.headers.get('Retry-After')
+            if value is None:
+                value = (response.json() or {}).get('retry_after')
+            return float(value) if value is not None else 1.0
+        except (ValueError, AttributeError):
+            return 1.0
+
+    def request(self, method, path, route=None, major='', auth=True, **kwargs):
+        """Send a request, honouring rate limits. Returns the final Response.
+
+        `path` is relative to base_url. `route` is the path template used to
+        key the rate-limit bucket (defaults to `path`) and `major` the
+        top-level id Discord buckets by (channel or guild id). Pass auth=False
+        for calls that must not carry the bot token (e.g. OAuth token exchange).
+        """
+        route_key = f'{method} {route or path}:{major}'
+        metric_route = f'{method} {route or path}'
+        kwargs.setdefault('timeout', self.timeout)
+        if not auth:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.setdefault('Authorization', None)  # drop the session-level bot header
+            kwargs['headers'] = headers
+
+        response = None
+        for attempt in range(self.max_retries + 1):
+            bucket = self._bucket(route_key)
+            if not self._acquire(bucket):
+                logger.warning('discord: %s %s rate limited beyond %ss, not waiting', method, path, self.max_wait)
+                break
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, f'{self.base_url}{path}', **kwargs)
+            except requests.RequestException:
+                metrics.observe_discord(metric_route, None, time.perf_counter() - started)
+                raise
+            metrics.observe_discord(metric_route, response.status_code, time.perf_counter() - started)
+            bucket = self._update(route_key, bucket, major, response)
+            if response.status_code != 429:
+                return response
+
+            retry_after = self._retry_after(response)
+            is_global = response.headers.get('X-RateLimit-Global') or response.headers.get('X-RateLimit-Scope') == 'global'
+            logger.warning('discord: 429 on %s %s (global=%s), retry after %.2fs', method, path, bool(is_global), retry_after)
+            with bucket.lock:
+                until = time.monotonic() + retry_after
+                if is_global:
+                    self._global_reset_at = max(self._global_reset_at, until)
+                else:
+                    bucket.remaining = 0
+                    bucket.reset_at = max(bucket.reset_at, until)
+        return response
+
+    # --- API calls ---
+    def get_dm_channel(self, user_id):
+        recipient = normalize_id(user_id)
+        channel = self.dm_channels.get(recipient)
+        if channel:
+            return channel
+        r = self.request('POST', '/users/@me/channels', json={'recipient_id': recipient})
+        if r is None or r.status_code not in (200, 201):
+            logger.error('send_dm: failed to create DM channel: %s %s', getattr(r, 'status_code', None), getattr(r, 'text', ''))
+            return None
+        channel = r.json().get('id')
+        if not channel:
+            logger.error('send_dm: no channel id in create response: %s', r.text)
+            return None
+        self.dm_channels.set(recipient, channel)
+        return channel
+
+    def send_channel_message(self, channel_id, message):
+        channel_id = str(channel_id)
+        return self.request('POST', f'/channels/{channel_id}/messages', route='/channels/{channel_id}/messages',
+                            major=channel_id, json={'content': message})
+
+    def send_dm(self, user_id, message):
+        recipient = normalize_id(user_id)
+        for _ in range(2):
+            channel = self.get_dm_channel(recipient)
+            if not channel:
+                return False
+            r = self.send_channel_message(channel, message)
+            if r is not None and r.status_code in (200, 201):
+                return True
+            if r is not None and r.status_code == 404:
+                # cached channel no longer exists; create a fresh one once
+                self.dm_channels.pop(recipient)
+                continue
+            logger.error('send_dm: failed to send message: %s %s', getattr(r, 'status_code', None), getattr(r, 'text', ''))
+            return False
+        return False
+
+    def add_role(self, guild_id, user_id, role_id):
+        guild_id = str(guild_id)
+        path = f'/guilds/{guild_id}/members/{normalize_id(user_id)}/roles/{role_id}'
+        return self.request('PUT', path, route='/guilds/{guild_id}/members/{user_id}/roles/{role_id}', major=guild_id)
+
+    def get_guild_member(self, guild_id, user_id):
+        guild_id = str(guild_id)
+        return self.request('GET', f'/guilds/{guild_id}/members/{normalize_id(user_id)}',
+                            route='/guilds/{guild_id}/members/{user_id}', major=guild_id)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> DiscordClient:
+    """Process-wide bot client (shares one connection pool and rate-limit state)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = DiscordClient(token=BOT_TOKEN)
+    return _client
+
 
 def send_dm(discord_user_id: str, message: str) -> bool:
     """Send a DM to a user ID using the bot. Returns True on success."""
@@ -34,27 +297,7 @@ def send_dm(discord_user_id: str, message: str) -> bool:
         logger.error('send_dm: no BOT_TOKEN configured')
         return False
     try:
-        # create DM channel
-        # normalize discord_user_id (accept <@123...>, 123..., or numeric string)
-        import re
-        m = re.findall(r"(\d+)", str(discord_user_id))
-        recipient = m[0] if m else str(discord_user_id)
-        payload = {'recipient_id': str(recipient)}
-        r = requests.post(f'{DISCORD_API_BASE}/users/@me/channels', json=payload, headers=HEADERS, timeout=10)
-        if r.status_code not in (200, 201):
-            logger.error('send_dm: failed to create DM channel: %s %s', r.status_code, r.text)
-            return False
-        channel = r.json().get('id')
-        if not channel:
-            logger.error('send_dm: no channel id in create response: %s', r.text)
-            return False
-        # send message
-        msg_payload = {'content': message}
-        r2 = requests.post(f'{DISCORD_API_BASE}/channels/{channel}/messages', json=msg_payload, headers=HEADERS, timeout=10)
-        if r2.status_code in (200, 201):
-            return True
-        logger.error('send_dm: failed to send message: %s %s', r2.status_code, r2.text)
-        return False
+        return get_client().send_dm(discord_user_id, message)
     except Exception:
         logger.exception('send_dm: exception while sending DM')
         return False
@@ -66,15 +309,10 @@ def add_role(discord_user_id: str, role_id: str) -> bool:
         logger.error('add_role: missing BOT_TOKEN or GUILD_ID')
         return False
     try:
-        # normalize id
-        import re
-        m = re.findall(r"(\d+)", str(discord_user_id))
-        member_id = m[0] if m else str(discord_user_id)
-        url = f'{DISCORD_API_BASE}/guilds/{GUILD_ID}/members/{member_id}/roles/{role_id}'
-        r = requests.put(url, headers=HEADERS, timeout=10)
-        if r.status_code in (204,):
+        r = get_client().add_role(GUILD_ID, discord_user_id, role_id)
+        if r is not None and r.status_code in (204,):
             return True
-        logger.error('add_role: unexpected response %s %s', r.status_code, r.text)
+        logger.error('add_role: unexpected response %s %s', getattr(r, 'status_code', None), getattr(r, 'text', ''))
         return False
     except Exception:
         logger.exception('add_role: exception while adding role')
@@ -87,11 +325,10 @@ def send_channel_message(channel_id: str, message: str) -> bool:
         logger.error('send_channel_message: no BOT_TOKEN configured')
         return False
     try:
-        payload = {'content': message}
-        r = requests.post(f'{DISCORD_API_BASE}/channels/{channel_id}/messages', json=payload, headers=HEADERS, timeout=10)
-        if r.status_code in (200, 201):
+        r = get_client().send_channel_message(channel_id, message)
+        if r is not None and r.status_code in (200, 201):
             return True
-        logger.error('send_channel_message: failed to post: %s %s', r.status_code, r.text)
+        logger.error('send_channel_message: failed to post: %s %s', getattr(r, 'status_code', None), getattr(r, 'text', ''))
         return False
     except Exception:
         logger.exception('send_channel_message: exception while posting to channel')
@@ -104,13 +341,9 @@ def get_guild_member_username(discord_user_id: str) -> str | None:
         logger.debug('get_guild_member_username: missing BOT_TOKEN or GUILD_ID')
         return None
     try:
-        import re
-        m = re.findall(r"(\d+)", str(discord_user_id))
-        member_id = m[0] if m else str(discord_user_id)
-        url = f'{DISCORD_API_BASE}/guilds/{GUILD_ID}/members/{member_id}'
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        if r.status_code != 200:
-            logger.error('get_guild_member_username: bad response %s %s', r.status_code, r.text)
+        r = get_client().get_guild_member(GUILD_ID, discord_user_id)
+        if r is None or r.status_code != 200:
+            logger.error('get_guild_member_username: bad response %s %s', getattr(r, 'status_code', None), getattr(r, 'text', ''))
             return None
         data = r.json()
         # Prefer the account username (username#discriminator) over guild nickname
@@ -0,0 +1,208 @@
+"""Retryable background steps for application actions.
+
+final_accept commits the cadet account in the request and enqueues the
+Discord side effects as ApplicationJob rows (one per step). The
+`discord_worker` management command runs due steps in order per
+application, retrying failures with backoff; admins see each step's status
+on the applications page.
+"""
+import datetime
+import logging
+import re
+import secrets
+
+from django.db import connection, transaction
+from django.db.models import Min, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import ApplicationJob, Notification, User
+from .outbox import backoff_delay
+from . import discord_utils
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+# a 'running' step whose worker died is picked up again after this long
+STALE_RUNNING = datetime.timedelta(minutes=10)
+
+_USERNAME_STRIP_RE = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+# --- usernames ---
+def clean_username(raw, fallback):
+    """Sanitize a Discord name: letters, digits, dot, underscore, dash; max 30 chars."""
+    base = _USERNAME_STRIP_RE.sub('', (raw or '').split('#')[0]) or fallback
+    return base[:30]
+
+
+def free_username(base, exclude_id=None):
+    """First of base, base1, base2, ... not taken by another user (one query)."""
+    taken = User.objects.filter(username__startswith=base)
+    if exclude_id:
+        taken = taken.exclude(id=exclude_id)
+    taken = set(taken.values_list('username', flat=True))
+    username = base
+    suffix = 1
+    while username in taken:
+        username = f"{base}{suffix}"
+        suffix += 1
+    return username
+
+
+# --- steps ---
+def credentials_message(username, password, discord_user):
+    return f"""**
+السلام عليكم ورحمة الله وبركاته
+
+تم قبولك قبول نهائي في شرطة هيل ستيت. نرجو منك مراجعة جميع التعاميم المنشورة.
+
+ونرجوا منك مراجعة حسابك على الموقع الإلكتروني لإكمال جميع إجراءات تقييم الكاديت وشكراً لك.
+
+`Username : {username}`
+
+`Password : {password}`
+
+`App :`https://heallstateacademy.onrender.com
+
+(<@{discord_user}>)
+**"""
+
+
+def _resolve_username(job):
+    p = job.payload
+    cadet = User.objects.get(id=p['cadet_id'])
+    discord_name = discord_utils.get_guild_member_username(p['discord_user'])
+    if not discord_name:
+        # keep the placeholder username the account was created with
+        return True
+    base = clean_username(discord_name, f"cadet{p['discord_user']}")
+    username = free_username(base, exclude_id=cadet.id)
+    if username != cadet.username:
+        cadet.username = username
+        cadet.save(update_fields=['username'])
+    return True
+
+
+def _send_credentials(job):
+    p = job.payload
+    cadet = User.objects.get(id=p['cadet_id'])
+    password = p.get('password')
+    if password is None:
+        # an admin retry after the step gave up: the password was dropped from
+        # the payload, so the DM carries a new one (kept until the step is over)
+        password = p['password'] = secrets.token_urlsafe(8)
+        cadet.set_password(password)
+        cadet.save(update_fields=['password'])
+    return discord_utils.send_dm(p['discord_user'], credentials_message(cadet.username, password, p['discord_user']))
+
+
+def _send_credentials_failed(job):
+    p = job.payload
+    cadet = User.objects.filter(id=p['cadet_id']).first()
+    if cadet:
+        msg = credentials_message(cadet.username, p['password'], p['discord_user'])
+        Notification.objects.create(user=cadet, message=f"تم إنشاء حسابك لكن فشل إرسال رسالة الديسكورد. بيانات الدخول:\n{msg}")
+
+
+def _add_role(job):
+    p = job.payload
+    return discord_utils.add_role(p['discord_user'], p['role_id'])
+
+
+def _add_role_failed(job):
+    cadet = User.objects.filter(id=job.payload['cadet_id']).first()
+    if cadet:
+        Notification.objects.create(user=cadet, message="تم إنشاء حسابك، ولكن فشل إضافة الدور في ديسكورد. تواصل مع الإدارة.")
+
+
+# step -> (handler, called once when the step finally fails, payload keys dropped once done)
+STEPS = {
+    'resolve_username': (_resolve_username, None, ()),
+    'send_credentials': (_send_credentials, _send_credentials_failed, ('password',)),
+    'add_role': (_add_role, _add_role_failed, ()),
+}
+
+
+def enqueue_final_accept(app, cadet, password, discord_user, role_id=None):
+    """Queue the Discord steps of a final acceptance. Safe to call twice."""
+    base = {'cadet_id': cadet.id, 'discord_user': discord_user}
+    jobs = [
+        ApplicationJob(application=app, step='resolve_username', order=0, payload=base),
+        ApplicationJob(application=app, step='send_credentials', order=1, payload={**base, 'password': password}),
+    ]
+    if role_id:
+        jobs.append(ApplicationJob(application=app, step='add_role', order=2, payload={**base, 'role_id': role_id}))
+    ApplicationJob.objects.bulk_create(jobs, ignore_conflicts=True)
+
+
+def retry_failed(app):
+    """Put the failed steps of an application back in the queue."""
+    return app.jobs.filter(status='failed').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+
+
+def _claim(batch_size):
+    """Mark up to batch_size runnable steps as running and return them.
+
+    A step is runnable when no earlier step of the same application is still
+    pending or running. That is filtered in the query, before the batch is
+    sliced, so blocked later steps can't crowd out runnable first steps.
+    """
+    now = timezone.now()
+    first_open = (ApplicationJob.objects
+                  .filter(application=OuterRef('application'), status__in=['pending', 'running'])
+                  .values('application').annotate(first=Min('order')).values('first')[:1])
+    with transaction.atomic():
+        qs = ApplicationJob.objects.filter(
+            Q(status='pending', next_attempt_at__lte=now) | Q(status='running', updated_at__lt=now - STALE_RUNNING),
+            order=Subquery(first_open),
+        ).order_by('application_id', 'order')
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        runnable = list(qs[:batch_size])
+        ApplicationJob.objects.filter(id__in=[j.id for j in runnable]).update(status='running', updated_at=now)
+        return runnable
+
+
+def run_job(job, max_attempts=MAX_ATTEMPTS):
+    handler, on_failed, secret_keys = STEPS[job.step]
+    job.attempts += 1
+    try:
+        ok = handler(job)
+        error = None if ok else f'{job.step} returned False'
+    except Exception as exc:
+        logger.exception('application job %s (%s) failed', job.id, job.step)
+        ok = False
+        error = repr(exc)
+
+    job.last_error = error
+    if ok:
+        job.status = 'done'
+    elif job.attempts >= max_attempts:
+        job.status = 'failed'
+        if on_failed:
+            try:
+                on_failed(job)
+            except Exception:
+                logger.exception('application job %s: failure hook raised', job.id)
+    else:
+        job.status = 'pending'
+        job.next_attempt_at = timezone.now() + backoff_delay(job.attempts)
+
+    # secrets (the cadet's password) are not kept once the step is over,
+    # whether it succeeded or was given up
+    if job.status in ('done', 'failed'):
+        for key in secret_keys:
+            job.payload.pop(key, None)
+    job.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'payload', 'updated_at'])
+    return ok
+
+
+def run_due(batch_size=20):
+    """Run one batch of due steps. Returns (succeeded, failed) counts."""
+    done = failed = 0
+    for job in _claim(batch_size):
+        if run_job(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
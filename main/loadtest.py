@@ -0,0 +1,557 @@
+"""Recruitment-wave load test: simulated applicants and trainers.
+
+Drives a running server over HTTP the way the pages do (see the `loadtest`
+management command, which also starts the server and the Discord stub):
+
+- an applicant opens apply.html (polling apply_status_api every 8s, with the
+  browser's conditional revalidation), logs in through the OAuth callback and
+  its handshake page, submits the form, logs in again (apply_submit clears the
+  Discord login from the session), starts the test, waits out the initial
+  countdown (apply_test.html polls every 30s) and answers 10 questions. Then
+  the next applicant takes its place, so the number of concurrent applicants
+  stays constant.
+- a trainer logs in, sits on the dashboard polling /api/unread-state/ every 3s
+  and now and then opens a cadet's chat, polling for new messages every 5s
+  (the fallback path when the WebSocket is down) and sometimes sending one.
+
+Think times are drawn at random and multiplied by think_scale; 0 turns every
+user into a tight loop. Samples are labelled with the URL name of the view, so
+they line up with the per-view counters served by /metrics.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.db.models import Q
+
+from . import questions
+from .models import (
+    Application, ApplicationSetting, Assignment, AuditLog, DiscordOutbox, Message, Question, TestSession, User,
+)
+
+USERNAME_PREFIX = 'loadtest_'
+PASSWORD = 'loadtest'
+QUESTION_CATEGORY = 'loadtest'
+# 19-digit ids above any Discord snowflake issued so far
+DISCORD_ID_BASE = 9_990_000_000_000_000_000
+DISCORD_ID_PREFIX = '999'
+
+APPLY_STATUS_INTERVAL = 8.0
+TEST_STATUS_INTERVAL = 30.0
+UNREAD_INTERVAL = 3.0
+CHAT_POLL_INTERVAL = 5.0
+
+
+# --- seed data ---
+
+# what seed() changed outside its own rows, undone by cleanup()
+_run = {'setting': None, 'outbox_after': 0}
+
+
+def seed(trainers, cadets_per_trainer, messages_per_chat=10):
+    """Create trainers, their cadets and chat history; open applications.
+
+    Adds throwaway questions when the bank has fewer than 10. Returns a list
+    of (username, [cadet ids]) for the trainers. The application setting is
+    saved first and put back by cleanup().
+    """
+    cleanup()
+    setting = ApplicationSetting.objects.first() or ApplicationSetting()
+    _run['setting'] = ((setting.pk, setting.status, setting.closed_message, setting.reopen_at)
+                       if setting.pk else None)
+    _run['outbox_after'] = DiscordOutbox.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    setting.status = 'open'
+    setting.reopen_at = None
+    setting.save()
+
+    missing = 10 - Question.objects.count()
+    for i in range(max(missing, 0)):
+        Question.objects.create(text=f'Load test question {i + 1}', option_a='a', option_b='b',
+                                option_c='c', option_d='d', correct_index=i % 4, category=QUESTION_CATEGORY)
+
+    password = make_password(PASSWORD)
+    accounts = []
+    for t in range(trainers):
+        trainer = User.objects.create(username=f'{USERNAME_PREFIX}trainer{t}', full_name=f'Trainer {t}',
+                                      rank='trainer', password=password)
+        cadets = [User.objects.create(username=f'{USERNAME_PREFIX}cadet{t}_{c}', full_name=f'Cadet {t}-{c}',
+                                      rank='cadet', password=make_password(None))
+                  for c in range(cadets_per_trainer)]
+        Assignment.objects.bulk_create([Assignment(trainer=trainer, cadet=cadet) for cadet in cadets])
+        for cadet in cadets:
+            for m in range(messages_per_chat):
+                # created one by one so the unread/conversation signals run
+                sender, receiver = (cadet, trainer) if m % 2 else (trainer, cadet)
+                Message.objects.create(sender=sender, receiver=receiver, content=f'رسالة تجريبية {m}')
+        accounts.append((trainer.username, [cadet.id for cadet in cadets]))
+    return accounts
+
+
+def _audit_rows():
+    """AuditLog rows written for the simulated users, applications and sessions."""
+    apps = Application.objects.filter(discord_id__startswith=DISCORD_ID_PREFIX)
+    targets = [f'application:{pk}' for pk in apps.values_list('id', flat=True)]
+    targets += [f'session:{pk}' for pk in TestSession.objects.filter(application__in=apps).values_list('id', flat=True)]
+    return AuditLog.objects.select_related('actor').filter(
+        Q(actor__username__startswith=USERNAME_PREFIX) | Q(target__in=targets))
+
+
+def _delete_audit_posts(rows):
+    """Delete the queued channel posts of these audit rows.
+
+    Posts carry no reference to their audit row, so they are matched by their
+    text among rows queued since seed(), at most once per audit row (an
+    applicant's start_test post reads the same as a real one).
+    """
+    from .views import _audit_channel_message
+
+    wanted = Counter(_audit_channel_message(r.action, r.actor, r.target or '', r.details or '') for r in rows)
+    queued = DiscordOutbox.objects.filter(id__gt=_run['outbox_after'])
+    ids = []
+    for content, n in wanted.items():
+        ids += queued.filter(content=content).order_by('id').values_list('id', flat=True)[:n]
+    for i in range(0, len(ids), 500):
+        DiscordOutbox.objects.filter(id__in=ids[i:i + 500]).delete()
+
+
+def cleanup():
+    """Delete everything seed() and the simulated users created.
+
+    That includes their audit log entries and the audit-channel posts those
+    queued, and the application setting seed() opened is restored.
+    """
+    rows = list(_audit_rows())
+    _delete_audit_posts(rows)
+    AuditLog.objects.filter(id__in=[r.id for r in rows]).delete()
+    Application.objects.filter(discord_id__startswith=DISCORD_ID_PREFIX).delete()
+    User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+    if Question.objects.filter(category=QUESTION_CATEGORY).delete()[0]:
+        questions.bump_version()
+
+    saved, _run['setting'] = _run['setting'], None
+    if saved is not None:
+        pk, status, closed_message, reopen_at = saved
+        setting = ApplicationSetting.objects.filter(pk=pk).first()
+        if setting is not None:
+            setting.status, setting.closed_message, setting.reopen_at = status, closed_message, reopen_at
+            setting.save()  # post_save refreshes the cached copy
+    _run['outbox_after'] = 0
+
+
+# --- Discord stub ---
+
+class _DiscordStubHandler(BaseHTTPRequestHandler):
+    """The Discord endpoints the web process calls, answering after `latency`.
+
+    The OAuth code is '<discord id>.<n>'; /users/@me returns that id. Anything
+    else (bot DMs, roles) succeeds, so the worker can be pointed at the stub
+    as well.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None, headers=None):
+        data = json.dumps(body or {}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        server = self.server
+        path = urlsplit(self.path).path
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        with server.lock:
+            server.calls[f'{self.command} {path}'] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.rate_limit and random.random() < server.rate_limit:
+            return self._reply(429, {'retry_after': 0.5, 'global': False}, {'Retry-After': '0.5'})
+
+        if path.endswith('/oauth2/token'):
+            code = parse_qs(body.decode()).get('code', [''])[0]
+            if not code:
+                return self._reply(400, {'error': 'invalid_grant'})
+            return self._reply(200, {'access_token': f'lt-{code}', 'token_type': 'Bearer'})
+        if path.endswith('/users/@me') and self.command == 'GET':
+            auth = self.headers.get('Authorization', '')
+            if not auth.startswith('Bearer lt-'):
+                return self._reply(401)
+            discord_id = auth[len('Bearer lt-'):].split('.', 1)[0]
+            return self._reply(200, {'id': discord_id, 'username': f'applicant{discord_id[-6:]}'})
+        return self._reply(200, {'id': '1'})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients that gave up (timeouts, shutdown) are not the stub's problem
+
+
+class DiscordStub:
+    """Local stand-in for discord.com/api, served from a background thread."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, rate_limit=0.0):
+        self.server = _StubServer((host, port), _DiscordStubHandler)
+        self.server.latency = latency
+        self.server.rate_limit = rate_limit
+        self.server.calls = Counter()
+        self.server.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def calls(self):
+        return self.server.calls
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# --- measurement ---
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list (None when empty)."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class Recorder:
+    """Latency samples and failures per (method, view name)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(Counter)
+        self.started = time.monotonic()
+        self.finished = None
+
+    def record(self, key, seconds, status, ok):
+        with self.lock:
+            self.samples[key].append(seconds)
+            self.statuses[key][status] += 1
+            if not ok:
+                self.errors[key] += 1
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def summary(self):
+        """One dict per endpoint, busiest first."""
+        rows = []
+        with self.lock:
+            items = [(key, sorted(values)) for key, values in self.samples.items()]
+        for (method, view), values in items:
+            rows.append({
+                'method': method, 'view': view, 'count': len(values),
+                'errors': self.errors[(method, view)],
+                'rps': len(values) / self.elapsed,
+                'p50': percentile(values, 50), 'p95': percentile(values, 95),
+                'p99': percentile(values, 99), 'max': values[-1],
+                'statuses': dict(self.statuses[(method, view)]),
+            })
+        rows.sort(key=lambda r: -r['count'])
+        return rows
+
+
+class Browser:
+    """One simulated browser: cookie jar, CSRF token and HTTP cache validators."""
+
+    def __init__(self, base_url, recorder, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.validators = {}
+
+    def csrf_token(self):
+        return self.http.cookies.get('csrftoken', '')
+
+    def request(self, view, method, path, ok=(200,), revalidate=False, **kwargs):
+        """Send a request and record it under `view`. Returns the response or None."""
+        headers = kwargs.pop('headers', {})
+        if revalidate and path in self.validators:
+            headers['If-None-Match'] = self.validators[path]
+        if method == 'POST':
+            headers.setdefault('X-CSRFToken', self.csrf_token())
+            headers.setdefault('Referer', self.base_url + '/')
+        kwargs.setdefault('allow_redirects', False)
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, headers=headers,
+                                         timeout=self.timeout, **kwargs)
+        except requests.RequestException as exc:
+            self.recorder.record((method, view), time.perf_counter() - start, type(exc).__name__, False)
+            return None
+        for cookie in self.http.cookies:
+            # production settings mark the session/CSRF cookies Secure; this
+            # is plain HTTP to a local server, so send them back anyway
+            cookie.secure = False
+        self.recorder.record((method, view), time.perf_counter() - start, response.status_code,
+                             response.status_code in ok or (revalidate and response.status_code == 304))
+        if revalidate and response.headers.get('ETag'):
+            self.validators[path] = response.headers['ETag']
+        return response
+
+
+# --- simulated users ---
+
+class _Stopped(Exception):
+    pass
+
+
+class VirtualUser(threading.Thread):
+    """A user thread; wait() sleeps while firing the page's periodic polls."""
+
+    def __init__(self, index, base_url, recorder, stop_at, think_scale, start_delay=0.0):
+        super().__init__(daemon=True, name=f'{type(self).__name__}-{index}')
+        self.index = index
+        self.base_url = base_url
+        self.recorder = recorder
+        self.stop_at = stop_at
+        self.think_scale = think_scale
+        self.start_delay = start_delay
+        self.pollers = []
+        self.browser = None
+
+    def run(self):
+        try:
+            self.sleep(self.start_delay)
+            while True:
+                self.close()
+                self.browser = Browser(self.base_url, self.recorder)
+                self.pollers = []
+                self.script()
+        except _Stopped:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        if self.browser is not None:
+            self.browser.http.close()
+
+    def script(self):
+        raise NotImplementedError
+
+    def poll_every(self, interval, fn):
+        """Replace the current page's pollers with `fn` every `interval` seconds (first call now)."""
+        self.pollers = [[time.monotonic(), interval, fn]]
+
+    def sleep(self, seconds):
+        deadline = time.monotonic() + seconds
+        while True:
+            now = time.monotonic()
+            if now >= self.stop_at:
+                raise _Stopped
+            for poller in self.pollers:
+                if poller[0] <= now:
+                    poller[2]()
+                    poller[0] = time.monotonic() + poller[1]
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            next_due = min([p[0] for p in self.pollers] + [deadline, self.stop_at])
+            time.sleep(max(0.0, next_due - now))
+
+    def think(self, low, high):
+        self.sleep(random.uniform(low, high) * self.think_scale)
+
+
+_QUESTION_IDS = re.compile(r'questionIds:\s*\[([\d,\s]*)\]')
+_INITIAL_COUNTDOWN = re.compile(r'initialCountdown:\s*(\d+)')
+
+
+class Applicant(VirtualUser):
+
+    def __init__(self, *args, fetch_questions=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetch_questions = fetch_questions
+        self.iteration = 0
+
+    def poll_status(self):
+        self.browser.request('apply_status_api', 'GET', '/api/apply_status/', revalidate=True)
+
+    def apply_page(self):
+        self.browser.request('apply_page', 'GET', '/apply/')
+        self.poll_every(APPLY_STATUS_INTERVAL, self.poll_status)
+
+    def discord_login(self, discord_id):
+        """Login button, Discord's redirect back, then the handshake page's polls."""
+        self.browser.request('discord_oauth_login', 'GET', '/apply/discord-login/', ok=(302,))
+        self.pollers = []
+        code = f'{discord_id}.{uuid.uuid4().hex[:8]}'
+        r = self.browser.request('discord_oauth_callback', 'GET', '/apply/discord-callback/',
+                                 ok=(200, 302), params={'code': code})
+        delay = 0.5
+        while r is not None and r.status_code == 200:
+            self.sleep(delay * min(self.think_scale, 1.0))
+            r = self.browser.request('discord_oauth_status', 'GET', '/apply/discord-callback/status/')
+            if r is None or r.status_code != 200 or r.json().get('status') == 'done':
+                break
+            delay = min(delay * 1.5, 3.0)
+        self.apply_page()
+
+    def script(self):
+        discord_id = str(DISCORD_ID_BASE + self.index * 1_000_000 + self.iteration)
+        self.iteration += 1
+
+        self.apply_page()
+        self.think(5, 20)
+        self.discord_login(discord_id)
+        self.think(5, 15)
+        r = self.browser.request('apply_submit', 'POST', '/apply/submit/',
+                                 data={'character_name': f'متقدم {discord_id[-6:]}'})
+        if r is None or r.status_code != 200:
+            return
+        app_id = r.json()['app_id']
+        # apply_submit logs the Discord account out of the session again
+        self.discord_login(discord_id)
+
+        r = self.browser.request('apply_start_test', 'GET', f'/apply/start/{app_id}/', ok=(302,))
+        if r is None or r.status_code != 302:
+            return
+        test_url = urlsplit(r.headers['Location'])
+        session_id = int(test_url.path.rstrip('/').rsplit('/', 1)[1])
+        token = parse_qs(test_url.query).get('token', [''])[0]
+        r = self.browser.request('apply_test_page', 'GET', test_url.path, params={'token': token})
+        match = _QUESTION_IDS.search(r.text) if r is not None and r.status_code == 200 else None
+        if match is None:
+            return
+        qids = [int(x) for x in match.group(1).split(',') if x.strip()]
+        self.poll_every(TEST_STATUS_INTERVAL, self.poll_status)
+
+        countdown = _INITIAL_COUNTDOWN.search(r.text)
+        self.sleep((int(countdown.group(1)) if countdown else 0) * self.think_scale)
+        for qid in qids:
+            if self.fetch_questions:
+                self.browser.request('question_api', 'GET', f'/api/question/{qid}/')
+            self.think(3, 45)  # 60s per question
+            self.browser.request('apply_submit_answer', 'POST', f'/apply/test/{session_id}/answer/', data={
+                'question_id': qid, 'selected_index': random.randrange(4), 'token': token})
+        self.pollers = []
+        self.browser.request('apply_test_finished', 'GET', f'/apply/finished/{app_id}/')
+        self.think(5, 15)
+
+
+class Trainer(VirtualUser):
+
+    def __init__(self, *args, account, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.username, self.cadet_ids = account
+        self.last_id = {}
+
+    def poll_unread(self):
+        self.browser.request('unread_state_api', 'GET', '/api/unread-state/', revalidate=True)
+
+    def poll_chat(self, cadet_id):
+        r = self.browser.request('chat_messages_api', 'GET', f'/chat/api/messages/{cadet_id}/',
+                                 params={'last_id': self.last_id.get(cadet_id, 0)})
+        if r is not None and r.status_code == 200:
+            for message in r.json().get('messages', []):
+                self.last_id[cadet_id] = max(self.last_id.get(cadet_id, 0), message['id'])
+
+    def script(self):
+        self.browser.request('login', 'GET', '/')
+        r = self.browser.request('login', 'POST', '/', ok=(302,),
+                                 data={'username': self.username, 'password': PASSWORD})
+        if r is None or r.status_code != 302:
+            self.sleep(5)
+            return
+        while True:
+            self.browser.request('trainer_dashboard', 'GET', '/trainer-dashboard/')
+            self.poll_every(UNREAD_INTERVAL, self.poll_unread)
+            self.think(10, 40)
+            if not self.cadet_ids:
+                continue
+
+            cadet_id = random.choice(self.cadet_ids)
+            r = self.browser.request('chat', 'GET', f'/chat/{cadet_id}/')
+            if r is not None and r.status_code == 200:
+                ids = [int(x) for x in re.findall(r'data-id="(\d+)"', r.text)]
+                self.last_id[cadet_id] = max(ids, default=self.last_id.get(cadet_id, 0))
+            self.poll_every(CHAT_POLL_INTERVAL, lambda: self.poll_chat(cadet_id))
+            for _ in range(random.randint(1, 3)):
+                self.think(5, 20)
+                r = self.browser.request('chat', 'POST', f'/chat/{cadet_id}/',
+                                         data={'content': 'تمام، استمر'},
+                                         headers={'X-Requested-With': 'XMLHttpRequest'})
+                if r is not None and r.status_code == 200:
+                    self.last_id[cadet_id] = max(self.last_id.get(cadet_id, 0), r.json()['id'])
+
+
+def run_wave(base_url, trainer_accounts, applicants, duration, ramp=0.0, think_scale=1.0,
+             fetch_questions=False):
+    """Run `applicants` concurrent applicants and one user per trainer account.
+
+    Users start spread over `ramp` seconds and stop `duration` seconds after
+    the first one started. Returns the Recorder.
+    """
+    recorder = Recorder()
+    stop_at = time.monotonic() + duration
+    total = applicants + len(trainer_accounts)
+    users = []
+    for i in range(applicants):
+        users.append(Applicant(i, base_url, recorder, stop_at, think_scale,
+                               start_delay=ramp * len(users) / max(total, 1), fetch_questions=fetch_questions))
+    for i, account in enumerate(trainer_accounts):
+        users.append(Trainer(i, base_url, recorder, stop_at, think_scale,
+                             start_delay=ramp * len(users) / max(total, 1), account=account))
+    random.shuffle(users)
+    for user in users:
+        user.start()
+    for user in users:
+        user.join(timeout=max(0.0, stop_at - time.monotonic()) + 60)
+    recorder.finished = time.monotonic()
+    return recorder
+
+
+# --- server-side numbers ---
+
+_SAMPLE = re.compile(r'^(\w+)\{([^}]*)\} (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def scrape_db_stats(base_url, token):
+    """Per view {'requests', 'queries', 'seconds'} from /metrics (one worker's totals)."""
+    r = requests.get(base_url.rstrip('/') + '/metrics', headers={'Authorization': f'Bearer {token}'}, timeout=10)
+    r.raise_for_status()
+    stats = defaultdict(lambda: {'requests': 0, 'queries': 0, 'seconds': 0.0})
+    for line in r.text.splitlines():
+        match = _SAMPLE.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.group(1), dict(_LABEL.findall(match.group(2))), float(match.group(3))
+        field = {'http_requests_total': 'requests', 'db_queries_total': 'queries',
+                 'db_query_seconds_total': 'seconds'}.get(name)
+        if field is not None:
+            stats[labels.get('view')][field] += value
+    return dict(stats)
@@ -0,0 +1,64 @@
+import time
+
+from django.db import models, transaction
+from django.core.management.base import BaseCommand
+
+from main import search
+from main.models import Application
+
+NAMES = ['أحمد', 'محمد', 'خالد', 'فاطمة', 'عبدالله', 'Omar', 'Sara', 'Yousef', 'نورة', 'إبراهيم']
+
+
+class Command(BaseCommand):
+    help = ("Compare the old icontains applicant filter with the indexed search on a "
+            "synthetic table. Works on throwaway rows inside a transaction that is "
+            "rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Applications to generate')
+        parser.add_argument('--repeat', type=int, default=20, help='Queries timed per term')
+        parser.add_argument('--terms', default='احمد,خالد 42,omar,12345', help='Comma-separated search terms')
+
+    @staticmethod
+    def _time(fn, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        terms = [t.strip() for t in options['terms'].split(',') if t.strip()]
+        page = 50
+
+        def old(q):
+            qs = Application.objects.filter(models.Q(discord_id__icontains=q) | models.Q(character_name__icontains=q))
+            return qs.count(), list(qs.order_by('-submitted_at', '-id').values_list('id', flat=True)[:page])
+
+        def new(q):
+            qs = search.search(Application.objects.all(), q)
+            return qs.count(), list(qs.order_by('-search_rank', '-submitted_at', '-id').values_list('id', flat=True)[:page])
+
+        with transaction.atomic():
+            existing = Application.objects.count()
+            batch = []
+            for i in range(rows):
+                name = f'{NAMES[i % len(NAMES)]} {i}'
+                discord_id = str(100000000 + i)
+                batch.append(Application(character_name=name, discord_id=discord_id,
+                                         search_text=search.search_text_for(name, discord_id)))
+                if len(batch) == 2000:
+                    Application.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                Application.objects.bulk_create(batch)
+
+            self.stdout.write(f'{"term":>12} {"icontains ms":>13} {"hits":>7} {"search ms":>10} {"hits":>7}')
+            for q in terms:
+                old_hits = old(q)[0]
+                new_hits = new(q)[0]
+                old_ms = self._time(lambda: old(q), repeat)
+                new_ms = self._time(lambda: new(q), repeat)
+                self.stdout.write(f'{q:>12} {old_ms:>13.2f} {old_hits:>7} {new_ms:>10.2f} {new_hits:>7}')
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS(f'Rolled back; {existing} applications left'))
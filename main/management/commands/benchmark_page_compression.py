@@ -0,0 +1,83 @@
+import gzip
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+from main import compression, search
+from main.models import Application, Assignment, Evaluation, Message, User
+
+MINIFY_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'main.template_loaders.MinifyingFilesystemLoader',
+        'main.template_loaders.MinifyingAppDirectoriesLoader',
+    ]),
+]
+
+
+class Command(BaseCommand):
+    help = ("Bytes on the wire and render time for the heaviest pages: plain, minified "
+            "templates, gzip and brotli. Works on throwaway rows inside a transaction "
+            "that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Renders timed per page')
+        parser.add_argument('--rows', type=int, default=50, help='Applications/cadets/messages to generate')
+
+    def _user(self, username, rank):
+        user = User(username=username, full_name=username.title(), rank=rank)
+        user.set_password('bench')
+        user.save()
+        return user
+
+    def _fixtures(self, rows):
+        chief = self._user('bench_chief', 'police_chief')
+        trainer = self._user('bench_trainer', 'trainer')
+        cadets = [self._user(f'bench_cadet{i}', 'cadet') for i in range(rows)]
+        Assignment.objects.bulk_create([Assignment(trainer=trainer, cadet=c) for c in cadets])
+        Evaluation.objects.bulk_create([Evaluation(trainer=trainer, cadet=c, score=80, comments='جيد جداً') for c in cadets])
+        Message.objects.bulk_create([
+            Message(sender=trainer if i % 2 else cadets[0], receiver=cadets[0] if i % 2 else trainer,
+                    content=f'رسالة تجريبية رقم {i}') for i in range(rows)])
+        Application.objects.bulk_create([
+            Application(discord_id=str(9000 + i), character_name=f'متقدم {i}',
+                        search_text=search.search_text_for(f'متقدم {i}', str(9000 + i))) for i in range(rows)])
+        return [
+            ('admin_applications', chief, '/admin/applications/'),
+            ('trainer_dashboard', trainer, '/trainer-dashboard/'),
+            ('cadet_dashboard', cadets[0], '/cadet-dashboard/'),
+            ('chat', cadets[0], f'/chat/{trainer.id}/'),
+        ]
+
+    def _measure(self, user, url, repeat):
+        client = Client()
+        session = client.session
+        session['uid'] = user.id
+        session['rank'] = user.rank
+        session.save()
+        client.get(url, secure=True)  # warm the template cache
+        start = time.perf_counter()
+        for _ in range(repeat):
+            response = client.get(url, secure=True)
+        ms = (time.perf_counter() - start) / repeat * 1000
+        return response.content, ms
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        templates = [dict(settings.TEMPLATES[0], APP_DIRS=False,
+                          OPTIONS=dict(settings.TEMPLATES[0]['OPTIONS'], loaders=MINIFY_LOADERS))]
+
+        self.stdout.write(f'{"page":<20} {"html":>8} {"minified":>9} {"gzip":>7} {"br":>7} {"render ms":>10} {"minified ms":>12}')
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+            for name, user, url in self._fixtures(options['rows']):
+                plain, plain_ms = self._measure(user, url, repeat)
+                with override_settings(TEMPLATES=templates):
+                    minified, minified_ms = self._measure(user, url, repeat)
+                gz = len(gzip.compress(minified, 6))
+                br = len(compression.brotli.compress(minified, quality=compression.BROTLI_QUALITY)) if compression.brotli else '-'
+                self.stdout.write(f'{name:<20} {len(plain):>8} {len(minified):>9} {gz:>7} {br:>7} '
+                                  f'{plain_ms:>10.2f} {minified_ms:>12.2f}')
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Rolled back'))
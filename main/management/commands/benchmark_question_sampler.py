@@ -0,0 +1,55 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main import questions
+from main.models import Question
+
+
+class Command(BaseCommand):
+    help = ("Compare the cost of picking a test's questions as the bank grows: the old "
+            "full id scan against the cached sampler. Works on throwaway rows inside a "
+            "transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000,50000', help='Comma-separated bank sizes')
+        parser.add_argument('--repeat', type=int, default=200, help='Draws timed per size')
+        parser.add_argument('--per-test', type=int, default=10, help='Questions per test')
+
+    @staticmethod
+    def _time(fn, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    def handle(self, *args, **options):
+        sizes = [int(x) for x in options['sizes'].split(',') if x.strip()]
+        repeat, n = options['repeat'], options['per_test']
+
+        self.stdout.write(f'{"bank":>8} {"id scan ms":>11} {"cached ms":>10} {"stratified ms":>14} {"reload ms":>10}')
+        with transaction.atomic():
+            existing = Question.objects.count()
+            for size in sizes:
+                missing = size - Question.objects.count()
+                if missing > 0:
+                    Question.objects.bulk_create([
+                        Question(text=f'bench {i}', option_a='a', option_b='b', option_c='c', option_d='d',
+                                 correct_index=0, category=f'c{i % 5}', difficulty=1 + i % 3)
+                        for i in range(missing)
+                    ], batch_size=1000)
+                questions.bump_version()  # bulk_create sends no signals
+
+                start = time.perf_counter()
+                questions.bank()
+                reload_ms = (time.perf_counter() - start) * 1000
+
+                scan = self._time(lambda: random.sample(list(Question.objects.values_list('id', flat=True)), n), repeat)
+                cached = self._time(lambda: questions.sample(n), repeat)
+                stratified = self._time(lambda: questions.sample(n, by='difficulty'), repeat)
+                self.stdout.write(f'{size:>8} {scan:>11.3f} {cached:>10.3f} {stratified:>14.3f} {reload_ms:>10.1f}')
+            transaction.set_rollback(True)
+        questions.bump_version()
+        self.stdout.write(self.style.SUCCESS(f'Rolled back; bank left at {existing} questions'))
@@ -0,0 +1,66 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main import jobs, outbox, reopen
+
+logger = logging.getLogger('main.discord_worker')
+
+
+class Command(BaseCommand):
+    help = ('Background worker: runs queued application jobs, drains the Discord outbox and applies '
+            'scheduled reopens. Runs forever unless --once is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process what is due now and exit')
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when there is nothing to do')
+        parser.add_argument('--keep-days', type=int, default=7, help='Delete sent outbox rows older than this')
+        parser.add_argument('--reopen-interval', type=float, default=10.0, help='Seconds between scheduled-reopen checks')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_purge = 0.0
+        self.last_reopen = 0.0
+
+        while True:
+            # a long-running process: drop connections the server closed or
+            # that outlived CONN_MAX_AGE, as the request cycle does for views
+            close_old_connections()
+            try:
+                busy = self._pass(options, batch_size)
+            except Exception:
+                # one bad pass (a dropped connection, an unexpected row) must
+                # not stop the jobs, the outbox and the reopens for good
+                logger.exception('discord_worker: pass failed')
+                busy = False
+            if busy:
+                continue
+
+            if time.monotonic() - last_purge > 3600:
+                try:
+                    outbox.purge_sent(options['keep_days'])
+                except Exception:
+                    logger.exception('discord_worker: purging sent outbox rows failed')
+                last_purge = time.monotonic()
+            if options['once']:
+                self.stdout.write(self.style.SUCCESS('Nothing left to do'))
+                return
+            time.sleep(options['interval'])
+
+    def _pass(self, options, batch_size):
+        """Run what is due once; True if there was anything to do."""
+        if time.monotonic() - self.last_reopen >= options['reopen_interval']:
+            self.last_reopen = time.monotonic()
+            setting_reopened, apps_reopened = reopen.apply_due()
+            if setting_reopened or apps_reopened:
+                self.stdout.write(f'reopen: global {setting_reopened}, applications {apps_reopened}')
+
+        job_ok, job_failed = jobs.run_due(batch_size=batch_size)
+        sent, send_failed = outbox.drain(batch_size=batch_size)
+        busy = job_ok or job_failed or sent or send_failed
+        if busy:
+            self.stdout.write(f'jobs: ok {job_ok}, failed {job_failed}; outbox: sent {sent}, failed {send_failed}')
+        return busy
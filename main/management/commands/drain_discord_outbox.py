@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued Discord channel posts (DiscordOutbox). Runs forever unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain what is due now and exit')
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--keep-days', type=int, default=7, help='Delete sent rows older than this')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+        keep_days = options['keep_days']
+        last_purge = 0.0
+
+        while True:
+            sent, failed = outbox.drain(batch_size=batch_size)
+            if sent or failed:
+                self.stdout.write(f'outbox: sent {sent}, failed {failed}')
+
+            if options['once']:
+                # keep going until nothing is due
+                if sent or failed:
+                    continue
+                purged = outbox.purge_sent(keep_days)
+                self.stdout.write(self.style.SUCCESS(f'Outbox drained (purged {purged} old rows)'))
+                return
+
+            if not (sent or failed):
+                if time.monotonic() - last_purge > 3600:
+                    outbox.purge_sent(keep_days)
+                    last_purge = time.monotonic()
+                time.sleep(interval)
@@ -0,0 +1,30 @@
+import contextlib
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main import question_io
+
+
+class Command(BaseCommand):
+    help = 'Stream the question bank (with answer keys) to a CSV, JSONL or JSON array file. Use "-" for stdout.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=question_io.FORMATS, help='Defaults to the file extension (.jsonl/.ndjson, .json, else csv)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or question_io.guess_format(path)
+        started = time.perf_counter()
+        try:
+            fp = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'Cannot open {path}: {exc}')
+        # stdout is not ours to close
+        with contextlib.nullcontext(fp) if path == '-' else fp:
+            count = question_io.export_rows(fp, fmt)
+        seconds = time.perf_counter() - started
+        rate = count / seconds if seconds else 0
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} questions in {seconds:.2f}s, {rate:.0f} rows/s'))
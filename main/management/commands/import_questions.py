@@ -0,0 +1,40 @@
+import contextlib
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main import question_io
+
+
+class Command(BaseCommand):
+    help = ('Import questions from a CSV, JSONL or JSON array file (streamed, validated, deduplicated on text, '
+            'bulk inserted in one transaction). Use "-" to read stdin.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=question_io.FORMATS, help='Defaults to the file extension (.jsonl/.ndjson, .json, else csv)')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Validate and count without writing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or question_io.guess_format(path)
+        try:
+            fp = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        except OSError as exc:
+            raise CommandError(f'Cannot open {path}: {exc}')
+        # stdin is not ours to close
+        with contextlib.nullcontext(fp) if path == '-' else fp:
+            try:
+                stats = question_io.import_rows(question_io.read_rows(fp, fmt), batch_size=options['batch_size'],
+                                                dry_run=options['dry_run'])
+            except ValueError as exc:
+                raise CommandError(f'Cannot read {path}: {exc}')
+
+        for line, message in stats.errors:
+            self.stderr.write(f'line {line}: {message}')
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {stats.created} questions from {stats.read} rows '
+            f'({stats.duplicates} duplicates, {stats.invalid} invalid) '
+            f'in {stats.seconds:.2f}s, {stats.rows_per_second:.0f} rows/s'))
@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from main.models import Question
+from main import question_io
 
 SAMPLES = [
     ("ما هو اختصار HTML؟", ["HyperText Markup Language","HighText Machine Language","Hyperlink and Text Markup","Home Tool Markup Language"], 0),
@@ -34,18 +34,12 @@ SAMPLES = [
 ]
 
 class Command(BaseCommand):
-    help = 'Load 30 sample questions into the DB'
+    help = 'Load 30 sample questions into the DB (skips questions that already exist)'
 
     def handle(self, *args, **options):
-        created = 0
-        for text, opts, correct in SAMPLES:
-            q = Question.objects.create(
-                text=text,
-                option_a=opts[0],
-                option_b=opts[1],
-                option_c=opts[2],
-                option_d=opts[3],
-                correct_index=correct
-            )
-            created += 1
-        self.stdout.write(self.style.SUCCESS(f'Created {created} sample questions'))
+        rows = (
+            (i, {'text': text, 'options': opts, 'correct_index': correct})
+            for i, (text, opts, correct) in enumerate(SAMPLES, start=1)
+        )
+        stats = question_io.import_rows(rows)
+        self.stdout.write(self.style.SUCCESS(f'Created {stats.created} sample questions ({stats.duplicates} already present)'))
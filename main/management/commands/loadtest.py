@@ -0,0 +1,181 @@
+import importlib.util
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from main import loadtest
+
+
+class Command(BaseCommand):
+    help = ("Recruitment-day load test: seeds trainers/cadets, stubs Discord locally, starts "
+            "the server (gunicorn + uvicorn worker as in the Procfile, or runserver) and drives "
+            "simulated applicants and trainers against it. Reports throughput, p50/p95/p99 "
+            "latency per endpoint and SQL queries per view (from /metrics). Seeded rows and "
+            "the run's audit entries are deleted and the application setting restored "
+            "afterwards unless --keep-data.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=50, help='Concurrent applicants')
+        parser.add_argument('--trainers', type=int, default=10, help='Trainers (each one logged in)')
+        parser.add_argument('--cadets-per-trainer', type=int, default=5)
+        parser.add_argument('--duration', type=float, default=300, help='Seconds, ramp-up included')
+        parser.add_argument('--ramp', type=float, default=30, help='Seconds over which users arrive')
+        parser.add_argument('--think-scale', type=float, default=1.0,
+                            help='Multiplier for think times and countdowns (0 = no pauses)')
+        parser.add_argument('--fetch-questions', action='store_true',
+                            help='Fetch /api/question/<id>/ before each answer, as pages cached '
+                                 'before the question bundle did')
+        parser.add_argument('--url', help='Test an already running server instead of starting one '
+                                          '(it must use DISCORD_API_BASE=<stub url> printed below, and '
+                                          'should use DISCORD_LOG_CHANNEL_ID=\'\')')
+        parser.add_argument('--server', choices=('gunicorn', 'runserver'), default='gunicorn')
+        parser.add_argument('--workers', type=int, default=1, help='gunicorn worker processes')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--discord-port', type=int, default=0)
+        parser.add_argument('--discord-latency', type=float, default=150, help='Stub response time, ms')
+        parser.add_argument('--discord-429', type=float, default=0.0,
+                            help='Fraction of stub responses that are 429s')
+        parser.add_argument('--keep-data', action='store_true', help='Leave the seeded rows in place')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING('DEBUG is on: every SQL query is also kept in memory, '
+                                                 'so numbers will be worse than production.'))
+        if options['workers'] > 1 and 'locmem' in settings.CACHES['default']['BACKEND'].lower():
+            self.stderr.write(self.style.WARNING('Several workers with the per-process LocMem cache: OAuth '
+                                                 'status polls and unread versions are not shared; set REDIS_URL.'))
+
+        stub = loadtest.DiscordStub(port=options['discord_port'], latency=options['discord_latency'] / 1000,
+                                    rate_limit=options['discord_429']).start()
+        self.stdout.write(f'Discord stub on {stub.url}')
+        accounts = loadtest.seed(options['trainers'], options['cadets_per_trainer'])
+        server = log_path = None
+        try:
+            if options['url']:
+                base_url = options['url'].rstrip('/')
+                metrics_token = getattr(settings, 'METRICS_TOKEN', '')
+            else:
+                base_url = f'http://127.0.0.1:{options["port"]}'
+                metrics_token = secrets.token_urlsafe(16)
+                if not settings.DEBUG:
+                    # the manifest storage needs collected files, as after a deploy
+                    call_command('collectstatic', interactive=False, verbosity=0)
+                server, log_path = self._start_server(options, stub.url, metrics_token)
+                self._wait_ready(base_url, server, log_path)
+
+            self.stdout.write(f'{options["applicants"]} applicants, {len(accounts)} trainers against '
+                              f'{base_url} for {options["duration"]:.0f}s...')
+            recorder = loadtest.run_wave(base_url, accounts, options['applicants'], options['duration'],
+                                         ramp=options['ramp'], think_scale=options['think_scale'],
+                                         fetch_questions=options['fetch_questions'])
+            db = None
+            if metrics_token:
+                try:
+                    db = loadtest.scrape_db_stats(base_url, metrics_token)
+                except requests.RequestException as exc:
+                    self.stderr.write(self.style.WARNING(f'Could not read /metrics: {exc}'))
+            else:
+                self.stderr.write(self.style.WARNING('METRICS_TOKEN is not set; no DB numbers.'))
+            self._report(recorder, db, stub, options)
+        finally:
+            if server is not None:
+                server.terminate()
+                try:
+                    server.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+                self.stdout.write(f'Server log: {log_path}')
+            stub.stop()
+            if not options['keep_data']:
+                loadtest.cleanup()
+
+    def _start_server(self, options, discord_url, metrics_token):
+        # no audit-channel posts: simulated logins and tests would otherwise be
+        # queued for the real worker to send to the production channel
+        env = dict(os.environ, DISCORD_API_BASE=discord_url, DISCORD_CLIENT_ID='loadtest',
+                   DISCORD_CLIENT_SECRET='loadtest', DISCORD_LOG_CHANNEL_ID='', METRICS_TOKEN=metrics_token,
+                   SECURE_SSL_REDIRECT='False')
+        bind = f'127.0.0.1:{options["port"]}'
+        if options['server'] == 'gunicorn':
+            if importlib.util.find_spec('gunicorn') is None or importlib.util.find_spec('uvicorn_worker') is None:
+                raise CommandError('gunicorn/uvicorn-worker are not installed; use --server runserver')
+            cmd = [sys.executable, '-m', 'gunicorn', 'myproject.asgi:application', '-k',
+                   'uvicorn_worker.UvicornWorker', '--bind', bind, '--workers', str(options['workers'])]
+        else:
+            cmd = [sys.executable, 'manage.py', 'runserver', bind, '--noreload']
+        log = tempfile.NamedTemporaryFile('w', prefix='loadtest-server-', suffix='.log', delete=False)
+        server = subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+        return server, log.name
+
+    def _wait_ready(self, base_url, server, log_path, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'The server exited with {server.returncode}; see {log_path}')
+            try:
+                requests.get(f'{base_url}/api/apply_status/', timeout=2)
+                return
+            except requests.RequestException:
+                time.sleep(0.5)
+        raise CommandError(f'The server did not start within {timeout}s; see {log_path}')
+
+    def _report(self, recorder, db, stub, options):
+        rows = recorder.summary()
+        total = sum(r['count'] for r in rows)
+        errors = sum(r['errors'] for r in rows)
+
+        def ms(value):
+            return f'{value * 1000:>8.1f}' if value is not None else f'{"-":>8}'
+
+        self.stdout.write('')
+        self.stdout.write(f'{"endpoint":<34} {"n":>7} {"err":>5} {"req/s":>7} '
+                          f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+        for r in rows:
+            self.stdout.write(f'{r["method"] + " " + r["view"]:<34} {r["count"]:>7} {r["errors"]:>5} '
+                              f'{r["rps"]:>7.2f} {ms(r["p50"])} {ms(r["p95"])} {ms(r["p99"])} {ms(r["max"])}')
+        self.stdout.write(f'{"total":<34} {total:>7} {errors:>5} {total / recorder.elapsed:>7.2f}')
+
+        db_rows = []
+        if db:
+            client_rps = {}
+            for r in rows:
+                client_rps[r['view']] = client_rps.get(r['view'], 0.0) + r['rps']
+            for view, s in sorted(db.items(), key=lambda item: -item[1]['queries']):
+                if view not in client_rps or not s['requests']:
+                    continue
+                per_request = s['queries'] / s['requests']
+                db_rows.append({'view': view, 'queries_per_request': per_request,
+                                'db_ms_per_request': s['seconds'] / s['requests'] * 1000,
+                                'queries_per_second': per_request * client_rps[view]})
+            self.stdout.write('')
+            self.stdout.write(f'{"view (server side)":<34} {"queries/req":>11} {"db ms/req":>10} {"queries/s":>10}')
+            for d in db_rows:
+                self.stdout.write(f'{d["view"]:<34} {d["queries_per_request"]:>11.2f} '
+                                  f'{d["db_ms_per_request"]:>10.2f} {d["queries_per_second"]:>10.1f}')
+            self.stdout.write(f'{"total":<34} {"":>11} {"":>10} '
+                              f'{sum(d["queries_per_second"] for d in db_rows):>10.1f}')
+
+        self.stdout.write('')
+        self.stdout.write('Discord stub calls: ' + (', '.join(f'{k} x{n}' for k, n in sorted(stub.calls.items()))
+                                                     or 'none'))
+        style = self.style.SUCCESS if not errors else self.style.WARNING
+        self.stdout.write(style(f'{total} requests in {recorder.elapsed:.1f}s, {errors} errors'))
+
+        if options['json_path']:
+            config = {k: options[k] for k in ('applicants', 'trainers', 'cadets_per_trainer', 'duration',
+                                              'ramp', 'think_scale', 'fetch_questions', 'server', 'workers',
+                                              'discord_latency', 'discord_429')}
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump({'config': config, 'elapsed': recorder.elapsed, 'endpoints': rows, 'db': db_rows,
+                           'discord': dict(stub.calls)}, f, indent=2)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main import conversations
+
+
+class Command(BaseCommand):
+    help = 'Recount the Conversation summary table from Message rows (after bulk edits that bypass signals).'
+
+    def handle(self, *args, **options):
+        count = conversations.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} conversations'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main import reopen
+
+
+class Command(BaseCommand):
+    help = 'Reopen applications whose close_with_timer time has passed. Runs forever unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Apply what is due now and exit (for cron)')
+        parser.add_argument('--interval', type=float, default=30.0, help='Longest sleep between checks')
+
+    def handle(self, *args, **options):
+        while True:
+            setting_reopened, apps_reopened = reopen.apply_due()
+            if setting_reopened or apps_reopened:
+                self.stdout.write(f'reopen: global {setting_reopened}, applications {apps_reopened}')
+            if options['once']:
+                return
+
+            # sleep until the next scheduled reopen, but never longer than --interval
+            # so timers set in the meantime are picked up
+            wait = options['interval']
+            due = reopen.next_due()
+            if due is not None:
+                wait = min(wait, max((due - timezone.now()).total_seconds(), 0.0) + 0.05)
+            time.sleep(wait)
@@ -0,0 +1,219 @@
+"""Per-request performance metrics, exposed in Prometheus text format.
+
+MetricsMiddleware times every request and, through connection.execute_wrapper,
+counts the SQL queries it runs and the time they take. DiscordClient reports
+each outbound Discord call (see discord_utils.py) with its latency. Totals are
+kept per view in process memory and served by metrics_view at /metrics; like
+prometheus_client without its multiprocess mode, every worker process keeps
+its own numbers, which Prometheus sums across scrapes of each instance.
+
+Admins also get a Server-Timing header (app, db and discord durations), which
+the browser dev tools show next to each request.
+
+The cost per request is a few perf_counter() calls, one lock acquisition and
+one extra function call per SQL query, so it stays enabled in production.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNRESOLVED = '<unresolved>'
+
+
+class _RequestStats:
+    __slots__ = ('sql_count', 'sql_seconds', 'discord_count', 'discord_seconds')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.discord_count = 0
+        self.discord_seconds = 0.0
+
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += 1
+        self.sum += value
+
+
+class Registry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = defaultdict(int)              # (view, method, status) -> n
+            self.latency = defaultdict(_Histogram)        # (view, method) -> histogram
+            self.sql_queries = defaultdict(int)           # view -> n
+            self.sql_seconds = defaultdict(float)         # view -> seconds
+            self.discord_calls = defaultdict(int)         # (route, status) -> n
+            self.discord_latency = defaultdict(_Histogram)  # route -> histogram
+
+    def observe_request(self, view, method, status, seconds, stats):
+        with self.lock:
+            self.requests[(view, method, status)] += 1
+            self.latency[(view, method)].observe(seconds)
+            self.sql_queries[view] += stats.sql_count
+            self.sql_seconds[view] += stats.sql_seconds
+
+    def observe_discord(self, route, status, seconds):
+        with self.lock:
+            self.discord_calls[(route, status)] += 1
+            self.discord_latency[route].observe(seconds)
+
+    def render(self):
+        """Prometheus text exposition (format 0.0.4)."""
+        lines = []
+        with self.lock:
+            lines += ['# HELP http_requests_total Requests by view, method and status.',
+                      '# TYPE http_requests_total counter']
+            for (view, method, status), n in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{_labels(view=view, method=method, status=status)} {n}')
+            lines += ['# HELP http_request_duration_seconds Request latency by view.',
+                      '# TYPE http_request_duration_seconds histogram']
+            for (view, method), hist in sorted(self.latency.items()):
+                lines += _histogram_lines('http_request_duration_seconds', hist, view=view, method=method)
+            lines += ['# HELP db_queries_total SQL queries run while serving each view.',
+                      '# TYPE db_queries_total counter']
+            for view, n in sorted(self.sql_queries.items()):
+                lines.append(f'db_queries_total{_labels(view=view)} {n}')
+            lines += ['# HELP db_query_seconds_total Time spent in SQL while serving each view.',
+                      '# TYPE db_query_seconds_total counter']
+            for view, seconds in sorted(self.sql_seconds.items()):
+                lines.append(f'db_query_seconds_total{_labels(view=view)} {seconds:.6f}')
+            lines += ['# HELP discord_requests_total Outbound Discord API calls by route and status.',
+                      '# TYPE discord_requests_total counter']
+            for (route, status), n in sorted(self.discord_calls.items()):
+                lines.append(f'discord_requests_total{_labels(route=route, status=status)} {n}')
+            lines += ['# HELP discord_request_duration_seconds Outbound Discord API call latency.',
+                      '# TYPE discord_request_duration_seconds histogram']
+            for route, hist in sorted(self.discord_latency.items()):
+                lines += _histogram_lines('discord_request_duration_seconds', hist, route=route)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _histogram_lines(name, hist, **labels):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), hist.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{_labels(**labels, le=bound)} {cumulative}')
+    lines.append(f'{name}_sum{_labels(**labels)} {hist.sum:.6f}')
+    lines.append(f'{name}_count{_labels(**labels)} {hist.total}')
+    return lines
+
+
+registry = Registry()
+
+
+def observe_discord(route, status, seconds):
+    """Called by DiscordClient after every HTTP call (status None on errors)."""
+    registry.observe_discord(route, status if status is not None else 'error', seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.discord_count += 1
+        stats.discord_seconds += seconds
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.sql_count += 1
+            stats.sql_seconds += time.perf_counter() - start
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else UNRESOLVED
+
+
+def _is_admin(request):
+    session = getattr(request, 'session', None)
+    if session is None or not session.get('uid'):
+        return False
+    from .middleware import get_session_user  # models aren't importable when discord_utils loads this
+    user = get_session_user(request)
+    return user is not None and user.has_dashboard_access()
+
+
+def _loaded_admin(request):
+    """_is_admin() for a user the view already resolved; never queries.
+
+    Loading the session (and user) just to decide on Server-Timing would add
+    a query to polls that otherwise run none.
+    """
+    cached = getattr(request, '_session_user', None)
+    session = getattr(request, 'session', None)
+    if cached is None or session is None or not session.accessed or cached[0] != session.get('uid'):
+        return False
+    return cached[1] is not None and cached[1].has_dashboard_access()
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = _RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(_sql_wrapper):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - start
+
+        view = _view_name(request)
+        if view != 'metrics':
+            registry.observe_request(view, request.method, response.status_code, elapsed, stats)
+        if _loaded_admin(request):
+            response['Server-Timing'] = (
+                f'app;dur={elapsed * 1000:.1f}, '
+                f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.sql_count} queries", '
+                f'discord;dur={stats.discord_seconds * 1000:.1f};desc="{stats.discord_count} calls"')
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint: bearer METRICS_TOKEN, or an admin session."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    auth = request.headers.get('Authorization', '')
+    allowed = (token and auth.startswith('Bearer ') and constant_time_compare(auth[7:], token))
+    if not allowed and not _is_admin(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,51 @@
+"""Request-scoped resolution of the session user.
+
+The app authenticates with request.session['uid'] instead of django.contrib.auth,
+and used to load the User row every time get_session_user() was called (the
+rank_required decorator, the view itself and audit logging each did it).
+The user is now resolved once per request and memoised on the request; the
+row itself is also kept in the cache for SESSION_USER_CACHE_TTL seconds and
+dropped whenever the User is saved or deleted (see signals.py).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import User
+
+USER_CACHE_KEY = 'session_user:{}'
+
+
+def _ttl():
+    return getattr(settings, 'SESSION_USER_CACHE_TTL', 0)
+
+
+def load_user(uid):
+    """User row for `uid` (or None), served from the cache when enabled."""
+    ttl = _ttl()
+    if ttl <= 0:
+        return User.objects.filter(id=uid).first()
+    key = USER_CACHE_KEY.format(uid)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(id=uid).first()
+        if user is not None:
+            cache.set(key, user, ttl)
+    return user
+
+
+def invalidate_user(uid):
+    cache.delete(USER_CACHE_KEY.format(uid))
+
+
+def get_session_user(request):
+    uid = request.session.get('uid')
+    if not uid:
+        return None
+    # keyed by uid so a login/logout in the middle of the request is honoured
+    cached = getattr(request, '_session_user', None)
+    if cached is not None and cached[0] == uid:
+        return cached[1]
+    user = load_user(uid)
+    request._session_user = (uid, user)
+    return user
+
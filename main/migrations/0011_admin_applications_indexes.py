@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-17 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_remove_user_role_user_rank'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['is_hidden', 'submitted_at'], name='app_hidden_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testsession',
+            index=models.Index(fields=['application', 'started_at'], name='session_app_started_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:10
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    TestSession = apps.get_model('main', 'TestSession')
+    sessions = TestSession.objects.annotate(
+        n_answered=Count('answers'),
+        n_correct=Count('answers', filter=Q(answers__is_correct=True)),
+    ).filter(n_answered__gt=0)
+    for session in sessions.iterator():
+        TestSession.objects.filter(pk=session.pk).update(
+            answered_count=session.n_answered, correct_count=session.n_correct)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_application_reopen_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsession',
+            name='answered_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='testsession',
+            name='correct_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
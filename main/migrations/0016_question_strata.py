@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_testsession_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='category',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='difficulty',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Easy'), (2, 'Medium'), (3, 'Hard')], default=2),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_question_strata'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'receiver', 'id'], name='msg_pair_id_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_conversations(apps, schema_editor):
+    Message = apps.get_model('main', 'Message')
+    Conversation = apps.get_model('main', 'Conversation')
+    pairs = {}
+    # one grouped query over (sender, receiver); both directions merge per pair
+    directed = Message.objects.values('sender_id', 'receiver_id').annotate(
+        total=Count('id'), last_id=Max('id'), unread=Count('id', filter=Q(is_read=False)))
+    for row in directed:
+        low, high = sorted((row['sender_id'], row['receiver_id']))
+        entry = pairs.setdefault((low, high), {'total': 0, 'last_id': 0, 'unread_low': 0, 'unread_high': 0})
+        entry['total'] += row['total']
+        entry['last_id'] = max(entry['last_id'], row['last_id'])
+        entry['unread_low' if row['receiver_id'] == low else 'unread_high'] += row['unread']
+
+    last_at = dict(Message.objects.filter(id__in=[e['last_id'] for e in pairs.values()]).values_list('id', 'created_at'))
+    Conversation.objects.bulk_create([
+        Conversation(user_low_id=low, user_high_id=high, last_message_id=e['last_id'],
+                     last_message_at=last_at.get(e['last_id']), message_count=e['total'],
+                     unread_low=e['unread_low'], unread_high=e['unread_high'])
+        for (low, high), e in pairs.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_message_pair_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('unread_low', models.PositiveIntegerField(default=0)),
+                ('unread_high', models.PositiveIntegerField(default=0)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='main.message')),
+                ('user_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.user')),
+                ('user_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.user')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_low', '-last_message_at'], name='conv_low_last_idx'), models.Index(fields=['user_high', '-last_message_at'], name='conv_high_last_idx')],
+                'unique_together': {('user_low', 'user_high')},
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+from main import search
+
+
+def backfill_search_text(apps, schema_editor):
+    Application = apps.get_model('main', 'Application')
+    batch = []
+    for app in Application.objects.only('id', 'character_name', 'discord_id').iterator(chunk_size=2000):
+        app.search_text = search.search_text_for(app.character_name, app.discord_id)
+        batch.append(app)
+        if len(batch) >= 2000:
+            Application.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        Application.objects.bulk_update(batch, ['search_text'])
+
+
+def install_index(apps, schema_editor):
+    search.install_index(schema_editor)
+
+
+def uninstall_index(apps, schema_editor):
+    search.uninstall_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(install_index, uninstall_index),
+    ]
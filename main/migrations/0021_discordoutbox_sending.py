@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_application_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='discordoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+    ]
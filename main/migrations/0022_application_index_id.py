@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_discordoutbox_sending'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='application',
+            name='app_hidden_submitted_idx',
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['is_hidden', 'submitted_at', 'id'], name='app_hidden_submitted_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.hashers import make_password, check_password
 
+from . import search
+
 class User(models.Model):
     # Hierarchical rank system (highest to lowest)
     RANK_CHOICES = [
@@ -86,6 +89,10 @@ class Assignment(models.Model):
 
     class Meta:
         unique_together = ('trainer', 'cadet')
+        indexes = [
+            # cadet-side lookups (cadet dashboard, chat permission check)
+            models.Index(fields=['cadet', 'trainer'], name='assign_cadet_trainer_idx'),
+        ]
 
 class Evaluation(models.Model):
     trainer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='given_evaluations')
@@ -101,12 +108,57 @@ class Message(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # one direction of a conversation, newest first (chat pagination)
+            models.Index(fields=['sender', 'receiver', 'id'], name='msg_pair_id_idx'),
+            # unread badges / mark-read: only the (few) unread rows are indexed.
+            # Partial indexes are skipped on backends without support (MySQL),
+            # where the receiver FK index serves these lookups.
+            models.Index(fields=['receiver', 'sender'], condition=models.Q(is_read=False), name='msg_unread_idx'),
+        ]
+
+class Conversation(models.Model):
+    """Per-pair chat summary maintained by main/conversations.py.
+
+    The pair is stored ordered (user_low.id < user_high.id) so each
+    conversation has exactly one row; unread_low / unread_high count the
+    unread messages addressed to user_low / user_high.
+    """
+    user_low = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    user_high = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    last_message = models.ForeignKey(Message, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    last_message_at = models.DateTimeField(blank=True, null=True)
+    message_count = models.PositiveIntegerField(default=0)
+    unread_low = models.PositiveIntegerField(default=0)
+    unread_high = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user_low', 'user_high')
+        indexes = [
+            models.Index(fields=['user_low', '-last_message_at'], name='conv_low_last_idx'),
+            models.Index(fields=['user_high', '-last_message_at'], name='conv_high_last_idx'),
+        ]
+
+    def other(self, user_id):
+        return self.user_high if self.user_low_id == user_id else self.user_low
+
+    def unread_for(self, user_id):
+        return self.unread_low if self.user_low_id == user_id else self.unread_high
+
+
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # unread notifications of a user, newest first
+            models.Index(fields=['user', '-created_at'], condition=models.Q(is_read=False), name='notif_unread_idx'),
+        ]
+
 
 # --- New models for Applications and Testing ---
 class Application(models.Model):
@@ -125,6 +177,26 @@ class Application(models.Model):
     closed_message = models.TextField(blank=True, null=True)
     reopen_at = models.DateTimeField(blank=True, null=True)
     is_hidden = models.BooleanField(default=False)
+    # normalised name + Discord id for the admin search (see main/search.py)
+    search_text = models.CharField(max_length=200, blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            # admin applications list: non-hidden, newest first, keyset paginated on (submitted_at, id)
+            models.Index(fields=['is_hidden', 'submitted_at', 'id'], name='app_hidden_submitted_idx'),
+            # scheduled reopen scan (main/reopen.py)
+            models.Index(fields=['status', 'reopen_at'], name='app_status_reopen_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.search_text = search.search_text_for(self.character_name, self.discord_id)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'character_name', 'discord_id'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'search_text'}
+        super().save(*args, **kwargs)
+
+    def reopen_due(self, now=None):
+        return bool(self.reopen_at and self.reopen_at <= (now or timezone.now()))
 
     def __str__(self):
         return f"Application {self.id} - {self.character_name} ({self.discord_id})"
@@ -141,6 +213,12 @@ class ApplicationSetting(models.Model):
     reopen_at = models.DateTimeField(blank=True, null=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def is_open(self, now=None):
+        """Open, or closed with a reopen time that has already passed."""
+        if self.status != 'closed':
+            return True
+        return bool(self.reopen_at and self.reopen_at <= (now or timezone.now()))
+
     def __str__(self):
         return f"ApplicationSetting ({self.status})"
 
@@ -153,6 +231,14 @@ class Question(models.Model):
     option_c = models.CharField(max_length=255)
     option_d = models.CharField(max_length=255)
     correct_index = models.IntegerField(help_text='0..3')
+    # optional strata for the question sampler (main/questions.py)
+    DIFFICULTY_CHOICES = [
+        (1, 'Easy'),
+        (2, 'Medium'),
+        (3, 'Hard'),
+    ]
+    category = models.CharField(max_length=50, blank=True, default='')
+    difficulty = models.PositiveSmallIntegerField(choices=DIFFICULTY_CHOICES, default=2)
 
     def options(self):
         return [self.option_a, self.option_b, self.option_c, self.option_d]
@@ -173,6 +259,15 @@ class TestSession(models.Model):
     session_token = models.CharField(max_length=64, unique=True, blank=True, null=True)
     # Discord ID of the person who started this session (for security verification)
     discord_id = models.CharField(max_length=64, blank=True, null=True)
+    # running totals kept by apply_submit_answer (saves two COUNT queries per answer)
+    answered_count = models.PositiveSmallIntegerField(default=0)
+    correct_count = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # latest session per application
+            models.Index(fields=['application', 'started_at'], name='session_app_started_idx'),
+        ]
 
     def question_ids(self):
         if not self.questions_order:
@@ -217,3 +312,71 @@ class AuditTemplate(models.Model):
 
     def __str__(self):
         return f"Template {self.key}"
+
+
+class DiscordOutbox(models.Model):
+    """Discord channel posts waiting to be delivered.
+
+    Rows are written in the request path and sent by the
+    `drain_discord_outbox` management command.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    channel_id = models.CharField(max_length=64)
+    content = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"Outbox {self.id} -> #{self.channel_id} ({self.status})"
+
+
+class ApplicationJob(models.Model):
+    """One Discord side-effect step of an application pipeline (e.g. final_accept).
+
+    Steps of the same application run in `order`; each (application, step)
+    exists once, so enqueuing a pipeline twice is a no-op.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    STEP_CHOICES = [
+        ('resolve_username', 'اسم المستخدم'),
+        ('send_credentials', 'رسالة الدخول'),
+        ('add_role', 'الرتبة'),
+    ]
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='jobs')
+    step = models.CharField(max_length=50, choices=STEP_CHOICES)
+    order = models.IntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    payload = models.JSONField(default=dict, blank=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('application', 'step')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='appjob_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.step} for application {self.application_id} ({self.status})"
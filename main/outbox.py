@@ -0,0 +1,90 @@
+"""Durable outbox for Discord channel posts.
+
+The request path only inserts a DiscordOutbox row (enqueue_channel_message);
+the `drain_discord_outbox` management command delivers pending rows in
+batches, retrying failures with exponential backoff.
+"""
+import datetime
+import logging
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DiscordOutbox
+from . import discord_utils
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+MAX_BACKOFF_SECONDS = 300
+# a 'sending' row whose drainer died is picked up again after this long
+SENDING_LEASE = datetime.timedelta(minutes=5)
+
+
+def enqueue_channel_message(channel_id, message):
+    """Queue a message for a Discord channel. Returns the outbox row."""
+    return DiscordOutbox.objects.create(channel_id=str(channel_id), content=message)
+
+
+def backoff_delay(attempts):
+    return datetime.timedelta(seconds=min(MAX_BACKOFF_SECONDS, 5 * 2 ** (attempts - 1)))
+
+
+def _claim(batch_size):
+    """Mark up to batch_size due rows as sending and return them.
+
+    Rows are locked with SKIP LOCKED where the backend supports it, so several
+    drainers can run side by side without double-posting. The claim is a
+    lease: a row whose drainer died is due again after SENDING_LEASE.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        qs = DiscordOutbox.objects.filter(
+            status__in=['pending', 'sending'], next_attempt_at__lte=now).order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        batch = list(qs[:batch_size])
+        DiscordOutbox.objects.filter(id__in=[item.id for item in batch]).update(
+            status='sending', next_attempt_at=now + SENDING_LEASE)
+    return batch
+
+
+def drain(batch_size=20, max_attempts=MAX_ATTEMPTS):
+    """Send one batch of due outbox rows. Returns (sent, failed) counts.
+
+    The Discord calls are made after the claim has committed, so no row lock
+    is held while waiting on the network.
+    """
+    sent = failed = 0
+    for item in _claim(batch_size):
+        item.attempts += 1
+        try:
+            ok = discord_utils.send_channel_message(item.channel_id, item.content)
+            error = None if ok else 'send_channel_message returned False'
+        except Exception as exc:
+            ok = False
+            error = repr(exc)
+
+        now = timezone.now()
+        if ok:
+            item.status = 'sent'
+            item.sent_at = now
+            item.last_error = None
+            sent += 1
+        else:
+            item.last_error = error
+            if item.attempts >= max_attempts:
+                item.status = 'failed'
+                logger.error('discord outbox: giving up on %s after %s attempts: %s', item.id, item.attempts, error)
+            else:
+                item.status = 'pending'
+                item.next_attempt_at = now + backoff_delay(item.attempts)
+            failed += 1
+        item.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'])
+    return sent, failed
+
+
+def purge_sent(older_than_days=7):
+    cutoff = timezone.now() - datetime.timedelta(days=older_than_days)
+    deleted, _ = DiscordOutbox.objects.filter(status='sent', sent_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,183 @@
+"""Streaming import/export of the question bank (CSV, JSON Lines or a JSON array).
+
+Rows are read one at a time, validated, deduplicated on their normalised text
+(against the bank and the file itself) and written with bulk_create in
+batches, all inside one transaction. Export streams rows out of the database
+with iterator(), so neither side holds the whole bank in memory (except a
+JSON array on import, which has to be parsed as one document).
+"""
+import csv
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .models import Question
+from . import questions
+
+FIELDS = ('text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_index', 'category', 'difficulty')
+FORMATS = ('csv', 'jsonl', 'json')
+DIFFICULTIES = {value for value, _ in Question.DIFFICULTY_CHOICES}
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)  # (line, message), first few only
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def guess_format(path):
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'json' if path.endswith('.json') else 'csv'
+
+
+def _text_key(text):
+    # collapse whitespace/case so trivially different copies count as duplicates
+    return hashlib.sha1(' '.join(text.split()).casefold().encode('utf-8')).digest()
+
+
+def read_rows(fp, fmt):
+    """Yield (line number, dict) from an open text file."""
+    if fmt == 'csv':
+        reader = csv.DictReader(fp)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_no, line in enumerate(fp, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_no, exc
+                continue
+            yield line_no, row
+    elif fmt == 'json':
+        rows = json.load(fp)
+        if not isinstance(rows, list):
+            raise ValueError('a JSON file must hold an array of questions (use .jsonl for one per line)')
+        yield from enumerate(rows, start=1)
+    else:
+        raise ValueError(f'unknown format {fmt!r}')
+
+
+def validate(row):
+    """Question kwargs for one input row; raises ValueError with a reason."""
+    if not isinstance(row, dict):
+        raise ValueError('row is not an object')
+    options = row.get('options')
+    if options is not None:
+        if not isinstance(options, list) or len(options) != 4:
+            raise ValueError('options must be a list of 4 strings')
+        row = dict(row, option_a=options[0], option_b=options[1], option_c=options[2], option_d=options[3])
+
+    text = str(row.get('text') or '').strip()
+    if not text:
+        raise ValueError('text is empty')
+    opts = [str(row.get(k) or '').strip() for k in ('option_a', 'option_b', 'option_c', 'option_d')]
+    if not all(opts):
+        raise ValueError('all four options are required')
+    if any(len(o) > 255 for o in opts):
+        raise ValueError('option longer than 255 characters')
+    try:
+        correct = int(row.get('correct_index'))
+    except (TypeError, ValueError):
+        raise ValueError('correct_index must be 0..3')
+    if not 0 <= correct <= 3:
+        raise ValueError('correct_index must be 0..3')
+    category = str(row.get('category') or '').strip()
+    if len(category) > 50:
+        raise ValueError('category longer than 50 characters')
+    try:
+        difficulty = int(row.get('difficulty') or 2)
+    except (TypeError, ValueError):
+        raise ValueError('difficulty must be 1, 2 or 3')
+    if difficulty not in DIFFICULTIES:
+        raise ValueError('difficulty must be 1, 2 or 3')
+
+    return {
+        'text': text, 'option_a': opts[0], 'option_b': opts[1], 'option_c': opts[2], 'option_d': opts[3],
+        'correct_index': correct, 'category': category, 'difficulty': difficulty,
+    }
+
+
+def import_rows(rows, batch_size=500, dry_run=False, max_errors=20):
+    """Import (line, row) pairs as produced by read_rows. Returns ImportStats."""
+    stats = ImportStats()
+    started = time.perf_counter()
+    seen = {_text_key(t) for t in Question.objects.values_list('text', flat=True).iterator(chunk_size=2000)}
+    batch = []
+
+    with transaction.atomic():
+        for line, row in rows:
+            stats.read += 1
+            try:
+                if isinstance(row, Exception):
+                    raise ValueError(f'invalid JSON: {row}')
+                data = validate(row)
+            except ValueError as exc:
+                stats.invalid += 1
+                if len(stats.errors) < max_errors:
+                    stats.errors.append((line or stats.read, str(exc)))
+                continue
+
+            key = _text_key(data['text'])
+            if key in seen:
+                stats.duplicates += 1
+                continue
+            seen.add(key)
+            batch.append(Question(**data))
+            if len(batch) >= batch_size:
+                if not dry_run:
+                    Question.objects.bulk_create(batch)
+                stats.created += len(batch)
+                batch = []
+
+        if batch:
+            if not dry_run:
+                Question.objects.bulk_create(batch)
+            stats.created += len(batch)
+
+    if stats.created and not dry_run:
+        questions.bump_version()  # bulk_create sends no post_save
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def export_rows(fp, fmt, chunk_size=2000):
+    """Write every question to fp; returns the number of rows written."""
+    qs = Question.objects.order_by('id').values_list(*FIELDS).iterator(chunk_size=chunk_size)
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(fp)
+        writer.writerow(FIELDS)
+        for values in qs:
+            writer.writerow(values)
+            count += 1
+    elif fmt == 'jsonl':
+        for values in qs:
+            fp.write(json.dumps(dict(zip(FIELDS, values)), ensure_ascii=False))
+            fp.write('\n')
+            count += 1
+    elif fmt == 'json':
+        fp.write('[')
+        for values in qs:
+            fp.write(',\n' if count else '\n')
+            fp.write(json.dumps(dict(zip(FIELDS, values)), ensure_ascii=False))
+            count += 1
+        fp.write('\n]\n')
+    else:
+        raise ValueError(f'unknown format {fmt!r}')
+    return count
@@ -0,0 +1,136 @@
+"""In-memory cache of the question bank.
+
+Each process keeps every Question row as a small tuple keyed by id. A version
+number in the cache is bumped whenever a question is saved or deleted (see
+signals.py, and import_questions for bulk inserts); a process that sees a new
+version reloads the whole bank with one query. The version only reaches other
+processes through a shared cache (REDIS_URL); with the per-process LocMem
+cache it expires after UNSHARED_VERSION_TTL seconds instead, so an edit made
+elsewhere shows up at the next reload. The answer key never leaves the
+server: public_bundle() returns only the text and the options.
+
+sample() draws a test's questions from the cached id list (optionally
+stratified by category or difficulty), so starting a test costs the same
+whatever the size of the bank.
+"""
+import random
+import time
+
+from django.core.cache import cache
+
+from .checks import cache_is_shared
+from .models import Question
+
+VERSION_KEY = 'questions_v'
+VERSION_TTL = 60 * 60 * 24
+UNSHARED_VERSION_TTL = 30
+
+# replaced as a whole on reload, so readers always see a consistent snapshot
+_state = {'version': None, 'rows': {}, 'ids': [], 'strata': {}}
+
+STRATA_FIELDS = ('category', 'difficulty')
+
+
+def _version_ttl():
+    return VERSION_TTL if cache_is_shared() else UNSHARED_VERSION_TTL
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), _version_ttl())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), _version_ttl())
+
+
+def _load():
+    rows = {}
+    strata = {field: {} for field in STRATA_FIELDS}
+    for qid, text, a, b, c, d, correct, category, difficulty in Question.objects.order_by('id').values_list(
+            'id', 'text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_index', 'category', 'difficulty'):
+        rows[qid] = (text, (a, b, c, d), correct)
+        strata['category'].setdefault(category, []).append(qid)
+        strata['difficulty'].setdefault(difficulty, []).append(qid)
+    return rows, strata
+
+
+def _current():
+    global _state
+    version = _version()
+    state = _state
+    if state['version'] == version:
+        return state
+    rows, strata = _load()
+    state = {'version': version, 'rows': rows, 'ids': list(rows), 'strata': strata}
+    _state = state
+    return state
+
+
+def bank():
+    """{question id: (text, options, correct_index)} for the whole bank."""
+    return _current()['rows']
+
+
+def _allocate(sizes, n):
+    """Split n draws across strata in proportion to their size (largest remainder)."""
+    total = sum(sizes.values())
+    quotas = {key: n * size / total for key, size in sizes.items()}
+    counts = {key: min(int(q), sizes[key]) for key, q in quotas.items()}
+    by_remainder = sorted(sizes, key=lambda k: quotas[k] - int(quotas[k]), reverse=True)
+    while sum(counts.values()) < n:
+        progressed = False
+        for key in by_remainder:
+            if sum(counts.values()) == n:
+                break
+            if counts[key] < sizes[key]:
+                counts[key] += 1
+                progressed = True
+        if not progressed:
+            break
+    return counts
+
+
+def sample(n, by=None, rng=random):
+    """n distinct question ids in random order, or None if the bank is too small.
+
+    `by` is 'category' or 'difficulty' to draw from every stratum in
+    proportion to its share of the bank; anything else samples uniformly.
+    """
+    state = _current()
+    if len(state['rows']) < n:
+        return None
+    if by not in STRATA_FIELDS:
+        return rng.sample(state['ids'], n)
+
+    groups = state['strata'][by]
+    counts = _allocate({key: len(ids) for key, ids in groups.items()}, n)
+    chosen = []
+    for key, count in counts.items():
+        chosen.extend(rng.sample(groups[key], count))
+    rng.shuffle(chosen)
+    return chosen
+
+
+def public_question(qid):
+    row = bank().get(qid)
+    if row is None:
+        return None
+    text, options, _ = row
+    return {'id': qid, 'text': text, 'options': list(options)}
+
+
+def public_bundle(qids):
+    """Questions of a test session in order, without the answer key."""
+    return [q for q in (public_question(qid) for qid in qids) if q is not None]
+
+
+def correct_index(qid):
+    row = bank().get(qid)
+    return row[2] if row is not None else None
@@ -0,0 +1,47 @@
+"""Scheduled reopening of timed closures.
+
+close_with_timer (global or per application) stores reopen_at; apply_due()
+performs the transitions once they are due. It is called by the
+discord_worker loop (and the reopen_applications command for cron use), so
+apply_page no longer writes anything on a GET.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Application, ApplicationSetting
+
+
+def apply_due(now=None):
+    """Reopen everything whose reopen_at has passed.
+
+    Returns (setting_reopened, applications_reopened).
+    """
+    now = now or timezone.now()
+    setting_reopened = False
+    with transaction.atomic():
+        setting = (ApplicationSetting.objects.select_for_update()
+                   .filter(id=1, status='closed', reopen_at__lte=now).first())
+        if setting is not None:
+            setting.status = 'open'
+            setting.reopen_at = None
+            setting.closed_message = ''
+            setting.save()  # post_save refreshes the cached copy
+            setting_reopened = True
+
+        # one UPDATE covers both the global timer (it stamps reopen_at on the
+        # applications it closed) and per-application timers
+        reopened = Application.objects.filter(status='closed', reopen_at__lte=now).update(
+            status='open', reopen_at=None, closed_message='')
+    return setting_reopened, reopened
+
+
+def next_due():
+    """Earliest pending reopen time, or None."""
+    times = [
+        ApplicationSetting.objects.filter(status='closed', reopen_at__isnull=False)
+        .order_by('reopen_at').values_list('reopen_at', flat=True).first(),
+        Application.objects.filter(status='closed', reopen_at__isnull=False)
+        .order_by('reopen_at').values_list('reopen_at', flat=True).first(),
+    ]
+    times = [t for t in times if t is not None]
+    return min(times) if times else None
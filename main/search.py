@@ -0,0 +1,136 @@
+"""Applicant search for the admin applications list.
+
+Application.search_text holds a normalised copy of the character name and
+Discord id (lower case, Arabic diacritics/tatweel removed, letter variants
+folded). It is indexed per backend by migration 0020:
+
+- PostgreSQL: pg_trgm GIN index, ranked by trigram similarity.
+- SQLite: FTS5 table with the trigram tokenizer (kept in sync by triggers),
+  ranked by where the term occurs (exact, prefix, word start, anywhere).
+  bm25() would need one FTS lookup per matched row to annotate.
+- anything else: a plain substring filter on search_text, ranked as SQLite.
+
+Queries shorter than three characters cannot use trigram indexes and fall
+back to the substring filter on every backend.
+
+Note for SQLite: a migration that rebuilds main_application (AlterField and
+friends) drops the sync triggers; call install_index() again afterwards.
+The main.W002 system check and a test report missing triggers.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'main_application_fts'
+MIN_INDEXED_LENGTH = 3
+
+# harakat, Quranic marks, superscript alef and tatweel
+_ARABIC_MARKS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    'ک': 'ك', 'ی': 'ي',
+})
+
+
+def normalize(text):
+    """Lower-case, fold Arabic letter variants and collapse whitespace."""
+    text = _ARABIC_MARKS.sub('', text or '')
+    text = text.translate(_ARABIC_FOLD).casefold()
+    return ' '.join(text.split())
+
+
+def search_text_for(character_name, discord_id):
+    return normalize(f'{character_name} {discord_id}')
+
+
+_SQLITE_INSTALL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"search_text, content='main_application', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON main_application BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON main_application BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_text ON main_application BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+_SQLITE_UNINSTALL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+_PG_INSTALL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS app_search_trgm_idx ON main_application USING gin (search_text gin_trgm_ops)',
+]
+_PG_UNINSTALL = ['DROP INDEX IF EXISTS app_search_trgm_idx']
+
+
+FTS_TRIGGERS = [f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+
+
+def missing_triggers(conn):
+    """Sync triggers absent on a SQLite database whose FTS table exists."""
+    if conn.vendor != 'sqlite':
+        return []
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                       [FTS_TABLE, *FTS_TRIGGERS])
+        found = {name for kind, name in cursor.fetchall() if kind in ('table', 'trigger')}
+    if FTS_TABLE not in found:
+        return []  # migration 0020 not applied yet
+    return [name for name in FTS_TRIGGERS if name not in found]
+
+
+def install_index(schema_editor):
+    """Create the backend's search index (used by migrations)."""
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': _SQLITE_INSTALL, 'postgresql': _PG_INSTALL}.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+def uninstall_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'sqlite': _SQLITE_UNINSTALL, 'postgresql': _PG_UNINSTALL}.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _position_rank(term):
+    # exact > prefix > start of a later word > anywhere; cheap per matched row
+    return Case(
+        When(search_text=term, then=Value(3.0)),
+        When(search_text__startswith=term, then=Value(2.0)),
+        When(search_text__contains=' ' + term, then=Value(1.0)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def search(queryset, q):
+    """Filter an Application queryset by `q` and annotate `search_rank`.
+
+    Higher search_rank is a better match; order by ('-search_rank', ...).
+    """
+    term = normalize(q)
+    if not term:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    vendor = connection.vendor
+    if len(term) >= MIN_INDEXED_LENGTH and vendor == 'sqlite':
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (_fts_phrase(term),))
+        return queryset.filter(id__in=matches).annotate(search_rank=_position_rank(term))
+
+    queryset = queryset.filter(search_text__contains=term)
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+        return queryset.annotate(search_rank=TrigramSimilarity(F('search_text'), term))
+    return queryset.annotate(search_rank=_position_rank(term))
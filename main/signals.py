@@ -0,0 +1,62 @@
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Message, Notification, User, ApplicationSetting, Question, Assignment, Evaluation
+from . import unread, apply_setting, questions, conversations, dashboard
+from .middleware import invalidate_user
+
+
+@receiver([post_save, post_delete], sender=Message)
+def message_changed(sender, instance, created=False, **kwargs):
+    unread.bump_version(instance.receiver_id)
+    if created:
+        conversations.record_message(instance)
+    else:
+        conversations.schedule_rebuild(instance.sender_id, instance.receiver_id)
+
+
+@receiver([post_save, post_delete], sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    unread.bump_version(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+def assignment_changed(sender, instance, **kwargs):
+    # partner lists are cached under the unread version (see dashboard.py)
+    unread.bump_version(instance.trainer_id, instance.cadet_id)
+
+
+@receiver([post_save, post_delete], sender=Evaluation)
+def evaluation_changed(sender, instance, **kwargs):
+    dashboard.invalidate_evaluations(instance.cadet_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    # partner lists show names and are cached under the partners' unread
+    # versions (see dashboard.py); deletes go through assignment_changed
+    if created or (update_fields is not None and not {'username', 'full_name'} & set(update_fields)):
+        return
+    partners = Assignment.objects.filter(Q(trainer=instance) | Q(cadet=instance)).values_list('trainer_id', 'cadet_id')
+    unread.bump_version(*{uid for pair in partners for uid in pair if uid != instance.pk})
+
+
+@receiver(post_save, sender=ApplicationSetting)
+def apply_setting_saved(sender, instance, **kwargs):
+    apply_setting.store(instance)
+
+
+@receiver(post_delete, sender=ApplicationSetting)
+def apply_setting_deleted(sender, instance, **kwargs):
+    apply_setting.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    questions.bump_version()
@@ -0,0 +1,20 @@
+"""Template loaders that minify template source as it is read.
+
+Enabled with TEMPLATE_MINIFY=True (see settings.py), wrapped in the cached
+loader so each template is minified and compiled once per process.
+"""
+from django.template.loaders import app_directories, filesystem
+
+from .compression import minify_template
+
+
+class MinifyingFilesystemLoader(filesystem.Loader):
+
+    def get_contents(self, origin):
+        return minify_template(super().get_contents(origin))
+
+
+class MinifyingAppDirectoriesLoader(app_directories.Loader):
+
+    def get_contents(self, origin):
+        return minify_template(super().get_contents(origin))
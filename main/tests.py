@@ -1,3 +1,1367 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import re
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.http import HttpResponse, JsonResponse
+from django.test import (
+    LiveServerTestCase, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.templatetags.static import static
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import (
+    User, Assignment, Message, AuditLog, DiscordOutbox, Application, ApplicationJob, Notification,
+    ApplicationSetting, Question, TestSession, Conversation, Evaluation,
+)
+from . import (
+    outbox, jobs, apply_setting, reopen, questions, question_io, search, discord_oauth, compression, metrics,
+    loadtest, checks, conversations,
+)
+from .discord_utils import DiscordClient
+from .routing import websocket_urlpatterns
+from .views import _audit_log, _conversation
+
+
+def make_user(username, rank):
+    user = User(username=username, full_name=username.title(), rank=rank)
+    user.set_password('pass1234')
+    user.save()
+    return user
+
+
+def login(client, user):
+    session = client.session
+    session['uid'] = user.id
+    session['rank'] = user.rank
+    session.save()
+
+
+class ChatConsumerTests(TransactionTestCase):
+    """The consumer runs its queries in a worker thread, hence TransactionTestCase."""
+
+    def setUp(self):
+        self.trainer = make_user('trainer1', 'trainer')
+        self.cadet = make_user('cadet1', 'cadet')
+        self.outsider = make_user('cadet2', 'cadet')
+        Assignment.objects.create(trainer=self.trainer, cadet=self.cadet)
+
+    async def open_socket(self, user, other):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/chat/{other.id}/')
+        communicator.scope['session'] = {'uid': user.id} if user else {}
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def test_only_assigned_participants_connect(self):
+        for user in (None, self.outsider):
+            communicator, connected = await self.open_socket(user, self.trainer)
+            self.assertFalse(connected)
+        communicator, connected = await self.open_socket(self.cadet, self.trainer)
+        self.assertTrue(connected)
+        await communicator.send_json_to({'type': 'ping'})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'pong'})
+        await communicator.disconnect()
+
+    async def test_sent_message_reaches_both_participants(self):
+        trainer_socket, _ = await self.open_socket(self.trainer, self.cadet)
+        cadet_socket, _ = await self.open_socket(self.cadet, self.trainer)
+        await sync_to_async(login)(self.client, self.trainer)
+        await sync_to_async(self.client.post)(f'/chat/{self.cadet.id}/', {'content': 'hello'},
+                                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        for socket in (trainer_socket, cadet_socket):
+            event = await socket.receive_json_from()
+            self.assertEqual(event['type'], 'message')
+            self.assertEqual((event['message']['content'], event['message']['sender_id']), ('hello', self.trainer.id))
+            await socket.disconnect()
+
+
+@override_settings(SESSION_USER_CACHE_TTL=0)
+class DashboardQueryCountTests(TestCase):
+    """Dashboard query count must not grow with the number of assignments."""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_trainer_dashboard_constant_queries(self):
+        trainer = make_user('trainer1', 'trainer')
+        login(self.client, trainer)
+
+        def add_cadets(start, n):
+            for i in range(start, start + n):
+                cadet = make_user(f'cadet{i}', 'cadet')
+                Assignment.objects.create(trainer=trainer, cadet=cadet)
+                Message.objects.create(sender=cadet, receiver=trainer, content='hi')
+
+        add_cadets(0, 1)
+        baseline = self.count_queries('/trainer-dashboard/')
+        add_cadets(1, 10)
+        self.assertEqual(self.count_queries('/trainer-dashboard/'), baseline)
+
+    def test_cadet_dashboard_constant_queries(self):
+        cadet = make_user('cadet1', 'cadet')
+        login(self.client, cadet)
+
+        def add_trainers(start, n):
+            for i in range(start, start + n):
+                trainer = make_user(f'trainer{i}', 'trainer')
+                Assignment.objects.create(trainer=trainer, cadet=cadet)
+                Message.objects.create(sender=trainer, receiver=cadet, content='hi')
+
+        add_trainers(0, 1)
+        baseline = self.count_queries('/cadet-dashboard/')
+        add_trainers(1, 10)
+        self.assertEqual(self.count_queries('/cadet-dashboard/'), baseline)
+
+    def test_trainer_dashboard_unread_counts(self):
+        trainer = make_user('trainer1', 'trainer')
+        busy = make_user('busy', 'cadet')
+        quiet = make_user('quiet', 'cadet')
+        Assignment.objects.create(trainer=trainer, cadet=busy)
+        Assignment.objects.create(trainer=trainer, cadet=quiet)
+        Message.objects.create(sender=busy, receiver=trainer, content='1')
+        Message.objects.create(sender=busy, receiver=trainer, content='2')
+        Message.objects.create(sender=busy, receiver=trainer, content='read', is_read=True)
+        login(self.client, trainer)
+
+        response = self.client.get('/trainer-dashboard/')
+        counts = {d['cadet'].id: d['unread_count'] for d in response.context['cadets_data']}
+        self.assertEqual(counts, {busy.id: 2, quiet.id: 0})
+
+
+class DiscordOutboxTests(TestCase):
+
+    def test_audit_log_only_enqueues(self):
+        user = make_user('admin1', 'dev')
+        with mock.patch('main.discord_utils.send_channel_message') as send:
+            _audit_log('login', user, target=f'user:{user.id}', details='successful login')
+        send.assert_not_called()
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(DiscordOutbox.objects.filter(status='pending').count(), 1)
+
+    def test_drain_sends_and_retries(self):
+        ok = outbox.enqueue_channel_message('1', 'ok')
+        bad = outbox.enqueue_channel_message('1', 'bad')
+        with mock.patch('main.discord_utils.send_channel_message', side_effect=lambda ch, msg: msg == 'ok'):
+            self.assertEqual(outbox.drain(), (1, 1))
+            # the failed row is backed off, so nothing is due right away
+            self.assertEqual(outbox.drain(), (0, 0))
+        ok.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(ok.status, 'sent')
+        self.assertEqual((bad.status, bad.attempts), ('pending', 1))
+
+    def test_rows_are_claimed_before_sending(self):
+        item = outbox.enqueue_channel_message('1', 'hello')
+        seen = []
+
+        def send(ch, msg):
+            seen.append(DiscordOutbox.objects.get(id=item.id).status)
+            # a second drainer doesn't pick up the claimed row
+            self.assertEqual(outbox._claim(10), [])
+            return True
+
+        with mock.patch('main.discord_utils.send_channel_message', side_effect=send):
+            self.assertEqual(outbox.drain(), (1, 0))
+        self.assertEqual(seen, ['sending'])
+
+    def test_abandoned_claim_is_retried_after_lease(self):
+        item = outbox.enqueue_channel_message('1', 'hello')
+        self.assertEqual(len(outbox._claim(10)), 1)
+        self.assertEqual(outbox._claim(10), [])
+        DiscordOutbox.objects.filter(id=item.id).update(next_attempt_at=timezone.now())
+        self.assertEqual([i.id for i in outbox._claim(10)], [item.id])
+
+
+class _StubDiscordHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Discord REST API used by DiscordClient tests."""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None, headers=None):
+        data = json.dumps(body or {}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        server.calls.append(('POST', self.path, self.headers.get('Authorization')))
+        if self.path.endswith('/users/@me/channels'):
+            return self._reply(200, {'id': '555'})
+        if self.path.endswith('/oauth2/token'):
+            if server.rate_limit_next:
+                server.rate_limit_next -= 1
+                return self._reply(429, {'retry_after': 0.05}, {'Retry-After': '0.05'})
+            return self._reply(200, {'access_token': 'tok'})
+        if self.path.endswith('/channels/555/messages'):
+            if server.rate_limit_next:
+                server.rate_limit_next -= 1
+                return self._reply(429, {'retry_after': 0.05}, {'Retry-After': '0.05'})
+            return self._reply(200, {'id': '1'}, {
+                'X-RateLimit-Bucket': 'msgbucket',
+                'X-RateLimit-Remaining': '4',
+                'X-RateLimit-Reset-After': '1.0',
+            })
+        return self._reply(404)
+
+    def do_GET(self):
+        self.server.calls.append(('GET', self.path, self.headers.get('Authorization')))
+        if self.path.endswith('/users/@me') and self.headers.get('Authorization') == 'Bearer tok':
+            return self._reply(200, {'id': '4242', 'username': 'sam'})
+        return self._reply(401)
+
+
+class DiscordClientTests(SimpleTestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubDiscordHandler)
+        self.server.calls = []
+        self.server.rate_limit_next = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.client_ = DiscordClient(token='abc', base_url=base_url)
+
+    def test_dm_channel_is_cached(self):
+        self.assertTrue(self.client_.send_dm('<@!123>', 'one'))
+        self.assertTrue(self.client_.send_dm('123', 'two'))
+        paths = [p for _, p, _ in self.server.calls]
+        self.assertEqual(paths.count('/users/@me/channels'), 1)
+        self.assertEqual(paths.count('/channels/555/messages'), 2)
+        self.assertTrue(all(auth == 'Bot abc' for _, _, auth in self.server.calls))
+
+    def test_429_is_retried_after_retry_after(self):
+        self.server.rate_limit_next = 1
+        r = self.client_.send_channel_message('555', 'hello')
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(self.server.calls), 2)
+
+    def test_calls_are_recorded_in_metrics(self):
+        metrics.registry.reset()
+        self.server.rate_limit_next = 1
+        self.client_.send_channel_message('555', 'hello')
+        route = 'POST /channels/{channel_id}/messages'
+        self.assertEqual(metrics.registry.discord_calls[(route, 429)], 1)
+        self.assertEqual(metrics.registry.discord_calls[(route, 200)], 1)
+        self.assertEqual(metrics.registry.discord_latency[route].total, 2)
+
+    def test_bucket_state_from_headers(self):
+        self.client_.send_channel_message('555', 'hello')
+        bucket = self.client_._bucket('POST /channels/{channel_id}/messages:555')
+        self.assertEqual(bucket.remaining, 4)
+
+    def test_waiting_for_a_bucket_does_not_hold_its_lock(self):
+        bucket = self.client_._bucket('GET /test')
+        bucket.remaining = 0
+        bucket.reset_at = time.monotonic() + 0.3
+        waiter = threading.Thread(target=self.client_._acquire, args=(bucket,))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertTrue(bucket.lock.acquire(timeout=0.1))
+        bucket.lock.release()
+        waiter.join()
+        self.assertIsNone(bucket.remaining)
+
+
+class FinalAcceptJobTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('chief', 'police_chief')
+        login(self.client, self.admin)
+        self.app = Application.objects.create(discord_id='<@123456>', character_name='Sam')
+
+    def final_accept(self):
+        with mock.patch('main.discord_utils.send_dm') as send_dm, \
+                mock.patch('main.discord_utils.get_guild_member_username') as lookup:
+            self.client.post(f'/admin/application/{self.app.id}/action/', {'action': 'final_accept', 'role_id': '77'})
+        send_dm.assert_not_called()
+        lookup.assert_not_called()
+
+    def test_account_created_and_steps_queued(self):
+        self.final_accept()
+        cadet = User.objects.get(rank='cadet')
+        self.assertEqual(cadet.username, 'cadet123456')
+        steps = list(self.app.jobs.order_by('order').values_list('step', 'status'))
+        self.assertEqual(steps, [('resolve_username', 'pending'), ('send_credentials', 'pending'), ('add_role', 'pending')])
+
+    def test_steps_run_in_order_and_drop_password(self):
+        self.final_accept()
+        with mock.patch('main.discord_utils.get_guild_member_username', return_value='sammy#0001'), \
+                mock.patch('main.discord_utils.send_dm', return_value=True) as send_dm, \
+                mock.patch('main.discord_utils.add_role', return_value=True):
+            for _ in range(3):
+                jobs.run_due()
+        self.assertFalse(self.app.jobs.exclude(status='done').exists())
+        self.assertTrue(User.objects.filter(username='sammy', rank='cadet').exists())
+        self.assertIn('sammy', send_dm.call_args[0][1])
+        self.assertNotIn('password', ApplicationJob.objects.get(step='send_credentials').payload)
+
+    def test_failed_dm_falls_back_to_notification(self):
+        self.final_accept()
+        with mock.patch('main.discord_utils.get_guild_member_username', return_value=None), \
+                mock.patch('main.discord_utils.send_dm', return_value=False), \
+                mock.patch('main.discord_utils.add_role', return_value=True):
+            jobs.run_due()
+            job = ApplicationJob.objects.get(step='send_credentials')
+            jobs.run_job(job, max_attempts=1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(Notification.objects.filter(user__rank='cadet').exists())
+        self.assertNotIn('password', job.payload)
+
+        # a retry issues a new password, since the old one is gone
+        jobs.retry_failed(self.app)
+        with mock.patch('main.discord_utils.send_dm', return_value=True) as send_dm:
+            jobs.run_due()
+        password = re.search(r'Password : (\S+)`', send_dm.call_args[0][1]).group(1)
+        self.assertTrue(User.objects.get(rank='cadet').check_password(password))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertNotIn('password', job.payload)
+
+    def test_repeated_final_accept_keeps_one_account(self):
+        self.final_accept()
+        self.final_accept()
+        self.assertEqual(User.objects.filter(rank='cadet').count(), 1)
+        cadet = User.objects.get(rank='cadet')
+        self.assertEqual({job.payload['cadet_id'] for job in self.app.jobs.all()}, {cadet.id})
+
+    def test_worker_survives_a_failing_pass(self):
+        with mock.patch('main.management.commands.discord_worker.close_old_connections') as close, \
+                mock.patch('main.jobs.run_due', side_effect=RuntimeError('boom')), \
+                self.assertLogs('main.discord_worker', 'ERROR'):
+            call_command('discord_worker', '--once', stdout=io.StringIO())
+        close.assert_called()
+
+    def test_blocked_steps_do_not_starve_runnable_ones(self):
+        for i in range(3):
+            app = Application.objects.create(discord_id=str(i), character_name=f'blocked{i}')
+            ApplicationJob.objects.create(application=app, step='resolve_username', order=0, status='running')
+            ApplicationJob.objects.create(application=app, step='send_credentials', order=1)
+        # the blocked steps sort first
+        app = Application.objects.create(discord_id='9', character_name='runnable')
+        first = ApplicationJob.objects.create(application=app, step='resolve_username', order=0)
+        self.assertEqual([j.id for j in jobs._claim(batch_size=2)], [first.id])
+
+
+class BulkApplicationActionTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('chief', 'police_chief')
+        login(self.client, self.admin)
+        self.apps = [Application.objects.create(discord_id=f'<@{1000 + i}>', character_name=f'A{i}') for i in range(3)]
+
+    def test_prelim_accept_reports_per_applicant(self):
+        ids = [a.id for a in self.apps] + [999999]
+        with mock.patch('main.discord_utils.send_dm', side_effect=lambda uid, msg: uid != '1001') as send_dm, \
+                mock.patch('main.discord_utils.add_role', return_value=True) as add_role:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/admin/applications/bulk/', {
+                    'action': 'prelim_accept', 'ids': ids, 'role_id': '55'})
+        data = response.json()
+        self.assertEqual((data['succeeded'], data['failed']), (2, 2))
+        errors = {r['id']: r['error'] for r in data['results'] if not r['ok']}
+        self.assertEqual(set(errors), {self.apps[1].id, 999999})
+        self.assertEqual(send_dm.call_count, 3)
+        self.assertEqual(add_role.call_count, 3)
+        self.assertEqual(Application.objects.filter(status='completed').count(), 3)
+        self.assertEqual(AuditLog.objects.filter(action='prelim_accept').count(), 3)
+        self.assertEqual(DiscordOutbox.objects.count(), 3)
+        # writes are batched: adding applicants must not add queries
+        self.assertLess(len(ctx.captured_queries), 15)
+
+    def test_delete_and_unknown_action(self):
+        response = self.client.post('/admin/applications/bulk/', {'action': 'delete', 'ids': f'{self.apps[0].id},{self.apps[1].id}'})
+        self.assertEqual(response.json()['succeeded'], 2)
+        self.assertEqual(Application.objects.count(), 1)
+        response = self.client.post('/admin/applications/bulk/', {'action': 'final_accept', 'ids': self.apps[2].id})
+        self.assertEqual(response.status_code, 400)
+
+
+    @override_settings(BULK_ACTION_MAX=2)
+    def test_too_many_ids_are_refused(self):
+        ids = ','.join(str(a.id) for a in self.apps)
+        response = self.client.post('/admin/applications/bulk/', {'action': 'delete', 'ids': ids})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Application.objects.count(), 3)
+        response = self.client.post('/admin/applications/bulk/', {'action': 'delete', 'ids': ids.rsplit(',', 1)[0]})
+        self.assertEqual(response.json()['succeeded'], 2)
+
+class AdminApplicationsListTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('chief', 'police_chief')
+        login(self.client, self.admin)
+
+    def make_apps(self, n, submitted_at=None):
+        apps = Application.objects.bulk_create([
+            Application(discord_id=f'<@{i}>', character_name=f'A{i}') for i in range(n)
+        ])
+        if submitted_at:
+            Application.objects.filter(id__in=[a.id for a in apps]).update(submitted_at=submitted_at)
+        return apps
+
+    def test_cursor_pages_through_equal_timestamps(self):
+        from .views import ADMIN_APPLICATIONS_PAGE_SIZE
+        self.make_apps(2 * ADMIN_APPLICATIONS_PAGE_SIZE + 3, submitted_at=timezone.now())
+        Application.objects.create(discord_id='<@h>', character_name='Hidden', is_hidden=True)
+        expected = list(Application.objects.filter(is_hidden=False).order_by('-id').values_list('id', flat=True))
+
+        seen, params = [], {}
+        while True:
+            response = self.client.get('/admin/applications/', params)
+            self.assertEqual(response.context['total_count'], len(expected))
+            seen += [a.id for a in response.context['applications']]
+            if not response.context['next_cursor']:
+                break
+            params = {'before': response.context['next_cursor']}
+        self.assertEqual(seen, expected)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        self.make_apps(3)
+        first = [a.id for a in self.client.get('/admin/applications/').context['applications']]
+        for raw in ('x', '12-x', '-', '9' * 30 + '-1'):
+            response = self.client.get('/admin/applications/', {'before': raw})
+            self.assertEqual(response.status_code, 200, raw)
+            self.assertTrue(response.context['is_first_page'], raw)
+            self.assertEqual([a.id for a in response.context['applications']], first, raw)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def page_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get('/admin/applications/')
+            return len(ctx.captured_queries)
+
+        def add(n):
+            for app in self.make_apps(n):
+                TestSession.objects.create(application=app, started_at=timezone.now(), score=5)
+                ApplicationJob.objects.create(application=app, step='add_role', order=1)
+
+        add(2)
+        page_queries()  # warm the settings cache
+        few = page_queries()
+        add(20)
+        self.assertEqual(page_queries(), few)
+
+    def test_latest_session_annotations_match_per_row_lookup(self):
+        now = timezone.now()
+        none, finished, interrupted, active, restarted = self.make_apps(5)
+        TestSession.objects.create(application=finished, started_at=now - timedelta(hours=2),
+                                   finished_at=now - timedelta(hours=1), score=4)
+        TestSession.objects.create(application=finished, started_at=now - timedelta(minutes=30),
+                                   finished_at=now - timedelta(minutes=20), score=9)
+        TestSession.objects.create(application=interrupted, started_at=now - timedelta(minutes=5), score=2)
+        TestSession.objects.create(application=active, started_at=now - timedelta(minutes=5), is_active=True)
+        TestSession.objects.create(application=restarted, started_at=now - timedelta(hours=1), score=1)
+        TestSession.objects.create(application=restarted, started_at=now - timedelta(minutes=10),
+                                   finished_at=now - timedelta(minutes=1), score=7)
+
+        response = self.client.get('/admin/applications/')
+        rows = {a.id: a for a in response.context['applications']}
+        self.assertEqual(len(rows), 5)
+        for app in Application.objects.all():
+            # what the view used to compute with two queries per row
+            last = app.sessions.order_by('-finished_at', '-started_at').first()
+            last_started = app.sessions.order_by('-started_at').first()
+            interrupted_flag = bool(last_started and not last_started.is_active
+                                    and last_started.finished_at is None and last_started.started_at)
+            row = rows[app.id]
+            self.assertEqual(row.last_score, last.score if last else None, app.character_name)
+            self.assertEqual(row.last_started_session_id, last_started.id if last_started else None)
+            self.assertEqual(row.test_interrupted, interrupted_flag, app.character_name)
+        self.assertTrue(rows[interrupted.id].test_interrupted)
+        self.assertFalse(rows[restarted.id].test_interrupted)
+        self.assertIsNone(rows[none.id].last_score)
+
+
+class SessionUserTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('chief', 'police_chief')
+        login(self.client, self.admin)
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        return [q for q in ctx.captured_queries if 'FROM "main_user"' in q['sql'] and '"main_user"."id" =' in q['sql']]
+
+    def test_resolved_once_and_cached(self):
+        self.assertEqual(len(self.user_queries('/admin/applications/')), 1)
+        self.assertEqual(self.user_queries('/admin/applications/'), [])
+
+    def test_save_invalidates_cache(self):
+        self.client.get('/admin/applications/')
+        self.admin.rank = 'cadet'
+        self.admin.save()
+        response = self.client.get('/admin/applications/')
+        self.assertTemplateUsed(response, 'error.html')
+
+
+class ApplySettingCacheTests(TestCase):
+
+    def setUp(self):
+        apply_setting.invalidate()
+        self.addCleanup(apply_setting.invalidate)
+
+    def test_status_polls_hit_cache_and_revalidate(self):
+        first = self.client.get('/api/apply_status/')
+        self.assertTrue(first.json()['open'])
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/apply_status/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_save_writes_through(self):
+        etag = self.client.get('/api/apply_status/')['ETag']
+        admin = make_user('chief', 'police_chief')
+        login(self.client, admin)
+        self.client.post('/admin/applications/control/', {'action': 'close_with_message', 'message': 'later'})
+        self.assertEqual(ApplicationSetting.objects.get(id=1).status, 'closed')
+        response = self.client.get('/api/apply_status/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'open': False, 'closed_message': 'later', 'reopen_at': None})
+
+    def test_unshared_cache_expires_writes_made_elsewhere(self):
+        self.assertTrue(apply_setting.get_setting().is_open())
+        # another process closes applications; its LocMem write-through never reaches this one
+        ApplicationSetting.objects.filter(id=1).update(status='closed')
+        apply_setting._local['expires'] = 0.0
+        self.assertEqual(apply_setting.get_setting().status, 'open')
+        apply_setting._local['expires'] = 0.0
+        later = time.time() + apply_setting.UNSHARED_CACHE_TTL + 1
+        with mock.patch('time.time', return_value=later):
+            self.assertEqual(apply_setting.get_setting().status, 'closed')
+
+
+class ScheduledReopenTests(TestCase):
+
+    def setUp(self):
+        apply_setting.invalidate()
+        self.addCleanup(apply_setting.invalidate)
+
+    def test_due_reopens_applied_in_one_pass(self):
+        past = timezone.now() - timedelta(minutes=1)
+        future = timezone.now() + timedelta(hours=1)
+        ApplicationSetting.objects.create(id=1, status='closed', reopen_at=past)
+        due = Application.objects.create(discord_id='1', character_name='due', status='closed', reopen_at=past)
+        later = Application.objects.create(discord_id='2', character_name='later', status='closed', reopen_at=future)
+        rejected = Application.objects.create(discord_id='3', character_name='rejected', status='closed')
+
+        # apply_page only reads; it shows the passed timer as open
+        response = self.client.get('/apply/')
+        self.assertTrue(response.context['open'])
+        self.assertEqual(ApplicationSetting.objects.get(id=1).status, 'closed')
+
+        self.assertEqual(reopen.apply_due(), (True, 1))
+        self.assertEqual(apply_setting.get_setting().status, 'open')
+        statuses = dict(Application.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {due.id: 'open', later.id: 'closed', rejected.id: 'closed'})
+        self.assertEqual(reopen.next_due(), future)
+
+    def test_status_api_agrees_with_page_when_timer_passes(self):
+        ApplicationSetting.objects.create(
+            id=1, status='closed', closed_message='soon', reopen_at=timezone.now() + timedelta(hours=1))
+        page = self.client.get('/apply/')
+        status = self.client.get('/api/apply_status/')
+        self.assertFalse(page.context['open'])
+        self.assertFalse(status.json()['open'])
+
+        ApplicationSetting.objects.filter(id=1).update(reopen_at=timezone.now() - timedelta(minutes=1))
+        apply_setting.invalidate()
+        # the row itself is unchanged until the worker runs; the validator
+        # must still change so a revalidating poll sees the reopen
+        again = self.client.get('/api/apply_status/', HTTP_IF_NONE_MATCH=status['ETag'])
+        self.assertEqual(again.status_code, 200)
+        self.assertTrue(self.client.get('/apply/').context['open'])
+        self.assertEqual(again.json(), {'open': True, 'closed_message': '', 'reopen_at': None})
+
+
+def make_question(i, correct=0):
+    return Question.objects.create(text=f'Q{i}', option_a='a', option_b='b', option_c='c', option_d='d', correct_index=correct)
+
+
+class TestSessionMixin:
+    """Ten questions and an active test session owned by the client's Discord login."""
+
+    def setUp(self):
+        self.qs = [make_question(i) for i in range(10)]
+        app = Application.objects.create(discord_id='42', character_name='Sam', status='testing',
+                                         test_started_at=timezone.now())
+        self.session = TestSession.objects.create(
+            application=app, is_active=True, session_token='tok', discord_id='42',
+            questions_order=','.join(str(q.id) for q in self.qs))
+        s = self.client.session
+        s['discord_id'] = '42'
+        s.save()
+
+
+class QuestionBundleTests(TestSessionMixin, TestCase):
+
+    def test_page_carries_bundle_without_answer_key(self):
+        response = self.client.get(f'/apply/test/{self.session.id}/?token=tok')
+        bundle = response.context['questions']
+        self.assertEqual([q['id'] for q in bundle], [q.id for q in self.qs])
+        self.assertEqual(set(bundle[0]), {'id', 'text', 'options'})
+        self.assertContains(response, 'id="questionBundle"')
+        self.assertNotContains(response, 'correct_index')
+
+    def test_cache_reloads_after_edit(self):
+        questions.bank()
+        with self.assertNumQueries(0):
+            self.assertEqual(questions.public_question(self.qs[0].id)['text'], 'Q0')
+        self.qs[0].text = 'edited'
+        self.qs[0].save()
+        self.assertEqual(self.client.get(f'/api/question/{self.qs[0].id}/').json()['text'], 'edited')
+
+
+class SubmitAnswerTests(TestSessionMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        s = self.client.session
+        s[f'test_session_{self.session.id}_user_id'] = s.session_key
+        s.save()
+        questions.bank()
+
+    def answer(self, q, idx):
+        return self.client.post(f'/apply/test/{self.session.id}/answer/',
+                                {'question_id': q.id, 'selected_index': idx, 'token': 'tok'})
+
+    def test_counters_and_finish(self):
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.answer(self.qs[0], 0).json()['answered'], 1)
+        for i, q in enumerate(self.qs[1:9], start=1):
+            with CaptureQueriesContext(connection) as ctx:
+                self.answer(q, i % 2)
+            self.assertEqual(len(ctx.captured_queries), len(first.captured_queries))
+        self.assertEqual(self.answer(self.qs[9], 1).json()['answered'], 10)
+
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.answered_count, self.session.correct_count, self.session.score), (10, 5, 5.0))
+        self.assertFalse(self.session.is_active)
+        self.assertEqual(Application.objects.get().status, 'completed')
+        self.assertEqual(self.answer(self.qs[0], 0).status_code, 403)
+
+    def test_score_tracks_correct_count(self):
+        for i, q in enumerate(self.qs[:4]):
+            self.answer(q, 0 if i != 2 else 1)
+            self.session.refresh_from_db()
+            self.assertEqual(self.session.score, self.session.correct_count)
+        self.assertEqual((self.session.answered_count, self.session.score), (4, 3.0))
+
+        # a concurrent answer lands after this request read the row (select_for_update
+        # is a no-op on SQLite): the score still comes from the stored counter
+        from django.db.models.query import QuerySet
+        original_first = QuerySet.first
+
+        def first_then_concurrent_answer(qs):
+            obj = original_first(qs)
+            if isinstance(obj, TestSession):
+                TestSession.objects.filter(id=obj.id).update(correct_count=F('correct_count') + 1)
+            return obj
+
+        with mock.patch.object(QuerySet, 'first', first_then_concurrent_answer):
+            self.answer(self.qs[4], 0)
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.correct_count, self.session.score), (5, 5.0))
+
+
+class QuestionSamplerTests(TestCase):
+
+    def setUp(self):
+        for i in range(30):
+            q = make_question(i)
+            q.difficulty = 1 if i < 20 else 3
+            q.save()
+        questions.bank()
+
+    def test_stratified_sample_is_proportional_and_distinct(self):
+        with self.assertNumQueries(0):
+            ids = questions.sample(9, by='difficulty')
+        self.assertEqual(len(set(ids)), 9)
+        hard = Question.objects.filter(id__in=ids, difficulty=3).count()
+        self.assertEqual(hard, 3)
+
+    def test_small_bank(self):
+        self.assertIsNone(questions.sample(31))
+        self.assertEqual(len(questions.sample(30)), 30)
+
+
+class QuestionImportExportTests(TestCase):
+
+    CSV = (
+        'text,option_a,option_b,option_c,option_d,correct_index,category,difficulty\n'
+        'First?,a,b,c,d,0,law,1\n'
+        'first? ,a,b,c,d,1,law,1\n'
+        'Broken,a,b,,d,0,,\n'
+        'Second,a,b,c,d,3,,3\n'
+    )
+
+    def test_csv_import_validates_and_dedupes(self):
+        make_question('existing').save()
+        rows = question_io.read_rows(io.StringIO(self.CSV + 'Qexisting,a,b,c,d,0,,\n'), 'csv')
+        stats = question_io.import_rows(rows, batch_size=1)
+        self.assertEqual((stats.read, stats.created, stats.duplicates, stats.invalid), (5, 2, 2, 1))
+        self.assertEqual(stats.errors, [(4, 'all four options are required')])
+        self.assertEqual(Question.objects.get(text='Second').difficulty, 3)
+
+    def test_jsonl_round_trip(self):
+        question_io.import_rows(question_io.read_rows(io.StringIO(self.CSV), 'csv'))
+        out = io.StringIO()
+        self.assertEqual(question_io.export_rows(out, 'jsonl'), 2)
+        Question.objects.all().delete()
+        stats = question_io.import_rows(question_io.read_rows(io.StringIO(out.getvalue()), 'jsonl'))
+        self.assertEqual(stats.created, 2)
+        self.assertEqual(questions.correct_index(Question.objects.get(text='Second').id), 3)
+
+    def test_json_files_hold_an_array(self):
+        self.assertEqual([question_io.guess_format(p) for p in ('q.json', 'q.jsonl', 'q.ndjson', 'q.csv')],
+                         ['json', 'jsonl', 'jsonl', 'csv'])
+        question_io.import_rows(question_io.read_rows(io.StringIO(self.CSV), 'csv'))
+        out = io.StringIO()
+        self.assertEqual(question_io.export_rows(out, 'json'), 2)
+        self.assertEqual([row['text'] for row in json.loads(out.getvalue())], ['First?', 'Second'])
+        Question.objects.all().delete()
+        stats = question_io.import_rows(question_io.read_rows(io.StringIO(out.getvalue()), 'json'))
+        self.assertEqual(stats.created, 2)
+
+        with mock.patch('sys.stdin', io.StringIO('{"text": "not an array"}')):
+            with self.assertRaisesMessage(CommandError, 'array of questions'):
+                call_command('import_questions', '-', '--format', 'json', stdout=io.StringIO())
+
+    def test_commands_leave_stdin_and_stdout_open(self):
+        stdin = io.StringIO(self.CSV)
+        with mock.patch('sys.stdin', stdin):
+            call_command('import_questions', '-', '--format', 'csv', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertFalse(stdin.closed)
+        self.assertEqual(Question.objects.count(), 2)
+        stdout = io.StringIO()
+        with mock.patch('sys.stdout', stdout):
+            call_command('export_questions', '-', '--format', 'jsonl', stderr=io.StringIO())
+        self.assertFalse(stdout.closed)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
+
+
+class ChatHistoryTests(TestCase):
+
+    def setUp(self):
+        self.trainer = make_user('trainer1', 'trainer')
+        self.cadet = make_user('cadet1', 'cadet')
+        Assignment.objects.create(trainer=self.trainer, cadet=self.cadet)
+        Message.objects.bulk_create([
+            Message(sender=self.cadet if i % 2 else self.trainer,
+                    receiver=self.trainer if i % 2 else self.cadet, content=f'm{i}')
+            for i in range(120)
+        ])
+        login(self.client, self.trainer)
+
+    def test_page_has_latest_messages_and_older_pages_on_demand(self):
+        response = self.client.get(f'/chat/{self.cadet.id}/')
+        page = response.context['messages']
+        self.assertEqual([m.content for m in page], [f'm{i}' for i in range(70, 120)])
+        self.assertTrue(response.context['has_more'])
+
+        data = self.client.get(f'/chat/api/messages/{self.cadet.id}/', {'before_id': page[0].id}).json()
+        self.assertEqual([m['content'] for m in data['messages']], [f'm{i}' for i in range(20, 70)])
+        self.assertTrue(data['has_more'])
+        data = self.client.get(f'/chat/api/messages/{self.cadet.id}/', {'before_id': data['messages'][0]['id']}).json()
+        self.assertEqual(len(data['messages']), 20)
+        self.assertFalse(data['has_more'])
+
+    def test_history_queries_do_not_grow_with_page(self):
+        url = f'/chat/api/messages/{self.cadet.id}/'
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {'last_id': 0})
+        self.assertLess(len(ctx.captured_queries), 8)
+
+
+class ConversationSummaryTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('chief', 'police_chief')
+        self.trainer = make_user('trainer1', 'trainer')
+        self.cadets = [make_user(f'cadet{i}', 'cadet') for i in range(3)]
+        for cadet in self.cadets:
+            Assignment.objects.create(trainer=self.trainer, cadet=cadet)
+            Message.objects.create(sender=cadet, receiver=self.trainer, content='hello')
+            Message.objects.create(sender=self.trainer, receiver=cadet, content='reply')
+        Message.objects.create(sender=self.cadets[0], receiver=self.trainer, content='latest')
+
+    def test_counters_follow_messages(self):
+        conv = Conversation.objects.get(user_low=self.trainer, user_high=self.cadets[0])
+        self.assertEqual((conv.message_count, conv.unread_for(self.trainer.id), conv.last_message.content), (3, 2, 'latest'))
+
+        login(self.client, self.trainer)
+        self.client.get(f'/chat/{self.cadets[0].id}/')
+        conv.refresh_from_db()
+        self.assertEqual(conv.unread_for(self.trainer.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.filter(content='latest').delete()
+        conv.refresh_from_db()
+        self.assertEqual((conv.message_count, conv.last_message.content), (2, 'reply'))
+
+    def test_deleting_a_user_recounts_each_pair_once(self):
+        for i in range(10):
+            Message.objects.create(sender=self.cadets[1], receiver=self.trainer, content=f'm{i}')
+        with mock.patch('main.conversations.rebuild_pair', wraps=conversations.rebuild_pair) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.trainer.delete()
+        self.assertEqual(rebuild.call_count, 3)
+        self.assertFalse(Conversation.objects.exists())
+
+    def test_rebuild_survives_rollback_and_runs_per_transaction(self):
+        conv = Conversation.objects.get(user_low=self.trainer, user_high=self.cadets[0])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Message.objects.filter(content='latest').delete()
+                raise RuntimeError
+            Message.objects.filter(sender=self.cadets[0], content='hello').delete()
+        self.assertEqual(len(callbacks), 1)
+        conv.refresh_from_db()
+        self.assertEqual((conv.message_count, conv.last_message.content), (2, 'latest'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.filter(content='latest').delete()
+        conv.refresh_from_db()
+        self.assertEqual((conv.message_count, conv.last_message.content), (1, 'reply'))
+
+    def test_member_detail_uses_summary_and_lazy_pages(self):
+        login(self.client, self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/admin/member/{self.trainer.id}/')
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "main_message"' in q['sql']
+                          and 'main_conversation' not in q['sql']])
+        chats = response.context['chats']
+        self.assertEqual(chats[0]['other'], self.cadets[0])
+        self.assertEqual(chats[0]['message_count'], 3)
+
+        data = self.client.get(f'/admin/member/{self.trainer.id}/chat/{self.cadets[0].id}/').json()
+        self.assertEqual([m['content'] for m in data['messages']], ['hello', 'reply', 'latest'])
+        self.assertFalse(data['has_more'])
+
+
+class HotPathIndexTests(TestCase):
+    """EXPLAIN the hot queries and check they are served by the intended index."""
+
+    def setUp(self):
+        self.trainer = make_user('trainer1', 'trainer')
+        self.cadet = make_user('cadet1', 'cadet')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        if connection.vendor == 'sqlite':
+            plan = queryset.explain()
+        elif connection.vendor == 'postgresql':
+            # tiny test tables would otherwise always be sequentially scanned
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                plan = queryset.explain()
+        else:
+            self.skipTest(f'no EXPLAIN check for {connection.vendor}')
+        self.assertTrue(any(name in plan for name in index_names), plan)
+        return plan
+
+    def test_unread_messages_by_sender(self):
+        qs = Message.objects.filter(receiver=self.trainer, is_read=False).values('sender').annotate(n=Count('id'))
+        self.assertUsesIndex(qs, 'msg_unread_idx')
+
+    def test_mark_conversation_read(self):
+        qs = Message.objects.filter(sender=self.cadet, receiver=self.trainer, is_read=False)
+        self.assertUsesIndex(qs, 'msg_unread_idx', 'msg_pair_id_idx')
+
+    def test_conversation_page(self):
+        self.assertUsesIndex(_conversation(self.trainer, self.cadet).order_by('-id')[:51], 'msg_pair_id_idx')
+
+    def test_unread_notifications(self):
+        qs = Notification.objects.filter(user=self.cadet, is_read=False).order_by('-created_at')
+        self.assertUsesIndex(qs, 'notif_unread_idx')
+
+    def test_cadet_assignments(self):
+        self.assertUsesIndex(Assignment.objects.filter(cadet=self.cadet), 'assign_cadet_trainer_idx')
+
+    def test_admin_applications_page(self):
+        if connection.vendor == 'sqlite':
+            # SQLite cannot match Django's `WHERE NOT is_hidden` against an index
+            self.skipTest('boolean index lookups need PostgreSQL')
+        qs = Application.objects.filter(is_hidden=False).order_by('-submitted_at', '-id')[:51]
+        plan = self.assertUsesIndex(qs, 'app_hidden_submitted_idx')
+        # the whole (-submitted_at, -id) order comes from the index, no separate sort step
+        self.assertNotIn('Sort', plan)
+
+
+class ApplicationSearchTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('chief', 'police_chief')
+        login(self.client, self.admin)
+
+    def test_migrations_leave_the_sync_triggers_installed(self):
+        self.assertEqual(search.missing_triggers(connection), [])
+        self.assertEqual(checks.check_search_triggers(None, databases=['default']), [])
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TRIGGER {search.FTS_TABLE}_au')
+            self.assertEqual([w.id for w in checks.check_search_triggers(None, databases=['default'])],
+                             ['main.W002'])
+
+    def test_normalize_folds_arabic_variants(self):
+        self.assertEqual(search.normalize('  أَحْمَـــد   Ali '), 'احمد ali')
+        self.assertEqual(search.normalize('فاطمة'), search.normalize('فاطمه'))
+        self.assertEqual(search.normalize('مصطفى'), 'مصطفي')
+
+    def test_search_text_kept_in_sync(self):
+        app = Application.objects.create(discord_id='<@77>', character_name='إبراهيم')
+        self.assertEqual(app.search_text, 'ابراهيم <@77>')
+        app.character_name = 'Omar'
+        app.save(update_fields=['character_name'])
+        app.refresh_from_db()
+        self.assertEqual(app.search_text, 'omar <@77>')
+        self.assertEqual(list(search.search(Application.objects.all(), 'omar')), [app])
+        self.assertFalse(search.search(Application.objects.all(), 'ابراهيم').exists())
+
+    def test_matches_regardless_of_hamza_and_diacritics(self):
+        ahmed = Application.objects.create(discord_id='<@1>', character_name='أحمد الشمري')
+        Application.objects.create(discord_id='<@2>', character_name='Sam')
+        for q in ('احمد', 'أَحمد', 'إحمد', 'احمد الشمري', 'مد'):
+            self.assertEqual(list(search.search(Application.objects.all(), q)), [ahmed], q)
+        self.assertEqual(search.search(Application.objects.all(), '<@2>').count(), 1)
+
+    def test_ranks_exact_then_prefix_then_word_start(self):
+        inside = Application.objects.create(discord_id='<@1>', character_name='Samiromar')
+        word = Application.objects.create(discord_id='<@2>', character_name='Ali Omar')
+        prefix = Application.objects.create(discord_id='<@3>', character_name='Omar Ali')
+        ranked = search.search(Application.objects.all(), 'omar').order_by('-search_rank', '-id')
+        self.assertEqual(list(ranked), [prefix, word, inside])
+
+    def test_admin_list_search_pages_by_offset(self):
+        from .views import ADMIN_APPLICATIONS_PAGE_SIZE
+        Application.objects.bulk_create([
+            Application(discord_id=f'<@{i}>', character_name=f'Khalid {i}', search_text=search.search_text_for(f'Khalid {i}', f'<@{i}>'))
+            for i in range(ADMIN_APPLICATIONS_PAGE_SIZE + 5)
+        ])
+        Application.objects.create(discord_id='<@x>', character_name='Sam')
+
+        response = self.client.get('/admin/applications/', {'q': 'خالد'})
+        self.assertEqual(response.context['total_count'], 0)
+
+        response = self.client.get('/admin/applications/', {'q': 'khalid'})
+        self.assertEqual(response.context['total_count'], ADMIN_APPLICATIONS_PAGE_SIZE + 5)
+        self.assertEqual(len(response.context['applications']), ADMIN_APPLICATIONS_PAGE_SIZE)
+        self.assertEqual(response.context['next_page'], 2)
+        first = {a.id for a in response.context['applications']}
+
+        response = self.client.get('/admin/applications/', {'q': 'khalid', 'page': 2})
+        rest = {a.id for a in response.context['applications']}
+        self.assertEqual(len(rest), 5)
+        self.assertFalse(first & rest)
+        self.assertIsNone(response.context['next_page'])
+
+
+class _DeferredExecutor:
+    """Holds submitted jobs until run() so tests can look at the pending state."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+    def run(self):
+        jobs, self.jobs = self.jobs, []
+        for fn, args in jobs:
+            fn(*args)
+
+
+@mock.patch.dict('os.environ', {'DISCORD_CLIENT_ID': 'cid', 'DISCORD_CLIENT_SECRET': 'secret'})
+class DiscordOAuthCallbackTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubDiscordHandler)
+        self.server.calls = []
+        self.server.rate_limit_next = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        discord = DiscordClient(token='abc', base_url=f'http://127.0.0.1:{self.server.server_port}')
+        self.executor = _DeferredExecutor()
+        for target, value in (('main.discord_utils.get_client', discord),
+                              ('main.discord_oauth._get_executor', self.executor)):
+            patcher = mock.patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def poll(self):
+        return self.client.get('/apply/discord-callback/status/').json()
+
+    def test_handshake_page_polls_until_exchange_finishes(self):
+        response = self.client.get('/apply/discord-callback/', {'code': 'abc'})
+        self.assertTemplateUsed(response, 'discord_oauth_wait.html')
+        self.assertEqual(self.poll(), {'status': 'pending'})
+
+        self.executor.run()
+        self.assertEqual(self.poll()['status'], 'done')
+        self.assertEqual(self.client.session['discord_id'], '4242')
+        self.assertEqual(self.client.session['discord_username'], 'sam')
+        # token exchange without the bot header, identify with the user's token
+        self.assertEqual(self.server.calls, [
+            ('POST', '/oauth2/token', None),
+            ('GET', '/users/@me', 'Bearer tok'),
+        ])
+
+    def test_double_submitted_callback_exchanges_once(self):
+        self.client.get('/apply/discord-callback/', {'code': 'abc'})
+        self.client.get('/apply/discord-callback/', {'code': 'abc'})
+        self.assertEqual(len(self.executor.jobs), 1)
+        self.executor.run()
+
+        response = self.client.get('/apply/discord-callback/', {'code': 'abc'})
+        self.assertRedirects(response, '/apply/', fetch_redirect_response=False)
+        self.assertEqual(self.client.session['discord_id'], '4242')
+        self.assertEqual(len(self.server.calls), 2)
+
+    def test_rate_limited_exchange_is_retried_in_the_background(self):
+        self.server.rate_limit_next = 1
+        self.client.get('/apply/discord-callback/', {'code': 'abc'})
+        self.executor.run()
+        self.assertEqual(self.poll()['status'], 'done')
+        self.assertEqual(self.client.session['discord_id'], '4242')
+        self.assertEqual([p for _, p, _ in self.server.calls], ['/oauth2/token', '/oauth2/token', '/users/@me'])
+
+    def test_failed_exchange_reports_error(self):
+        with mock.patch.object(discord_oauth, 'exchange', return_value={'state': discord_oauth.ERROR, 'message': 'x'}):
+            self.client.get('/apply/discord-callback/', {'code': 'bad'})
+            self.executor.run()
+        self.assertEqual(self.poll()['status'], 'done')
+        self.assertEqual(self.client.session['error_message'], 'x')
+        self.assertNotIn('discord_id', self.client.session)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+
+    def test_several_workers_need_a_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://x'}}
+        with override_settings(CACHES=locmem):
+            with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '1'}):
+                self.assertEqual(checks.check_shared_cache(None), [])
+            with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '3'}):
+                self.assertEqual([e.id for e in checks.check_shared_cache(None)], ['main.E001'])
+        with override_settings(CACHES=redis), mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '3'}):
+            self.assertEqual(checks.check_shared_cache(None), [])
+
+
+class StaticBundleTests(TestCase):
+    """Page CSS/JS are served from static files, not inlined into every response.
+
+    Paths go through static(), so they match the hashed names of the manifest
+    storage used with DEBUG off.
+    """
+
+    def test_pages_reference_bundles_instead_of_inline_assets(self):
+        response = self.client.get('/')
+        html = response.content.decode()
+        self.assertIn(static('css/pages/login.css'), html)
+        self.assertIn(static('js/pages/login.js'), html)
+        self.assertNotIn('<style', html)
+
+    def test_config_block_is_rendered_for_page_script(self):
+        cadet = make_user('cadet1', 'cadet')
+        trainer = make_user('trainer1', 'trainer')
+        Assignment.objects.create(trainer=trainer, cadet=cadet)
+        login(self.client, cadet)
+        html = self.client.get(f'/chat/{trainer.id}/').content.decode()
+        self.assertIn(f'otherId: {trainer.id}', html)
+        self.assertIn(static('js/pages/chat.js'), html)
+
+
+@override_settings(COMPRESS_MIN_BYTES=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def process(self, response, path='/x/', csrf=False, encoding='gzip, deflate, br', **extra):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=encoding, **extra)
+        if csrf:
+            request.META['CSRF_COOKIE_USED'] = True
+        return compression.CompressionMiddleware(lambda r: response)(request)
+
+    def test_large_json_is_compressed(self):
+        payload = {'messages': [{'id': i, 'content': 'مرحبا ' * 5} for i in range(100)]}
+        response = self.process(JsonResponse(payload))
+        self.assertIn(response['Content-Encoding'], ('gzip', 'br'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        if response['Content-Encoding'] == 'gzip':
+            self.assertEqual(json.loads(gzip.decompress(response.content)), payload)
+
+    def test_small_or_binary_responses_are_left_alone(self):
+        self.assertFalse(self.process(HttpResponse('x' * 100)).has_header('Content-Encoding'))
+        self.assertFalse(self.process(HttpResponse(b'x' * 5000, content_type='image/png')).has_header('Content-Encoding'))
+        self.assertFalse(self.process(HttpResponse('x' * 5000), encoding='').has_header('Content-Encoding'))
+
+    def test_csrf_pages_are_gzip_only_and_not_compressed_with_reflected_input(self):
+        html = '<form>' + 'a' * 5000 + '</form>'
+        self.assertEqual(self.process(HttpResponse(html), csrf=True)['Content-Encoding'], 'gzip')
+        reflected = self.process(HttpResponse(html), path='/x/?q=secret', csrf=True)
+        self.assertFalse(reflected.has_header('Content-Encoding'))
+        self.assertEqual(self.process(HttpResponse(html), path='/x/?q=1')['Content-Encoding'],
+                         'br' if compression.brotli else 'gzip')
+
+    def test_minify_template_keeps_protected_blocks(self):
+        source = '<div>\n    <span>a</span>\n\n    <span>b</span>\n</div>\n<pre>\n  keep\n</pre>\n<script>\n    x = 1;\n</script>'
+        self.assertEqual(
+            compression.minify_template(source),
+            '<div>\n<span>a</span>\n<span>b</span>\n</div>\n<pre>\n  keep\n</pre>\n<script>\n    x = 1;\n</script>')
+
+
+class UnreadStateApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.trainer = make_user('trainer1', 'trainer')
+        self.cadet = make_user('cadet1', 'cadet')
+        Assignment.objects.create(trainer=self.trainer, cadet=self.cadet)
+        Message.objects.create(sender=self.trainer, receiver=self.cadet, content='a')
+        self.notif = Notification.objects.create(user=self.cadet, message='welcome')
+        login(self.client, self.cadet)
+
+    def assertChanged(self, etag):
+        response = self.client.get('/api/unread-state/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def test_repeat_poll_is_not_modified_without_queries(self):
+        response = self.client.get('/api/unread-state/')
+        self.assertEqual(response.json(), {'counts': {str(self.trainer.id): 1}, 'notifications': 1})
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get('/api/unread-state/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], response['ETag'])
+        self.assertFalse([q for q in ctx.captured_queries
+                          if 'main_message' in q['sql'] or 'main_notification' in q['sql']])
+
+    def test_etag_follows_messages_and_notifications(self):
+        etag = self.client.get('/api/unread-state/')['ETag']
+
+        Message.objects.create(sender=self.trainer, receiver=self.cadet, content='b')
+        response = self.assertChanged(etag)
+        self.assertEqual(response.json()['counts'], {str(self.trainer.id): 2})
+
+        Notification.objects.create(user=self.cadet, message='again')
+        response = self.assertChanged(response['ETag'])
+        self.assertEqual(response.json()['notifications'], 2)
+
+        self.client.get(f'/chat/{self.trainer.id}/')
+        response = self.assertChanged(response['ETag'])
+        self.assertEqual(response.json()['counts'], {})
+
+        self.client.post(f'/api/notification/{self.notif.id}/read/')
+        response = self.assertChanged(response['ETag'])
+        self.assertEqual(response.json()['notifications'], 1)
+
+    def test_anonymous_poll_is_refused(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/unread-state/').status_code, 403)
+
+
+class DashboardApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.trainer = make_user('trainer1', 'trainer')
+        self.cadet = make_user('cadet1', 'cadet')
+        Assignment.objects.create(trainer=self.trainer, cadet=self.cadet)
+        Message.objects.create(sender=self.trainer, receiver=self.cadet, content='a')
+        Message.objects.create(sender=self.trainer, receiver=self.cadet, content='b')
+
+    def test_trainers_with_unread_counts_cached_until_state_changes(self):
+        login(self.client, self.cadet)
+        response = self.client.get('/api/get-trainers/')
+        self.assertEqual(response.json()['trainers'], [{
+            'id': self.trainer.id, 'username': 'trainer1', 'full_name': 'Trainer1', 'unread_count': 2}])
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get('/api/get-trainers/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertFalse([q for q in ctx.captured_queries if 'main_message' in q['sql']])
+
+        Message.objects.filter(receiver=self.cadet).update(is_read=True)
+        Message.objects.create(sender=self.trainer, receiver=self.cadet, content='c')
+        response = self.client.get('/api/get-trainers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['trainers'][0]['unread_count'], 1)
+
+    @override_settings(COMPRESS_MIN_BYTES=1)
+    def test_compressed_responses_still_revalidate(self):
+        # enough partners for the bodies to shrink under gzip
+        trainers = User.objects.bulk_create(
+            User(username=f'trainer-extra{i}', full_name=f'Extra Trainer {i}', rank='trainer') for i in range(30))
+        Assignment.objects.bulk_create(Assignment(trainer=t, cadet=self.cadet) for t in trainers)
+        Message.objects.bulk_create(Message(sender=t, receiver=self.cadet, content='x') for t in trainers)
+        login(self.client, self.cadet)
+        for path in ('/api/unread-state/', '/api/get-trainers/'):
+            first = self.client.get(path, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(first['Content-Encoding'], 'gzip')
+            self.assertTrue(first['ETag'].startswith('W/'))
+            again = self.client.get(path, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(again.status_code, 304)
+
+    def test_renamed_partner_changes_the_etag(self):
+        login(self.client, self.cadet)
+        etag = self.client.get('/api/get-trainers/')['ETag']
+        self.trainer.full_name = 'Renamed'
+        self.trainer.save()
+        response = self.client.get('/api/get-trainers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['trainers'][0]['full_name'], 'Renamed')
+
+    def test_cadets_endpoint_is_for_trainers(self):
+        login(self.client, self.cadet)
+        self.assertEqual(self.client.get('/api/get-cadets/').status_code, 403)
+        login(self.client, self.trainer)
+        cadets = self.client.get('/api/get-cadets/').json()['cadets']
+        self.assertEqual([(c['id'], c['unread_count']) for c in cadets], [(self.cadet.id, 0)])
+
+        other = make_user('cadet2', 'cadet')
+        Assignment.objects.create(trainer=self.trainer, cadet=other)
+        self.assertEqual(len(self.client.get('/api/get-cadets/').json()['cadets']), 2)
+
+    def test_my_evaluations(self):
+        login(self.client, self.cadet)
+        self.assertEqual(self.client.get('/api/my-evaluations/').json(), {'count': 0, 'average': None})
+        Evaluation.objects.create(trainer=self.trainer, cadet=self.cadet, score=80, comments='')
+        Evaluation.objects.create(trainer=self.trainer, cadet=self.cadet, score=95, comments='')
+        self.assertEqual(self.client.get('/api/my-evaluations/').json(), {'count': 2, 'average': 87.5})
+
+    def test_notification_read(self):
+        notif = Notification.objects.create(user=self.cadet, message='hi')
+        login(self.client, self.cadet)
+        self.assertEqual(self.client.post(f'/api/notification/{notif.id}/read/').json(), {'status': 'ok'})
+        notif.refresh_from_db()
+        self.assertTrue(notif.is_read)
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.admin = make_user('chief', 'police_chief')
+
+    def test_records_latency_and_sql_per_view(self):
+        login(self.client, self.admin)
+        response = self.client.get('/admin-dashboard/')
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", discord;dur=')
+        self.assertEqual(metrics.registry.requests[('admin_dashboard', 'GET', 200)], 1)
+        self.assertEqual(metrics.registry.latency[('admin_dashboard', 'GET')].total, 1)
+        self.assertGreater(metrics.registry.sql_queries['admin_dashboard'], 0)
+
+    def test_unchanged_poll_runs_no_queries_with_a_session(self):
+        apply_setting.invalidate()
+        self.addCleanup(apply_setting.invalidate)
+        login(self.client, self.admin)
+        etag = self.client.get('/api/apply_status/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/apply_status/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_no_server_timing_for_other_users(self):
+        self.assertNotIn('Server-Timing', self.client.get('/'))
+        login(self.client, make_user('cadet1', 'cadet'))
+        self.assertNotIn('Server-Timing', self.client.get('/cadet-dashboard/'))
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_endpoint(self):
+        self.client.get('/')
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer nope').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{view="login",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="login",method="GET",le="+Inf"} 1', body)
+        self.assertNotIn('view="metrics"', body)
+
+
+@override_settings(METRICS_TOKEN='lt', SESSION_USER_CACHE_TTL=0)
+class LoadTestHarnessTests(LiveServerTestCase):
+    """Short waves with no think time; one simulated user at a time, as the
+    live server shares a single SQLite connection between its threads."""
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.stub = loadtest.DiscordStub().start()
+        self.addCleanup(self.stub.stop)
+        for patcher in (mock.patch('main.discord_utils.get_client', return_value=DiscordClient(base_url=self.stub.url)),
+                        mock.patch.dict('os.environ', {'DISCORD_CLIENT_ID': 'cid', 'DISCORD_CLIENT_SECRET': 'secret'})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([loadtest.percentile(values, p) for p in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual(loadtest.percentile([7], 99), 7)
+        self.assertIsNone(loadtest.percentile([], 50))
+
+    def test_applicant_completes_the_test(self):
+        ApplicationSetting.objects.create(id=1, status='closed', closed_message='later')
+        real = outbox.enqueue_channel_message('1', 'real post')
+        loadtest.seed(trainers=0, cadets_per_trainer=0)
+        recorder = loadtest.run_wave(self.live_server_url, [], applicants=1, duration=3, think_scale=0)
+        rows = {(r['method'], r['view']): r for r in recorder.summary()}
+
+        self.assertEqual(sum(r['errors'] for r in rows.values()), 0, rows)
+        self.assertGreaterEqual(rows[('POST', 'apply_submit_answer')]['count'], 10)
+        self.assertIn(('GET', 'discord_oauth_status'), rows)
+        finished = Application.objects.filter(discord_id__startswith=loadtest.DISCORD_ID_PREFIX, status='completed')
+        self.assertTrue(finished.exists())
+        self.assertGreater(self.stub.calls['POST /oauth2/token'], 0)
+
+        db = loadtest.scrape_db_stats(self.live_server_url, 'lt')
+        self.assertGreater(db['apply_submit_answer']['queries'], 0)
+
+        self.assertTrue(AuditLog.objects.exists())
+        loadtest.cleanup()
+        self.assertFalse(Application.objects.filter(discord_id__startswith=loadtest.DISCORD_ID_PREFIX).exists())
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertEqual(list(DiscordOutbox.objects.values_list('id', flat=True)), [real.id])
+        setting = ApplicationSetting.objects.get(id=1)
+        self.assertEqual((setting.status, setting.closed_message), ('closed', 'later'))
+        self.assertFalse(Question.objects.exists())
+
+    def test_trainer_polls_and_chats(self):
+        accounts = loadtest.seed(trainers=1, cadets_per_trainer=2, messages_per_chat=2)
+        recorder = loadtest.run_wave(self.live_server_url, accounts, applicants=0, duration=2, think_scale=0)
+        rows = {(r['method'], r['view']): r for r in recorder.summary()}
+
+        self.assertEqual(sum(r['errors'] for r in rows.values()), 0, rows)
+        self.assertEqual(rows[('POST', 'login')]['statuses'], {302: 1})
+        for key in (('GET', 'unread_state_api'), ('GET', 'chat_messages_api'), ('POST', 'chat')):
+            self.assertIn(key, rows)
+
+        self.assertTrue(DiscordOutbox.objects.exists())
+        loadtest.cleanup()
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertFalse(DiscordOutbox.objects.exists())
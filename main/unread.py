@@ -0,0 +1,66 @@
+"""Versioned unread state for the dashboard badges.
+
+Every user has a version number kept in the cache. It is bumped whenever a
+message or notification addressed to that user is created, read or deleted,
+so a dashboard poll only has to compare versions (no Message/Notification
+queries) when nothing changed.
+
+Bumps made by another process (another web worker, or discord_worker adding
+a notification) are only seen through a shared cache (REDIS_URL). With the
+per-process LocMem cache versions expire after UNSHARED_VERSION_TTL seconds,
+which bounds how long a badge can stay stale.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .checks import cache_is_shared
+from .models import Message, Notification
+
+VERSION_KEY = 'unread_v:{}'
+VERSION_TTL = 60 * 60 * 24
+UNSHARED_VERSION_TTL = 30
+
+
+def _seed():
+    # a fresh seed after a cache eviction never collides with an old ETag
+    return time.time_ns()
+
+
+def _version_ttl():
+    return VERSION_TTL if cache_is_shared() else UNSHARED_VERSION_TTL
+
+
+def get_version(user_id):
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), _version_ttl())
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*user_ids):
+    for uid in user_ids:
+        if not uid:
+            continue
+        key = VERSION_KEY.format(uid)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _seed(), _version_ttl())
+
+
+def unread_counts_by_sender(user_id):
+    """{sender_id: unread count} for messages addressed to user_id, in one query."""
+    counts = Message.objects.filter(receiver_id=user_id, is_read=False).values('sender').annotate(count=Count('id'))
+    return {item['sender']: item['count'] for item in counts}
+
+
+def get_unread_state(user_id):
+    """Unread message counts per sender plus the unread notification count."""
+    return {
+        'counts': unread_counts_by_sender(user_id),
+        'notifications': Notification.objects.filter(user_id=user_id, is_read=False).count(),
+    }
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, metrics
 
 urlpatterns = [
     path('', views.login_view, name='login'),
@@ -7,6 +7,7 @@ urlpatterns = [
     
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/member/<int:uid>/', views.admin_member_detail, name='admin_member_detail'),
+    path('admin/member/<int:uid>/chat/<int:other_id>/', views.admin_member_chat_messages, name='admin_member_chat_messages'),
     path('trainer-dashboard/', views.trainer_dashboard, name='trainer_dashboard'),
     path('cadet-dashboard/', views.cadet_dashboard, name='cadet_dashboard'),
     
@@ -18,11 +19,18 @@ urlpatterns = [
     path('chat/<int:other_id>/', views.chat_view, name='chat'),
     path('evaluate/<int:cadet_id>/', views.evaluate_view, name='evaluate'),
     path('api/read/<int:nid>/', views.mark_read, name='mark_read'),
+    path('api/notification/<int:nid>/read/', views.mark_read, name='notification_read'),
+    path('api/my-evaluations/', views.my_evaluations_api, name='my_evaluations_api'),
+    path('api/get-trainers/', views.get_trainers_api, name='get_trainers_api'),
+    path('api/get-cadets/', views.get_cadets_api, name='get_cadets_api'),
     path('chat/api/messages/<int:other_id>/', views.chat_messages_api, name='chat_messages_api'),
     path('api/unread-messages/', views.get_unread_messages_count, name='get_unread_messages_count'),
+    path('api/unread-state/', views.unread_state_api, name='unread_state_api'),
+    path('metrics', metrics.metrics_view, name='metrics'),
     # Discord OAuth
     path('apply/discord-login/', views.discord_oauth_login, name='discord_oauth_login'),
     path('apply/discord-callback/', views.discord_oauth_callback, name='discord_oauth_callback'),
+    path('apply/discord-callback/status/', views.discord_oauth_status, name='discord_oauth_status'),
     # Apply & Test URLs
     path('apply/', views.apply_page, name='apply_page'),
     path('api/apply_status/', views.apply_status_api, name='apply_status_api'),
@@ -34,6 +42,7 @@ urlpatterns = [
     # Admin applications manager
     path('admin/applications/', views.admin_applications_view, name='admin_applications'),
     path('admin/application/<int:app_id>/action/', views.admin_application_action, name='admin_application_action'),
+    path('admin/applications/bulk/', views.admin_applications_bulk_action, name='admin_applications_bulk_action'),
     path('admin/application/<int:app_id>/view/', views.admin_application_detail, name='admin_application_detail'),
     path('admin/applications/control/', views.admin_applications_control, name='admin_applications_control'),
     path('api/question/<int:qid>/', views.question_api, name='question_api'),
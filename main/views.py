@@ -1,35 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.http import JsonResponse, HttpResponseForbidden, HttpResponseNotModified
 from django.contrib.auth.hashers import make_password, check_password
-from .models import User, Assignment, Evaluation, Message, Notification, Application, Question, TestSession, ApplicantAnswer, ApplicationSetting, AuditLog, AuditTemplate
-from django.db import IntegrityError
-from django.db.models import Q
+from .models import User, Assignment, Evaluation, Message, Notification, Application, Question, TestSession, ApplicantAnswer, ApplicationSetting, AuditLog, AuditTemplate, ApplicationJob, DiscordOutbox
+from .middleware import get_session_user
+from django.db import IntegrityError, transaction
+from django.db.models import Q, F
 from django.db import models
 from django.views.decorators.csrf import csrf_exempt
 import os
 from django.utils import timezone
 import datetime
 import logging
-from django.views.decorators.http import require_POST
-import random
+from django.views.decorators.http import require_POST, condition
+from django.utils.http import parse_etags
 import secrets
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode
 from django.conf import settings
 
 
 # --- Helpers ---
-def get_session_user(request):
-    uid = request.session.get('uid')
-    if not uid:
-        return None
-    try:
-        return User.objects.get(id=uid)
-    except User.DoesNotExist:
-        return None
-
 def role_required(roles):
     """Deprecated - use rank_required instead"""
     def decorator(view_func):
@@ -154,32 +148,18 @@ def admin_member_detail(request, uid):
     else:
         evals = []
 
-    # Get Chat History - organize by conversation partner
-    all_messages = Message.objects.filter(
-        models.Q(sender=target_user) | models.Q(receiver=target_user)
-    ).select_related('sender', 'receiver').order_by('created_at')
-    
-    # Group messages by conversation partner
-    chats_dict = {}
-    for msg in all_messages:
-        # Determine the other person in the conversation
-        other_user = msg.receiver if msg.sender == target_user else msg.sender
-        
-        if other_user.id not in chats_dict:
-            chats_dict[other_user.id] = {
-                'other': other_user,
-                'messages': []
-            }
-        
-        chats_dict[other_user.id]['messages'].append({
-            'sender_id': msg.sender.id,
-            'content': msg.content,
-            'timestamp': msg.created_at
+    # Chat overview from the Conversation summary table; each conversation's
+    # messages are loaded on demand (admin_member_chat_messages)
+    chats = []
+    for conv in conversations.for_user(target_user.id):
+        chats.append({
+            'other': conv.other(target_user.id),
+            'message_count': conv.message_count,
+            'unread_count': conv.unread_for(target_user.id),
+            'last_message': conv.last_message,
+            'last_message_at': conv.last_message_at,
         })
-    
-    # Convert to list
-    chats = list(chats_dict.values())
-    
+
     if request.method == 'POST':
         msg_content = request.POST.get('message')
         Notification.objects.create(user=target_user, message=msg_content)
@@ -192,22 +172,41 @@ def admin_member_detail(request, uid):
         'actor': actor,
     })
 
+
+@rank_required()
+def admin_member_chat_messages(request, uid, other_id):
+    """One page of a member's conversation for admin_member_detail (before_id cursor)."""
+    actor = get_session_user(request)
+    target_user = get_object_or_404(User, id=uid)
+    if not actor.can_manage_user(target_user):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    other = get_object_or_404(User, id=other_id)
+
+    page = _conversation(target_user, other).order_by('-id')
+    before_id = request.GET.get('before_id')
+    if before_id:
+        try:
+            page = page.filter(id__lt=int(before_id))
+        except ValueError:
+            return JsonResponse({'error': 'Bad cursor'}, status=400)
+    page = list(page[:CHAT_PAGE_SIZE + 1])
+    return JsonResponse({
+        'messages': [serialize_message(m) for m in reversed(page[:CHAT_PAGE_SIZE])],
+        'has_more': len(page) > CHAT_PAGE_SIZE,
+    })
+
 @role_required(['trainer'])
 def trainer_dashboard(request):
     user = get_session_user(request)
     assignments = Assignment.objects.filter(trainer=user).select_related('cadet')
     
-    # Get cadets with unread message counts
+    # Get cadets with unread message counts (one grouped query for all cadets)
+    unread_counts = unread.unread_counts_by_sender(user.id)
     cadets_data = []
     for a in assignments:
-        unread_count = Message.objects.filter(
-            sender=a.cadet,
-            receiver=user,
-            is_read=False
-        ).count()
         cadets_data.append({
             'cadet': a.cadet,
-            'unread_count': unread_count
+            'unread_count': unread_counts.get(a.cadet_id, 0)
         })
     
     notifs = Notification.objects.filter(user=user, is_read=False)
@@ -222,17 +221,13 @@ def cadet_dashboard(request):
     user = get_session_user(request)
     assignments = Assignment.objects.filter(cadet=user).select_related('trainer')
     
-    # Get trainers with unread message counts
+    # Get trainers with unread message counts (one grouped query for all trainers)
+    unread_counts = unread.unread_counts_by_sender(user.id)
     trainers_data = []
     for a in assignments:
-        unread_count = Message.objects.filter(
-            sender=a.trainer,
-            receiver=user,
-            is_read=False
-        ).count()
         trainers_data.append({
             'trainer': a.trainer,
-            'unread_count': unread_count
+            'unread_count': unread_counts.get(a.trainer_id, 0)
         })
     
     notifications = Notification.objects.filter(user=user, is_read=False).order_by('-created_at')
@@ -399,6 +394,16 @@ from django.utils import timezone
 import json
 import re
 from . import discord_utils
+from .consumers import push_chat_message, serialize_message
+from . import unread
+from . import outbox
+from . import jobs
+from . import apply_setting
+from . import questions
+from . import conversations
+from . import search
+from . import discord_oauth
+from . import dashboard
 
 logger = logging.getLogger(__name__)
 
@@ -413,102 +418,128 @@ def _audit_log(action, actor_user, target='', details=''):
         ch = os.getenv('DISCORD_LOG_CHANNEL_ID', '1446744094952128733')
         if not ch:
             return
+        # queued; delivered by the discord_worker process
+        outbox.enqueue_channel_message(ch, _audit_channel_message(action, actor_user, target, details))
+    except Exception:
+        pass
+
+
+def _audit_log_bulk(entries):
+    """Bulk version of _audit_log for (action, actor_user, target, details) tuples."""
+    try:
+        AuditLog.objects.bulk_create([
+            AuditLog(actor=actor_user, action=action, target=target, details=details)
+            for action, actor_user, target, details in entries
+        ])
+    except Exception:
+        logger.exception('_audit_log_bulk: failed to write audit rows')
+
+    try:
+        ch = os.getenv('DISCORD_LOG_CHANNEL_ID', '1446744094952128733')
+        if not ch:
+            return
+        DiscordOutbox.objects.bulk_create([
+            DiscordOutbox(channel_id=ch, content=_audit_channel_message(*entry))
+            for entry in entries
+        ])
+    except Exception:
+        logger.exception('_audit_log_bulk: failed to queue channel posts')
+
+
+def _audit_channel_message(action, actor_user, target='', details=''):
+    """Format the Discord audit-channel line for an audit entry."""
+    # دالة مساعدة لإنشاء Discord mention
+    def create_discord_mention(user_obj):
+        if not user_obj:
+            return "النظام"
         
-        # دالة مساعدة لإنشاء Discord mention
-        def create_discord_mention(user_obj):
-            if not user_obj:
-                return "النظام"
-            
-            # إذا كان لدى المستخدم discord_id
-            if hasattr(user_obj, 'discord_id') and user_obj.discord_id:
-                # استخراج الأرقام فقط
-                numbers = re.findall(r'\d+', str(user_obj.discord_id))
-                if numbers:
-                    return f"<@{numbers[0]}>"
-            
-            # استخدم username كبديل
-            return f"@{getattr(user_obj, 'username', 'مستخدم')}"
-        
-        # منشن للمستخدم الفاعل
-        actor_mention = create_discord_mention(actor_user)
-        
-        # إيموجيات وأسماء
-        emojis = {
-            'prelim_accept': '✅', 'final_accept': '🎯', 'reject': '❌',
-            'apply_submit': '📝', 'evaluate': '⭐', 'login': '🔓',
-            'logout': '🔒', 'admin_add_user': '➕', 'assign_trainer': '👥',
-            'send_dm_custom': '💬'
-        }
-        
-        action_names = {
-            'prelim_accept': 'قبول مبدئي',
-            'final_accept': 'قبول نهائي',
-            'reject': 'رفض',
-            'apply_submit': 'تقديم جديد',
-            'evaluate': 'تقييم',
-            'login': 'تسجيل دخول',
-            'logout': 'تسجيل خروج',
-            'admin_add_user': 'إضافة مستخدم',
-            'assign_trainer': 'تعيين',
-            'open_all': 'فتح التقديم',
-            'close_with_message_global': 'إغلاق مع رسالة',
-            'close_with_timer_global': 'إغلاق مع مؤقت',
-            'delete_assignment': 'حذف تعيين',
-            'admin_edit_user': 'تعديل معلومات مستخدم',
-            'admin_delete_user': 'حذف مستخدم',
-            'send_dm_custom': 'رسالة خاصة',
-            'hide': 'إخفاء طلب',
-            'start_test': 'بدء الاختبار',
-            'finish_test': 'انتهى من الاختبار',
-        }
-        
-        emoji = emojis.get(action, '📌')
-        title = action_names.get(action, action)
-        
-        # رسائل بسيطة مع منشن
-        if action == 'prelim_accept':
-            # استخراج Discord ID من التفاصيل
-            discord_match = re.search(r'\(([0-9]+)\)', details)
-            applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "متدرب"
-            message = f"{emoji} **{title}** - {actor_mention} → {applicant_mention}"
-        
-        elif action == 'final_accept':
-            discord_match = re.search(r'\(([0-9]+)\)', details)
-            applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "متدرب"
-            message = f"{emoji} **{title}** - {actor_mention} → {applicant_mention}"
-        
-        elif action == 'reject':
-            discord_match = re.search(r'\(([0-9]+)\)', details)
-            applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "متدرب"
-            message = f"{emoji} **{title}** - {actor_mention} → {applicant_mention}"
-        
-        elif action == 'apply_submit':
-            # أخذ Discord ID من التفاصيل مباشرة
-            discord_match = re.search(r'by discord ([0-9]+)', details)
-            applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "مستخدم"
-            message = f"{emoji} **{title}** - {applicant_mention}"
+        # إذا كان لدى المستخدم discord_id
+        if hasattr(user_obj, 'discord_id') and user_obj.discord_id:
+            # استخراج الأرقام فقط
+            numbers = re.findall(r'\d+', str(user_obj.discord_id))
+            if numbers:
+                return f"<@{numbers[0]}>"
         
-        elif action == 'evaluate':
-            # محاولة استخراج Discord ID للمتدرب من الـ target
-            cadet_id_match = re.search(r'cadet:(\d+)', target)
-            if cadet_id_match:
-                try:
-                    cadet = User.objects.get(id=cadet_id_match.group(1))
-                    cadet_mention = create_discord_mention(cadet)
-                except:
-                    cadet_mention = "متدرب"
-            else:
+        # استخدم username كبديل
+        return f"@{getattr(user_obj, 'username', 'مستخدم')}"
+    
+    # منشن للمستخدم الفاعل
+    actor_mention = create_discord_mention(actor_user)
+    
+    # إيموجيات وأسماء
+    emojis = {
+        'prelim_accept': '✅', 'final_accept': '🎯', 'reject': '❌',
+        'apply_submit': '📝', 'evaluate': '⭐', 'login': '🔓',
+        'logout': '🔒', 'admin_add_user': '➕', 'assign_trainer': '👥',
+        'send_dm_custom': '💬'
+    }
+    
+    action_names = {
+        'prelim_accept': 'قبول مبدئي',
+        'final_accept': 'قبول نهائي',
+        'reject': 'رفض',
+        'apply_submit': 'تقديم جديد',
+        'evaluate': 'تقييم',
+        'login': 'تسجيل دخول',
+        'logout': 'تسجيل خروج',
+        'admin_add_user': 'إضافة مستخدم',
+        'assign_trainer': 'تعيين',
+        'open_all': 'فتح التقديم',
+        'close_with_message_global': 'إغلاق مع رسالة',
+        'close_with_timer_global': 'إغلاق مع مؤقت',
+        'delete_assignment': 'حذف تعيين',
+        'admin_edit_user': 'تعديل معلومات مستخدم',
+        'admin_delete_user': 'حذف مستخدم',
+        'send_dm_custom': 'رسالة خاصة',
+        'hide': 'إخفاء طلب',
+        'start_test': 'بدء الاختبار',
+        'finish_test': 'انتهى من الاختبار',
+    }
+    
+    emoji = emojis.get(action, '📌')
+    title = action_names.get(action, action)
+    
+    # رسائل بسيطة مع منشن
+    if action == 'prelim_accept':
+        # استخراج Discord ID من التفاصيل
+        discord_match = re.search(r'\(([0-9]+)\)', details)
+        applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "متدرب"
+        message = f"{emoji} **{title}** - {actor_mention} → {applicant_mention}"
+    
+    elif action == 'final_accept':
+        discord_match = re.search(r'\(([0-9]+)\)', details)
+        applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "متدرب"
+        message = f"{emoji} **{title}** - {actor_mention} → {applicant_mention}"
+    
+    elif action == 'reject':
+        discord_match = re.search(r'\(([0-9]+)\)', details)
+        applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "متدرب"
+        message = f"{emoji} **{title}** - {actor_mention} → {applicant_mention}"
+    
+    elif action == 'apply_submit':
+        # أخذ Discord ID من التفاصيل مباشرة
+        discord_match = re.search(r'by discord ([0-9]+)', details)
+        applicant_mention = f"<@{discord_match.group(1)}>" if discord_match else "مستخدم"
+        message = f"{emoji} **{title}** - {applicant_mention}"
+    
+    elif action == 'evaluate':
+        # محاولة استخراج Discord ID للمتدرب من الـ target
+        cadet_id_match = re.search(r'cadet:(\d+)', target)
+        if cadet_id_match:
+            try:
+                cadet = User.objects.get(id=cadet_id_match.group(1))
+                cadet_mention = create_discord_mention(cadet)
+            except:
                 cadet_mention = "متدرب"
-            
-            message = f"{emoji} **{title}** - {actor_mention} → {cadet_mention}"
-        
         else:
-            message = f"{emoji} **{title}** - {actor_mention}"
+            cadet_mention = "متدرب"
         
-        discord_utils.send_channel_message(ch, message)
-        
-    except Exception:
-        pass
+        message = f"{emoji} **{title}** - {actor_mention} → {cadet_mention}"
+    
+    else:
+        message = f"{emoji} **{title}** - {actor_mention}"
+    
+    return message
 
 
 def _parse_reopen_dt(dt_str):
@@ -542,6 +573,17 @@ def _parse_reopen_dt(dt_str):
         return None
     return None
 
+
+CHAT_PAGE_SIZE = 50
+
+
+def _conversation(user, other):
+    """Messages between two users, both directions (served by msg_pair_id_idx)."""
+    return Message.objects.filter(
+        models.Q(sender=user, receiver=other) | models.Q(sender=other, receiver=user)
+    )
+
+
 def chat_view(request, other_id):
     user = get_session_user(request)
     if not user: 
@@ -564,6 +606,7 @@ def chat_view(request, other_id):
                 receiver=other, 
                 content=content
             )
+            push_chat_message(msg)
             
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({
@@ -576,34 +619,24 @@ def chat_view(request, other_id):
             
             return redirect('chat', other_id=other_id)
     
-    # إرسال timestamps مع الرسائل
-    messages = Message.objects.filter(
-        models.Q(sender=user, receiver=other) | 
-        models.Q(sender=other, receiver=user)
-    ).order_by('created_at')
-    
+    # only the newest CHAT_PAGE_SIZE messages; older ones load on scroll (before_id)
+    recent = list(_conversation(user, other).order_by('-id')[:CHAT_PAGE_SIZE + 1])
+    has_more = len(recent) > CHAT_PAGE_SIZE
+    messages = recent[:CHAT_PAGE_SIZE][::-1]
+
     # Mark messages from other person as read
-    Message.objects.filter(
+    marked = Message.objects.filter(
         sender=other,
         receiver=user,
         is_read=False
     ).update(is_read=True)
-    
-    # تحويل الرسائل إلى قائمة مع timestamps
-    messages_data = []
-    for msg in messages:
-        messages_data.append({
-            'id': msg.id,
-            'content': msg.content,
-            'sender_id': msg.sender.id,
-            'timestamp': msg.created_at.isoformat(),
-            'time': msg.created_at.strftime("%H:%M"),
-            'date': msg.created_at.strftime("%Y/%m/%d")
-        })
-    
+    if marked:
+        unread.bump_version(user.id)
+        conversations.mark_read(user.id, other.id)
+
     return render(request, 'chat.html', {
-        'messages_json': json.dumps(messages_data),  # إرسال كـ JSON
         'messages': messages,
+        'has_more': has_more,
         'other': other, 
         'user': user,
         'my_id': user.id
@@ -625,44 +658,54 @@ def chat_messages_api(request, other_id):
         if not is_assigned:
             return JsonResponse({'error': 'Forbidden'}, status=403)
     
-    # الحصول على الرسائل الجديدة فقط
+    # before_id: a page of older history (scrolling up); otherwise only the
+    # messages newer than last_id (polling fallback)
+    before_id = request.GET.get('before_id')
+    if before_id:
+        try:
+            before_id = int(before_id)
+        except ValueError:
+            return JsonResponse({'error': 'Bad cursor'}, status=400)
+        page = list(_conversation(user, other).filter(id__lt=before_id).order_by('-id')[:CHAT_PAGE_SIZE + 1])
+        return JsonResponse({
+            'messages': [serialize_message(m) for m in reversed(page[:CHAT_PAGE_SIZE])],
+            'has_more': len(page) > CHAT_PAGE_SIZE,
+        })
+
     last_id = request.GET.get('last_id', 0)
     try:
         last_id = int(last_id)
     except:
         last_id = 0
-    
-    messages = Message.objects.filter(
-        (models.Q(sender=user, receiver=other) | models.Q(sender=other, receiver=user))
-    ).filter(id__gt=last_id).order_by('created_at')
-    
-    messages_data = []
-    for msg in messages:
-        messages_data.append({
-            'id': msg.id,
-            'content': msg.content,
-            'sender_id': msg.sender.id,
-            'timestamp': msg.created_at.isoformat()  # تنسيق ISO الكامل
-        })
-    
-    return JsonResponse({'messages': messages_data})
+
+    messages = _conversation(user, other).filter(id__gt=last_id).order_by('id')
+    return JsonResponse({'messages': [serialize_message(m) for m in messages]})
 
 
 def question_api(request, qid):
-    # Simple API to fetch a question by id
-    q = get_object_or_404(Question, id=qid)
-    return JsonResponse({'id': q.id, 'text': q.text, 'options': q.options()})
+    # Simple API to fetch a question by id (served from the in-memory bank)
+    data = questions.public_question(qid)
+    if data is None:
+        return JsonResponse({'error': 'not found'}, status=404)
+    return JsonResponse(data)
 
 
+@condition(etag_func=apply_setting.etag, last_modified_func=apply_setting.last_modified)
 def apply_status_api(request):
-    """Return JSON with current apply open/closed status and optional reopen_at epoch."""
+    """Return JSON with current apply open/closed status and optional reopen_at epoch.
+
+    The setting comes from the cache and the response carries ETag /
+    Last-Modified, so the pages' polls are answered with 304 until it changes.
+    """
     try:
-        setting, _ = ApplicationSetting.objects.get_or_create(id=1)
+        setting = apply_setting.get_setting()
     except Exception:
         setting = ApplicationSetting.objects.first()
 
-    if setting:
-        open_mode = (setting.status != 'closed')
+    # same rule as apply_page, so a passed timer doesn't make the page reload
+    # on every poll until the worker applies the reopen
+    if setting and not setting.is_open():
+        open_mode = False
         closed_message = setting.closed_message or ''
         reopen_at = int(setting.reopen_at.timestamp()) if setting.reopen_at else None
     else:
@@ -670,7 +713,9 @@ def apply_status_api(request):
         closed_message = ''
         reopen_at = None
 
-    return JsonResponse({'open': open_mode, 'closed_message': closed_message, 'reopen_at': reopen_at})
+    response = JsonResponse({'open': open_mode, 'closed_message': closed_message, 'reopen_at': reopen_at})
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
 @role_required(['trainer'])
@@ -719,14 +764,81 @@ def get_unread_messages_count(request):
         return JsonResponse({'status': 'error'}, status=403)
     
     # Get unread messages grouped by sender
-    from django.db.models import Count
-    counts = Message.objects.filter(receiver=user, is_read=False).values('sender').annotate(count=Count('id'))
-    
-    unread_data = {item['sender']: item['count'] for item in counts}
+    unread_data = unread.unread_counts_by_sender(user.id)
         
     return JsonResponse({'counts': unread_data})
 
 
+def _etag_matches(request, etag):
+    """Weak If-None-Match comparison (RFC 9110 13.1.2).
+
+    CompressionMiddleware turns the ETag of a compressed response into a weak
+    one, so the client sends back W/"..." for an ETag set here as "...".
+    """
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or any(e.removeprefix('W/') == etag.removeprefix('W/') for e in etags)
+
+
+def _partners_response(request, rank):
+    uid = request.session.get('uid')
+    user = get_session_user(request) if uid else None
+    if user is None or user.rank != rank:
+        return JsonResponse({'status': 'error'}, status=403)
+
+    version = unread.get_version(uid)
+    etag = f'"p{uid}-{version}"'
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        key = 'trainers' if rank == 'cadet' else 'cadets'
+        response = JsonResponse({key: dashboard.partners(user, version)})
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def get_trainers_api(request):
+    """Trainers assigned to the current cadet, with unread counts."""
+    return _partners_response(request, 'cadet')
+
+
+def get_cadets_api(request):
+    """Cadets assigned to the current trainer, with unread counts."""
+    return _partners_response(request, 'trainer')
+
+
+def my_evaluations_api(request):
+    uid = request.session.get('uid')
+    if not uid:
+        return JsonResponse({'status': 'error'}, status=403)
+    response = JsonResponse(dashboard.evaluation_stats(uid))
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def unread_state_api(request):
+    """Unread messages per sender plus unread notifications, versioned with an ETag.
+
+    Polls that send back the last ETag get a 304 without touching the
+    Message/Notification tables (or even the User table).
+    """
+    uid = request.session.get('uid')
+    if not uid:
+        return JsonResponse({'status': 'error'}, status=403)
+
+    etag = f'"u{uid}-{unread.get_version(uid)}"'
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(unread.get_unread_state(uid))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 # --- Discord OAuth Views ---
 def discord_oauth_login(request):
     """Redirect to Discord OAuth authorization page with cooldown protection"""
@@ -773,25 +885,11 @@ def discord_oauth_login(request):
 
 
 def discord_oauth_callback(request):
-    
-    import os
-    import time
-    import json
-    import logging
-    import requests
-    from django.utils import timezone
-
-    logger.error(
-    "CALLBACK | secure=%s | proto=%s | host=%s",
-    request.is_secure(),
-    request.META.get('HTTP_X_FORWARDED_PROTO'),
-    request.get_host()
-)
-
-    logger = logging.getLogger('discord_oauth_debug')
-
-    request.session.pop('discord_oauth_in_progress', None)
+    """Start the code exchange in the background and show the handshake page.
 
+    The exchange itself runs in discord_oauth (pooled client, Retry-After
+    honoured off the request path); the page polls discord_oauth_status.
+    """
     code = request.GET.get('code')
     error = request.GET.get('error')
 
@@ -803,94 +901,40 @@ def discord_oauth_callback(request):
         request.session['error_message'] = 'لم يتم استلام رمز التحقق من Discord.'
         return redirect('apply_page')
 
-    # 🛡️ منع إعادة استخدام نفس code
-    used_code = request.session.get('discord_oauth_code_used')
-    if used_code == code:
-        return redirect('apply_page')
-
-    request.session['discord_oauth_in_progress'] = True
-    request.session['discord_oauth_code_used'] = code
-    request.session.modified = True
-
-    def request_with_retry(method, url, **kwargs):
-        for attempt in range(3):
-            try:
-                r = requests.request(method, url, timeout=10, **kwargs)
-                if r.status_code != 429:
-                    return r
-                time.sleep(2 ** attempt)
-            except requests.RequestException:
-                if attempt == 2:
-                    raise
-        return None
-
-    try:
-        client_id = os.getenv('DISCORD_CLIENT_ID', '').strip()
-        client_secret = os.getenv('DISCORD_CLIENT_SECRET', '').strip()
-
-        if not client_id or not client_secret:
-            request.session['error_message'] = 'Discord OAuth غير مهيأ بشكل صحيح.'
-            return redirect('apply_page')
-
-        redirect_uri = request.build_absolute_uri('/apply/discord-callback/')
-
-        token_res = request_with_retry(
-            'POST',
-            'https://discord.com/api/v10/oauth2/token',
-            data={
-                'client_id': client_id,
-                'client_secret': client_secret,
-                'grant_type': 'authorization_code',
-                'code': code,
-                'redirect_uri': redirect_uri,
-            },
-            headers={'Content-Type': 'application/x-www-form-urlencoded'}
-        )
-
-        if not token_res or token_res.status_code >= 400:
-            request.session['error_message'] = 'فشل التحقق مع Discord.'
-            return redirect('apply_page')
-
-        token_json = token_res.json()
-        access_token = token_json.get('access_token')
-
-        if not access_token:
-            request.session['error_message'] = 'لم يتم استلام access token.'
-            return redirect('apply_page')
-
-        user_res = request_with_retry(
-            'GET',
-            'https://discord.com/api/v10/users/@me',
-            headers={'Authorization': f'Bearer {access_token}'}
-        )
-
-        if not user_res or user_res.status_code >= 400:
-            request.session['error_message'] = 'فشل جلب بيانات المستخدم من Discord.'
-            return redirect('apply_page')
-
-        user_json = user_res.json()
-        discord_id = user_json.get('id')
-        username = user_json.get('username', '')
-
-        if not discord_id:
-            request.session['error_message'] = 'لم يتم استلام Discord ID.'
-            return redirect('apply_page')
-
-        # ✅ حفظ البيانات في session
-        request.session['discord_id'] = str(discord_id)
-        request.session['discord_username'] = username
-        request.session.modified = True
+    redirect_uri = request.build_absolute_uri('/apply/discord-callback/')
+    token = discord_oauth.start(code, redirect_uri)
+    request.session['discord_oauth_token'] = token
 
+    # a double-submitted callback for a finished exchange completes right away
+    outcome = discord_oauth.status(token)
+    if outcome and outcome['state'] != discord_oauth.PENDING:
+        _finish_discord_login(request, outcome)
         return redirect('apply_page')
+    return render(request, 'discord_oauth_wait.html')
 
-    except Exception as e:
-        logger.exception('Discord OAuth callback failed')
-        request.session['error_message'] = 'حدث خطأ غير متوقع أثناء تسجيل الدخول.'
-        return redirect('apply_page')
 
-    finally:
-        request.session['discord_oauth_in_progress'] = False
-        request.session.modified = True
+def _finish_discord_login(request, outcome):
+    request.session.pop('discord_oauth_token', None)
+    if outcome['state'] == discord_oauth.OK:
+        request.session['discord_id'] = outcome['discord_id']
+        request.session['discord_username'] = outcome['username']
+    else:
+        request.session['error_message'] = outcome['message']
+
+
+def discord_oauth_status(request):
+    """Polled by the handshake page until the exchange has finished."""
+    token = request.session.get('discord_oauth_token')
+    outcome = discord_oauth.status(token)
+    if outcome is None:
+        if token:
+            request.session.pop('discord_oauth_token', None)
+            request.session['error_message'] = 'انتهت مهلة تسجيل الدخول عبر Discord، حاول مرة أخرى.'
+        return JsonResponse({'status': 'done', 'redirect': reverse('apply_page')})
+    if outcome['state'] == discord_oauth.PENDING:
+        return JsonResponse({'status': 'pending'})
+    _finish_discord_login(request, outcome)
+    return JsonResponse({'status': 'done', 'redirect': reverse('apply_page')})
 
 # --- Apply & Test Views ---
 def apply_page(request):
@@ -911,23 +955,16 @@ def apply_page(request):
             user_already_tested = True
 
     try:
-        setting, _ = ApplicationSetting.objects.get_or_create(id=1)
+        setting = apply_setting.get_setting()
     except Exception:
         setting = None
 
-    now = timezone.now()
-    if setting:
-        if setting.reopen_at and setting.reopen_at <= now:
-            setting.status = 'open'
-            setting.reopen_at = None
-            setting.closed_message = ''
-            setting.save()
-            Application.objects.filter(status='closed').update(status='open')
-
-        if setting.status == 'closed':
-            open_mode = False
-            closed_message = setting.closed_message or ''
-            reopen_at = setting.reopen_at
+    # the reopen itself is applied by the worker (main/reopen.py); a timer
+    # that has already passed is simply shown as open here
+    if setting and not setting.is_open():
+        open_mode = False
+        closed_message = setting.closed_message or ''
+        reopen_at = setting.reopen_at
 
     if user_already_tested:
         open_mode = False
@@ -992,19 +1029,18 @@ def apply_start_test(request, app_id):
     # check global setting as well
     # ensure we reference the singleton setting entry
     try:
-        setting, _ = ApplicationSetting.objects.get_or_create(id=1)
+        setting = apply_setting.get_setting()
     except Exception:
         setting = None
-    if (app.status == 'closed') or (setting and setting.status == 'closed'):
+    if (app.status == 'closed' and not app.reopen_due()) or (setting and not setting.is_open()):
         return render(request, 'apply.html', {'open': False, 'closed_message': setting.closed_message if setting else 'التقديم مغلق'})
 
     try:
-        # pick 10 random questions
-        q_ids = list(Question.objects.values_list('id', flat=True))
-        if len(q_ids) < 10:
+        # pick 10 random questions from the cached bank (no repeats)
+        chosen = questions.sample(10, by=settings.APPLY_TEST_STRATIFY_BY)
+        if chosen is None:
             return render(request, 'apply.html', {'open': False, 'closed_message': 'عدد الاسئلة أقل من 10 - تواصل مع المسؤول'})
 
-        chosen = random.sample(q_ids, 10)
         # Generate unique session token tied to this Discord ID
         session_token = secrets.token_urlsafe(32)
         sess = TestSession.objects.create(
@@ -1109,10 +1145,12 @@ def apply_test_page(request, session_id):
     # Store token in session for future requests
     request.session[f'test_session_{session_id}_token'] = session.session_token
 
-    # send minimal context: session id and question ids
+    # the whole session's questions go out with the page (no answer key),
+    # so moving to the next question needs no request while the timer runs
     return render(request, 'apply_test.html', {
         'session': session,
         'question_ids': qids,
+        'questions': questions.public_bundle(qids),
         'question_time_seconds': 60,
         'initial_countdown_seconds': remaining  # remaining seconds for initial timer
     })
@@ -1120,64 +1158,84 @@ def apply_test_page(request, session_id):
 
 @require_POST
 def apply_submit_answer(request, session_id):
-    session = get_object_or_404(TestSession, id=session_id)
-    
-    # Security: Verify token to ensure it's the correct person submitting
-    token_from_post = request.POST.get('token', '').strip()
-    token_from_session = request.session.get(f'test_session_{session_id}_token', '')
-    
-    # Token must match
-    valid_token = (token_from_post == session.session_token) or (token_from_session == session.session_token)
-    
-    if not valid_token or not session.session_token:
-        return JsonResponse({'error': 'غير مصرح لك بالإجابة. هذا الاختبار مخصص لشخص آخر.'}, status=403)
-
-    # Require the user to be logged in via Discord OAuth
-    discord_in_session = request.session.get('discord_id')
-    if not discord_in_session:
-        return JsonResponse({'error': 'يرجى تسجيل الدخول عبر Discord للوصول إلى الاختبار.'}, status=403)
-
-    # Verify Discord ID matches the application and the logged-in account
-    if session.discord_id != session.application.discord_id or discord_in_session != session.discord_id:
-        return JsonResponse({'error': 'أنت غير مسجل دخول على الحساب الذي يجري الاختبار.'}, status=403)
-    
-    # Verify this is the same user (session) that started the test
-    session_user_id = request.session.get(f'test_session_{session_id}_user_id', None)
-    current_user_id = request.session.session_key
-    
-    if session_user_id != current_user_id:
-        return JsonResponse({'error': 'هذا الاختبار قيد الاستخدام من قبل شخص آخر.'}, status=403)
-    
-    if not session.is_active:
-        return JsonResponse({'error': 'الجلسة غير نشطة'}, status=403)
-
-    qid = int(request.POST.get('question_id'))
+    try:
+        qid = int(request.POST.get('question_id'))
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'سؤال غير صالح'}, status=400)
     sel = request.POST.get('selected_index')
     try:
         sel_index = int(sel)
     except:
         sel_index = None
 
-    q = get_object_or_404(Question, id=qid)
-    is_correct = (sel_index is not None and sel_index == q.correct_index)
-    ans = ApplicantAnswer.objects.create(session=session, question=q, selected_index=sel_index, is_correct=is_correct)
-
-    # update score incrementally (score out of 10)
-    total_correct = ApplicantAnswer.objects.filter(session=session, is_correct=True).count()
-    session.score = (total_correct / 10.0) * 10.0
-    session.save()
-
-    # check if finished
-    answered = ApplicantAnswer.objects.filter(session=session).count()
-    if answered >= 10:
-        session.is_active = False
-        session.finished_at = timezone.now()
-        session.save()
-        session.application.status = 'completed'
-        session.application.save()
+    # answer key from the in-memory question bank (no Question query)
+    correct_index = questions.correct_index(qid)
+    if correct_index is None:
+        return JsonResponse({'error': 'سؤال غير موجود'}, status=404)
+    is_correct = (sel_index is not None and sel_index == correct_index)
+
+    # One transaction: lock the session row, insert the answer and bump the
+    # running counters with F() instead of re-counting ApplicantAnswer rows.
+    with transaction.atomic():
+        session = (TestSession.objects.select_for_update(of=('self',))
+                   .select_related('application').filter(id=session_id).first())
+        if session is None:
+            return JsonResponse({'error': 'الجلسة غير موجودة'}, status=404)
+        app = session.application
+
+        # Security: Verify token to ensure it's the correct person submitting
+        token_from_post = request.POST.get('token', '').strip()
+        token_from_session = request.session.get(f'test_session_{session_id}_token', '')
+
+        # Token must match
+        valid_token = (token_from_post == session.session_token) or (token_from_session == session.session_token)
+
+        if not valid_token or not session.session_token:
+            return JsonResponse({'error': 'غير مصرح لك بالإجابة. هذا الاختبار مخصص لشخص آخر.'}, status=403)
+
+        # Require the user to be logged in via Discord OAuth
+        discord_in_session = request.session.get('discord_id')
+        if not discord_in_session:
+            return JsonResponse({'error': 'يرجى تسجيل الدخول عبر Discord للوصول إلى الاختبار.'}, status=403)
+
+        # Verify Discord ID matches the application and the logged-in account
+        if session.discord_id != app.discord_id or discord_in_session != session.discord_id:
+            return JsonResponse({'error': 'أنت غير مسجل دخول على الحساب الذي يجري الاختبار.'}, status=403)
+
+        # Verify this is the same user (session) that started the test
+        session_user_id = request.session.get(f'test_session_{session_id}_user_id', None)
+        current_user_id = request.session.session_key
+
+        if session_user_id != current_user_id:
+            return JsonResponse({'error': 'هذا الاختبار قيد الاستخدام من قبل شخص آخر.'}, status=403)
+
+        if not session.is_active:
+            return JsonResponse({'error': 'الجلسة غير نشطة'}, status=403)
+
+        ApplicantAnswer.objects.create(session_id=session.id, question_id=qid, selected_index=sel_index, is_correct=is_correct)
+
+        # score out of 10 == number of correct answers
+        answered = session.answered_count + 1
+        correct = session.correct_count + int(is_correct)
+        finished = answered >= 10
+        # score is derived in SQL from the same counter (listed first: MySQL
+        # evaluates SET left to right, so it must still see the old value)
+        changes = {
+            'score': F('correct_count') + int(is_correct),
+            'answered_count': F('answered_count') + 1,
+            'correct_count': F('correct_count') + int(is_correct),
+        }
+        if finished:
+            changes.update(is_active=False, finished_at=timezone.now())
+        TestSession.objects.filter(id=session.id).update(**changes)
+        if finished:
+            app.status = 'completed'
+            app.save(update_fields=['status'])
+
+    if finished:
         try:
             actor = get_session_user(request)
-            _audit_log('finish_test', actor, target=f'session:{session.id}', details=f'session finished with score {session.score}')
+            _audit_log('finish_test', actor, target=f'session:{session.id}', details=f'session finished with score {float(correct)}')
         except Exception:
             pass
 
@@ -1197,51 +1255,133 @@ def apply_test_finished(request, app_id):
     })
 
 
+ADMIN_APPLICATIONS_PAGE_SIZE = 50
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _encode_app_cursor(app):
+    """Keyset cursor for the (-submitted_at, -id) ordering: '<epoch micros>-<id>'."""
+    micros = (app.submitted_at - _EPOCH) // datetime.timedelta(microseconds=1)
+    return f'{micros}-{app.id}'
+
+
+def _decode_app_cursor(raw):
+    try:
+        micros, app_id = raw.split('-', 1)
+        return _EPOCH + datetime.timedelta(microseconds=int(micros)), int(app_id)
+    except (ValueError, OverflowError):
+        return None
+
+
 @rank_required(applications_only=True)
 def admin_applications_view(request):
     # show non-hidden applications and attach latest score for quick review
-    from datetime import timedelta
+    from django.db.models import OuterRef, Subquery, Exists, Prefetch
     q = (request.GET.get('q') or '').strip()
     qs = Application.objects.filter(is_hidden=False)
+    cursor = None
+    page = 1
     if q:
-        qs = qs.filter(models.Q(discord_id__icontains=q) | models.Q(character_name__icontains=q))
-    apps = list(qs.order_by('-submitted_at').all())
+        # ranked search results are paged by offset (see search.py)
+        qs = search.search(qs, q)
+        ordering = ('-search_rank', '-submitted_at', '-id')
+        try:
+            page = max(1, int(request.GET.get('page') or 1))
+        except ValueError:
+            page = 1
+    else:
+        ordering = ('-submitted_at', '-id')
+    total_count = qs.count()
+
+    if not q:
+        # Keyset pagination on (submitted_at, id), newest first
+        cursor = _decode_app_cursor(request.GET.get('before') or '')
+        if cursor:
+            ts, app_id = cursor
+            qs = qs.filter(models.Q(submitted_at__lt=ts) | models.Q(submitted_at=ts, id__lt=app_id))
+
+    # Latest session data for every row in the same query (no per-row lookups)
+    sessions = TestSession.objects.filter(application=OuterRef('pk'))
+    qs = qs.annotate(
+        last_score=Subquery(sessions.order_by('-finished_at', '-started_at').values('score')[:1]),
+        last_started_session_id=Subquery(sessions.order_by('-started_at').values('id')[:1]),
+    ).annotate(
+        # a session that was active but was stopped by admin (is_active False and no finished_at)
+        test_interrupted=Exists(TestSession.objects.filter(
+            id=OuterRef('last_started_session_id'),
+            is_active=False,
+            finished_at__isnull=True,
+            started_at__isnull=False,
+        )),
+    )
+
+    qs = qs.prefetch_related(Prefetch('jobs', queryset=ApplicationJob.objects.order_by('order')))
+
+    offset = (page - 1) * ADMIN_APPLICATIONS_PAGE_SIZE
+    apps = list(qs.order_by(*ordering)[offset:offset + ADMIN_APPLICATIONS_PAGE_SIZE + 1])
+    next_cursor = None
+    next_page = None
+    if len(apps) > ADMIN_APPLICATIONS_PAGE_SIZE:
+        apps = apps[:ADMIN_APPLICATIONS_PAGE_SIZE]
+        if q:
+            next_page = page + 1
+        else:
+            next_cursor = _encode_app_cursor(apps[-1])
+
+    # Check if test is still ongoing (120s initial + 600s for 10 questions = 720s total)
+    # 120 seconds initial countdown + 60 seconds per question * 10 questions = 720 seconds total
+    TEST_DURATION = 720  # seconds
+    now = timezone.now()
     for a in apps:
-        last = a.sessions.order_by('-finished_at', '-started_at').first()
-        a.last_score = last.score if last else None
-        
-        # Check if test is still ongoing (120s initial + 600s for 10 questions = 720s total)
-        # 120 seconds initial countdown + 60 seconds per question * 10 questions = 720 seconds total
-        TEST_DURATION = 720  # seconds
         # Consider the application as "testing" only when its status is explicitly 'testing'
         # and the test_started_at timestamp is within the allowed duration.
         if a.status == 'testing' and a.test_started_at:
-            elapsed = (timezone.now() - a.test_started_at).total_seconds()
+            elapsed = (now - a.test_started_at).total_seconds()
             a.is_testing = elapsed < TEST_DURATION
         else:
             a.is_testing = False
+        a.has_failed_jobs = any(j.status == 'failed' for j in a.jobs.all())
 
-        # Detect interrupted test sessions: a session that was active but was stopped
-        # by admin (is_active False and no finished_at) — mark for UI to restrict actions.
-        a.test_interrupted = False
-        try:
-            last_session = a.sessions.order_by('-started_at').first()
-            if last_session and not last_session.is_active and last_session.finished_at is None and last_session.started_at:
-                # If application status is closed or session was force-stopped, show interrupted state
-                a.test_interrupted = True
-        except Exception:
-            a.test_interrupted = False
-
-    setting = ApplicationSetting.objects.first()
+    setting = apply_setting.get_setting()
     user = get_session_user(request)
-    return render(request, 'admin_applications.html', {'applications': apps, 'setting': setting, 'q': q, 'user': user})
+    return render(request, 'admin_applications.html', {
+        'applications': apps,
+        'total_count': total_count,
+        'next_cursor': next_cursor,
+        'next_page': next_page,
+        'page': page,
+        'is_first_page': cursor is None and page == 1,
+        'setting': setting,
+        'q': q,
+        'user': user,
+    })
+
+
+def _prelim_accept_dm(discord_user):
+    return f"""⁨`السلام عليكم ورحمة الله وبركاته`⁩⁩**
+
+تم قبولك قبول مبدئي في شرطة هيل ستيت. نرجو منك مراجعة روم <#1446744092615774272>
+
+شاكرين لك .
+(<@{discord_user}>)
+**"""
+
+
+def _reject_dm(discord_user):
+    return (
+        "⁨⁨⁨⁨`السلام عليكم ورحمة الله وبركاته`⁩⁩⁩⁩⁩**\n\n"
+        "تم رفضك في شرطة هيل ستيت يمكن التقديم في المرات المقبله\n"
+        "وراجع روم <#1446744096658952326> لمعرفة التقديمات القادمة\n\n"
+        "شاكرين لك .\n\n"
+        f"<@{discord_user}>\n**"
+    )
 
 
 @rank_required(applications_only=True)
 def admin_application_action(request, app_id):
     app = get_object_or_404(Application, id=app_id)
     action = request.POST.get('action')
-    # actions: prelim_accept, final_accept, send_dm_custom, reject, close_with_timer, close_with_message, open, hide, unhide
+    # actions: prelim_accept, final_accept, retry_jobs, send_dm_custom, reject, close_with_timer, close_with_message, open, hide, unhide
 
     discord_user_raw = (app.discord_id or '')
     # Normalize common mention formats like <@123...> or <@!123...> to plain snowflake digits
@@ -1257,7 +1397,7 @@ def admin_application_action(request, app_id):
             if len(clean) > 250:
                 clean = clean[:247] + '...'
             ch = os.getenv('DISCORD_LOG_CHANNEL_ID', '1446744094952128733')
-            discord_utils.send_channel_message(ch, clean)
+            outbox.enqueue_channel_message(ch, clean)
         except Exception:
             pass
 
@@ -1267,13 +1407,7 @@ def admin_application_action(request, app_id):
         app.status = 'completed'
         app.save()
         # رسالة القبول المبدئي
-        msg = f"""⁨`السلام عليكم ورحمة الله وبركاته`⁩⁩**
-
-تم قبولك قبول مبدئي في شرطة هيل ستيت. نرجو منك مراجعة روم <#1446744092615774272>
-
-شاكرين لك .
-(<@{discord_user}>)
-**"""
+        msg = _prelim_accept_dm(discord_user)
         role_id = request.POST.get('role_id') or os.getenv('ROLE_PRELIMINARY_ACCEPTANCE')
         if discord_user:
             try:
@@ -1293,68 +1427,39 @@ def admin_application_action(request, app_id):
             pass
 
     elif action == 'final_accept':
-        # Wrap final acceptance in try/except to avoid uncaught 500s
+        # The account is created here; Discord steps (username, DM, role) run
+        # in the background worker so the admin does not wait on Discord.
         try:
-            app.status = 'completed'
-            app.save()
-            discord_name = discord_utils.get_guild_member_username(discord_user) or f'cadet{discord_user}'
-            base_username = discord_name.split('#')[0]
-            # sanitize base username: allow letters, digits, dot, underscore, dash
-            base_clean = re.sub(r'[^A-Za-z0-9_.-]', '', base_username)
-            if not base_clean:
-                base_clean = f'cadet{discord_user}'
-            # limit length to 30 chars to fit username field
-            base_clean = base_clean[:30]
-            username = base_clean
-            suffix = 1
-            while User.objects.filter(username=username).exists():
-                username = f"{base_clean}{suffix}"
-                suffix += 1
-
-            password = secrets.token_urlsafe(8)
-            cadet = User(username=username, full_name=app.character_name, rank='cadet')
-            cadet.set_password(password)
-            cadet.save()
-
-            msg = f"""**
-السلام عليكم ورحمة الله وبركاته
-
-تم قبولك قبول نهائي في شرطة هيل ستيت. نرجو منك مراجعة جميع التعاميم المنشورة.
-
-ونرجوا منك مراجعة حسابك على الموقع الإلكتروني لإكمال جميع إجراءات تقييم الكاديت وشكراً لك.
-
-`Username : {username}`
-
-`Password : {password}`
-
-`App :`https://heallstateacademy.onrender.com
-
-(<@{discord_user}>)
-**"""
-            if discord_user:
-                try:
-                    sent = discord_utils.send_dm(discord_user, msg)
-                    if not sent:
-                        Notification.objects.create(user=cadet, message=f"تم إنشاء حسابك لكن فشل إرسال رسالة الديسكورد. بيانات الدخول:\n{msg}")
-                except Exception:
-                    Notification.objects.create(user=cadet, message=f"تم إنشاء حسابك لكن حدث خطأ أثناء محاولة إرسال رسالة الديسكورد. بيانات الدخول:\n{msg}")
+            with transaction.atomic():
+                # a repeated or double-submitted final_accept waits on this lock
+                # and then finds the first one's jobs instead of creating a
+                # second account that would never get its credentials
+                Application.objects.select_for_update().filter(id=app.id).first()
+                already_accepted = bool(discord_user) and app.jobs.exists()
+                if not already_accepted:
+                    app.status = 'completed'
+                    app.save()
+                    username = jobs.free_username(f'cadet{discord_user}'[:30])
+                    password = secrets.token_urlsafe(8)
+                    cadet = User(username=username, full_name=app.character_name, rank='cadet')
+                    cadet.set_password(password)
+                    cadet.save()
+
+                    if discord_user:
+                        role_id = request.POST.get('role_id') or os.getenv('ROLE_FINAL_ACCEPTANCE')
+                        jobs.enqueue_final_accept(app, cadet, password, discord_user, role_id)
+                    else:
+                        msg = jobs.credentials_message(username, password, discord_user)
+                        Notification.objects.create(user=cadet, message=f"تم إنشاء حسابك. بيانات الدخول:\n{msg}")
+
+            if already_accepted:
+                request.session['error_message'] = 'تم القبول النهائي لهذا الطلب مسبقًا؛ استخدم إعادة المحاولة للخطوات الفاشلة.'
             else:
-                Notification.objects.create(user=cadet, message=f"تم إنشاء حسابك. بيانات الدخول:\n{msg}")
-
-            role_id = request.POST.get('role_id') or os.getenv('ROLE_FINAL_ACCEPTANCE')
-            if role_id and discord_user:
+                # سجّل الحدث بالعربي
                 try:
-                    role_added = discord_utils.add_role(discord_user, role_id)
-                    if not role_added:
-                        Notification.objects.create(user=cadet, message="تم إنشاء حسابك، ولكن فشل إضافة الدور في ديسكورد. تواصل مع الإدارة.")
+                    _audit_log('final_accept', user, target=f'application:{app.id}', details=f'المتقدم: {app.character_name} ({app.discord_id})؛ حساب: {username}')
                 except Exception:
-                    Notification.objects.create(user=cadet, message="تم إنشاء حسابك، ولكن حدث خطأ أثناء محاولة إضافة الدور على ديسكورد.")
-
-            # سجّل الحدث بالعربي
-            try:
-                _audit_log('final_accept', user, target=f'application:{app.id}', details=f'المتقدم: {app.character_name} ({app.discord_id})؛ حساب: {username}')
-            except Exception:
-                pass
+                    pass
         except Exception:
             try:
                 logging.exception('final_accept failed')
@@ -1362,6 +1467,13 @@ def admin_application_action(request, app_id):
                 pass
             request.session['error_message'] = 'حدث خطأ أثناء تنفيذ القبول النهائي. تم إعلام الإدارة.'
 
+    elif action == 'retry_jobs':
+        retried = jobs.retry_failed(app)
+        try:
+            _audit_log('retry_jobs', user, target=f'application:{app.id}', details=f'أُعيدت {retried} خطوة فاشلة للطابور')
+        except Exception:
+            pass
+
     elif action == 'retest':
         # Retest action disabled: prevent changing status to 'testing'. Log the attempted action.
         try:
@@ -1383,13 +1495,7 @@ def admin_application_action(request, app_id):
         app.status = 'closed'
         app.save()
         if discord_user:
-            msg = (
-                "⁨⁨⁨⁨`السلام عليكم ورحمة الله وبركاته`⁩⁩⁩⁩⁩**\n\n"
-                "تم رفضك في شرطة هيل ستيت يمكن التقديم في المرات المقبله\n"
-                "وراجع روم <#1446744096658952326> لمعرفة التقديمات القادمة\n\n"
-                "شاكرين لك .\n\n"
-                f"<@{discord_user}>\n**"
-            )
+            msg = _reject_dm(discord_user)
             try:
                 discord_utils.send_dm(discord_user, msg)
             except Exception:
@@ -1464,6 +1570,98 @@ def admin_application_action(request, app_id):
 
 
 
+BULK_ACTIONS = ('prelim_accept', 'reject', 'hide', 'delete', 'close_with_message')
+BULK_DISCORD_WORKERS = 8
+
+
+def _bulk_discord_step(discord_user, dm=None, role_id=None):
+    """DM and/or role grant for one applicant; returns an error string or None."""
+    errors = []
+    if dm and not discord_utils.send_dm(discord_user, dm):
+        errors.append('فشل إرسال الرسالة الخاصة')
+    if role_id and not discord_utils.add_role(discord_user, role_id):
+        errors.append('فشل إضافة الدور')
+    return '، '.join(errors) or None
+
+
+@rank_required(applications_only=True)
+@require_POST
+def admin_applications_bulk_action(request):
+    """Apply one action to many applications and return a per-applicant report.
+
+    POST: action, ids (repeated or comma-separated, at most BULK_ACTION_MAX),
+    optional message / role_id.
+    Status changes and audit rows are written in bulk; DMs and role grants are
+    sent concurrently through a small thread pool.
+    """
+    action = request.POST.get('action')
+    if action not in BULK_ACTIONS:
+        return JsonResponse({'error': 'إجراء غير معروف'}, status=400)
+
+    raw_ids = request.POST.getlist('ids')
+    try:
+        ids = {int(x) for raw in raw_ids for x in raw.split(',') if x.strip()}
+    except ValueError:
+        return JsonResponse({'error': 'معرفات غير صالحة'}, status=400)
+    limit = getattr(settings, 'BULK_ACTION_MAX', 200)
+    if len(ids) > limit:
+        return JsonResponse({'error': f'لا يمكن تنفيذ الإجراء على أكثر من {limit} طلب في المرة الواحدة'}, status=400)
+
+    apps = list(Application.objects.filter(id__in=ids))
+    found = {a.id for a in apps}
+    results = {i: {'id': i, 'ok': False, 'error': 'الطلب غير موجود'} for i in ids - found}
+    user = get_session_user(request)
+    message = request.POST.get('message', '')
+
+    with transaction.atomic():
+        qs = Application.objects.filter(id__in=found)
+        if action == 'prelim_accept':
+            qs.update(status='completed')
+        elif action == 'reject':
+            qs.update(status='closed')
+        elif action == 'close_with_message':
+            qs.update(status='closed', closed_message=message, reopen_at=None)
+        else:  # hide / delete: permanent removal so applicants can re-test
+            qs.delete()
+
+    audit_action = 'delete' if action == 'hide' else action
+    details = {
+        'delete': lambda a: 'تم حذف الطلب (إجراء جماعي)',
+        'close_with_message': lambda a: f'أُغلق الطلب بالرسالة: {message[:160]}',
+    }.get(audit_action, lambda a: f'المتقدم: {a.character_name} ({a.discord_id})')
+    _audit_log_bulk([(audit_action, user, f'application:{a.id}', details(a)) for a in apps])
+
+    # Discord fan-out (prelim_accept: DM + role, reject: DM)
+    role_id = None
+    if action == 'prelim_accept':
+        role_id = request.POST.get('role_id') or os.getenv('ROLE_PRELIMINARY_ACCEPTANCE')
+    tasks = {}
+    with ThreadPoolExecutor(max_workers=BULK_DISCORD_WORKERS) as pool:
+        for a in apps:
+            discord_user = discord_utils.normalize_id(a.discord_id or '')
+            if action in ('prelim_accept', 'reject') and discord_user:
+                dm = _prelim_accept_dm(discord_user) if action == 'prelim_accept' else _reject_dm(discord_user)
+                tasks[a.id] = pool.submit(_bulk_discord_step, discord_user, dm, role_id)
+
+    for a in apps:
+        error = None
+        if a.id in tasks:
+            try:
+                error = tasks[a.id].result()
+            except Exception as exc:
+                error = str(exc)
+        # the status change itself succeeded; Discord problems are reported per applicant
+        results[a.id] = {'id': a.id, 'name': a.character_name, 'ok': error is None, 'error': error}
+
+    report = sorted(results.values(), key=lambda r: r['id'])
+    return JsonResponse({
+        'action': action,
+        'succeeded': sum(1 for r in report if r['ok']),
+        'failed': sum(1 for r in report if not r['ok']),
+        'results': report,
+    })
+
+
 @rank_required(applications_only=True)
 def admin_application_detail(request, app_id):
     app = get_object_or_404(Application, id=app_id)
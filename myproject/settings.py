@@ -51,12 +51,15 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'channels',
     'main',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.metrics.MetricsMiddleware',
+    'main.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,9 +87,76 @@ TEMPLATES = [
     },
 ]
 
+# Strip indentation from templates when they are loaded (main.template_loaders)
+TEMPLATE_MINIFY = os.getenv('TEMPLATE_MINIFY', 'False') == 'True'
+if TEMPLATE_MINIFY:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'main.template_loaders.MinifyingFilesystemLoader',
+            'main.template_loaders.MinifyingAppDirectoriesLoader',
+        ]),
+    ]
+
+# Bearer token Prometheus uses to scrape /metrics (admins can always view it)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Dynamic HTML/JSON responses at least this large are gzip/brotli compressed
+# (main.compression.CompressionMiddleware)
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
 
 
 WSGI_APPLICATION = 'myproject.wsgi.application'
+ASGI_APPLICATION = 'myproject.asgi.application'
+
+# Channel layer used to push chat messages over WebSockets.
+# With several worker processes set REDIS_URL (channels-redis is pinned in the
+# requirements) so a message created in one process reaches sockets held by
+# another; without it the in-memory layer only reaches sockets of the same
+# process and the chat page falls back to polling for the rest.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}
+    }
+
+# Cache used for the unread-badge versions (and other small shared state).
+# Must be shared between worker processes when running more than one; the
+# main.E001 check fails for WEB_CONCURRENCY > 1 without REDIS_URL.
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+
+# Seconds a session user's row is cached between requests (0 disables).
+# Saving or deleting a User clears it; with the per-process LocMem cache other
+# processes may see the old row until this TTL expires, so keep it short.
+SESSION_USER_CACHE_TTL = int(os.getenv('SESSION_USER_CACHE_TTL', '30'))
+
+# Partial (WHERE is_read = false) indexes are only created where supported;
+# on MySQL they are skipped on purpose, so don't warn about it.
+SILENCED_SYSTEM_CHECKS = ['models.W037']
+
+# Spread each applicant test across question strata: 'category', 'difficulty'
+# or empty for a plain uniform draw.
+APPLY_TEST_STRATIFY_BY = os.getenv('APPLY_TEST_STRATIFY_BY', '')
+
+# Most applications one admin bulk action may touch (larger requests get a 400).
+BULK_ACTION_MAX = int(os.getenv('BULK_ACTION_MAX', '200'))
 
 
 # Database
@@ -101,8 +171,13 @@ load_dotenv(dotenv_path=BASE_DIR / '.env')
 # Database configuration: prefer `DATABASE_URL` (e.g. Render), otherwise read
 # individual env vars. Default engine is MySQL to match your .env data.
 DB_URL = os.getenv('DATABASE_URL')
+# Under ASGI every request may run its sync code in a different thread, each
+# with its own connection, so persistent connections pile up until they hit
+# the server's limit. Keep the default of closing them after each request;
+# raise it only for sync deployments (or put a pooler such as PgBouncer in front).
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '0'))
 if DB_URL:
-    parsed = dj_database_url.parse(DB_URL, conn_max_age=600)
+    parsed = dj_database_url.parse(DB_URL, conn_max_age=DB_CONN_MAX_AGE)
     # Ensure SSL for Postgres on managed providers like Render
     if 'postgres' in DB_URL and parsed:
         opts = parsed.setdefault('OPTIONS', {})
@@ -165,7 +240,17 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles' # Critical for deployment
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Page CSS/JS live in static/css/pages and static/js/pages. In production they
+# are served under content-hashed names with far-future immutable cache headers
+# and pre-compressed copies (collectstatic in build/build.sh writes the
+# manifest). The old STATICFILES_STORAGE setting is ignored by Django >= 5.1.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': ('django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+                    else 'whitenoise.storage.CompressedManifestStaticFilesStorage'),
+    },
+}
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
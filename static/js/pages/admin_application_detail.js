@@ -0,0 +1,85 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize Particles.js
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 30, density: { enable: true, value_area: 800 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { value: 0.2, random: true },
+            size: { value: 3, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#6366f1", 
+                opacity: 0.1, 
+                width: 1 
+            },
+            move: { 
+                enable: true, 
+                speed: 1, 
+                direction: "none", 
+                random: true,
+                out_mode: "out"
+            }
+        },
+        interactivity: {
+            detect_on: "canvas",
+            events: {
+                onhover: { enable: true, mode: "repulse" },
+                onclick: { enable: true, mode: "push" }
+            }
+        }
+    });
+
+    // Ensure particles canvas is properly sized
+    window.addEventListener('resize', function() {
+        const particlesContainer = document.getElementById('particles-js');
+        if (particlesContainer) {
+            particlesContainer.style.width = '100%';
+            particlesContainer.style.height = '100%';
+        }
+    });
+
+    // Add hover effects to table rows
+    const tableRows = document.querySelectorAll('.answers-table tbody tr');
+    tableRows.forEach(row => {
+        row.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateX(-10px)';
+            this.style.transition = 'transform 0.3s ease';
+        });
+
+        row.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateX(0)';
+        });
+    });
+
+    // Add animation to stats cards
+    const statCards = document.querySelectorAll('.stat-card');
+    statCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.5s ease-out';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 100);
+    });
+
+    // Calculate and display percentage
+    function calculatePercentage() {
+        const totalQuestions = PAGE_CONFIG.totalQuestions;
+        const correctAnswers = PAGE_CONFIG.correctAnswers;
+
+        if (totalQuestions > 0) {
+            const percentage = Math.round((correctAnswers / totalQuestions) * 100);
+            const percentageCard = document.querySelector('.stat-card:nth-child(4) .stat-value');
+            if (percentageCard) {
+                percentageCard.textContent = percentage + '%';
+            }
+        }
+    }
+
+    // Initialize percentage
+    calculatePercentage();
+});
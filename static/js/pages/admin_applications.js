@@ -0,0 +1,502 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Enhanced Particles.js
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 50, density: { enable: true, value_area: 1000 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { 
+                value: 0.3, 
+                random: true,
+                anim: { enable: true, speed: 1, opacity_min: 0.1 }
+            },
+            size: { 
+                value: 3, 
+                random: true,
+                anim: { enable: true, speed: 2, size_min: 0.5 }
+            },
+            line_linked: { 
+                enable: true, 
+                distance: 180, 
+                color: "#6366f1", 
+                opacity: 0.15, 
+                width: 1.5 
+            },
+            move: { 
+                enable: true, 
+                speed: 1.5, 
+                direction: "none", 
+                random: true,
+                out_mode: "out",
+                bounce: false
+            }
+        },
+        interactivity: {
+            detect_on: "canvas",
+            events: {
+                onhover: { enable: true, mode: "grab" },
+                onclick: { enable: true, mode: "push" }
+            }
+        },
+        retina_detect: true
+    });
+
+    // Loading overlay functions
+    function showLoading() {
+        document.getElementById('loadingOverlay').classList.add('active');
+    }
+
+    function hideLoading() {
+        document.getElementById('loadingOverlay').classList.remove('active');
+    }
+
+    // Enhanced confirmation with SweetAlert2
+    document.querySelectorAll('form[data-confirm]').forEach(function(form) {
+        form.addEventListener('submit', function(e) {
+            e.preventDefault();
+
+            const message = form.getAttribute('data-confirm');
+            const action = form.getAttribute('data-action');
+
+            Swal.fire({
+                title: 'تأكيد الإجراء',
+                html: `<div style="text-align: right; line-height: 1.8;">
+                    <p style="font-size: 1.1rem; margin-bottom: 1rem; color: var(--text-light);">${message}</p>
+                    <div style="background: rgba(255, 255, 255, 0.05); padding: 1rem; border-radius: 12px; margin: 1rem 0;">
+                        <i class="fas fa-info-circle" style="color: var(--accent-blue); margin-left: 0.5rem;"></i>
+                        <span style="color: var(--text-muted);">سيتم تسجيل هذا الإجراء في سجلات النظام</span>
+                    </div>
+                </div>`,
+                icon: 'question',
+                showCancelButton: true,
+                confirmButtonText: 'نعم، متأكد',
+                cancelButtonText: 'إلغاء',
+                confirmButtonColor: '#10b981',
+                cancelButtonColor: '#94a3b8',
+                background: 'linear-gradient(145deg, rgba(30, 41, 59, 0.98), rgba(15, 23, 42, 0.98))',
+                color: '#e2e8f0',
+                width: '500px',
+                customClass: {
+                    popup: 'animated-popup',
+                    confirmButton: 'animated-button',
+                    cancelButton: 'animated-button'
+                }
+            }).then((result) => {
+                if (result.isConfirmed) {
+                    showLoading();
+
+                    // Animate button
+                    const submitBtn = form.querySelector('button[type="submit"]');
+                    if (submitBtn) {
+                        const originalHTML = submitBtn.innerHTML;
+                        submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> جاري المعالجة...';
+                        submitBtn.disabled = true;
+
+                        // Add pulse animation
+                        submitBtn.style.animation = 'pulse 0.5s infinite';
+                    }
+
+                    // Submit after delay for smooth animation
+                    setTimeout(() => {
+                        form.submit();
+                    }, 500);
+
+                    // Auto-hide loading after timeout
+                    setTimeout(hideLoading, 10000);
+                }
+            });
+        });
+    });
+
+    // Card entrance animation
+    const appCards = document.querySelectorAll('.app-card');
+    appCards.forEach((card, index) => {
+        card.style.animation = `cardEntrance 0.8s cubic-bezier(0.4, 0, 0.2, 1) ${index * 0.1}s forwards`;
+        card.style.opacity = '0';
+    });
+
+    // Add hover effects with delay
+    document.querySelectorAll('.control-form').forEach(form => {
+        let hoverTimer;
+        form.addEventListener('mouseenter', function() {
+            clearTimeout(hoverTimer);
+            hoverTimer = setTimeout(() => {
+                this.style.transform = 'translateY(-8px) scale(1.02)';
+            }, 100);
+        });
+
+        form.addEventListener('mouseleave', function() {
+            clearTimeout(hoverTimer);
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+
+    // Auto focus and placeholder animation
+    const firstInput = document.querySelector('.form-input');
+    if (firstInput) {
+        setTimeout(() => {
+            firstInput.focus();
+            firstInput.style.transform = 'translateY(-5px)';
+            setTimeout(() => {
+                firstInput.style.transform = 'translateY(0)';
+            }, 300);
+        }, 500);
+    }
+
+    // Localize global reopen time
+    const globalReopen = document.getElementById('globalReopenDisplay');
+    if (globalReopen && globalReopen.dataset.ts) {
+        const d = new Date(parseInt(globalReopen.dataset.ts, 10) * 1000);
+        const options = { 
+            year: 'numeric', 
+            month: 'long', 
+            day: 'numeric',
+            hour: '2-digit',
+            minute: '2-digit',
+            hour12: true 
+        };
+        globalReopen.textContent = d.toLocaleString('ar-SA', options);
+    }
+
+    // Localize submitted_at for each application card (use same epoch-based system as reopen timer)
+    document.querySelectorAll('.app-date-display').forEach(function(el) {
+        const ts = el.dataset.ts;
+        if (!ts) return;
+        const d = new Date(parseInt(ts, 10) * 1000);
+        const opts = {
+            year: 'numeric',
+            month: 'short',
+            day: 'numeric',
+            hour: '2-digit',
+            minute: '2-digit',
+            hour12: true
+        };
+        try {
+            el.textContent = d.toLocaleString('ar-SA', opts);
+        } catch (e) {
+            el.textContent = d.toLocaleString();
+        }
+    });
+
+    // Datetime input validation and UI
+    document.querySelectorAll('form').forEach(form => {
+        const localInput = form.querySelector('input[name="reopen_local"]');
+        if (!localInput) return;
+
+        let hidden = form.querySelector('input[name="reopen_at"]');
+        if (!hidden) {
+            hidden = document.createElement('input');
+            hidden.type = 'hidden';
+            hidden.name = 'reopen_at';
+            form.appendChild(hidden);
+        }
+
+        const submitBtn = form.querySelector('button[type="submit"]');
+        if (submitBtn) {
+            // Initial state
+            submitBtn.disabled = !localInput.value;
+            submitBtn.style.opacity = localInput.value ? '1' : '0.6';
+
+            // Live validation
+            localInput.addEventListener('input', function() {
+                const isValid = this.value && new Date(this.value) > new Date();
+                submitBtn.disabled = !isValid;
+                submitBtn.style.opacity = isValid ? '1' : '0.6';
+
+                if (isValid) {
+                    this.style.borderColor = 'var(--accent-green)';
+                    this.style.boxShadow = '0 0 0 3px rgba(16, 185, 129, 0.1)';
+                } else {
+                    this.style.borderColor = '';
+                    this.style.boxShadow = '';
+                }
+            });
+        }
+
+        form.addEventListener('submit', function(e) {
+            if (!localInput.value) {
+                Swal.fire({
+                    title: 'تاريخ مطلوب',
+                    text: 'يرجى تحديد تاريخ ووقت لإعادة الفتح',
+                    icon: 'warning',
+                    confirmButtonText: 'حسناً',
+                    confirmButtonColor: '#6366f1'
+                });
+                e.preventDefault();
+                return;
+            }
+
+            const local = new Date(localInput.value);
+            if (isNaN(local.getTime())) {
+                Swal.fire({
+                    title: 'تاريخ غير صالح',
+                    text: 'يرجى تحديد تاريخ صحيح',
+                    icon: 'error',
+                    confirmButtonText: 'حسناً'
+                });
+                e.preventDefault();
+                return;
+            }
+
+            if (local <= new Date()) {
+                Swal.fire({
+                    title: 'تاريخ قديم',
+                    text: 'يجب أن يكون التاريخ في المستقبل',
+                    icon: 'warning',
+                    confirmButtonText: 'حسناً',
+                    confirmButtonColor: '#f59e0b'
+                });
+                e.preventDefault();
+                return;
+            }
+
+            const epoch = Math.floor(local.getTime() / 1000);
+            hidden.value = String(epoch);
+        });
+    });
+
+    // Enhanced Custom DM modal
+    window.showCustomDMModal = function(appId) {
+        Swal.fire({
+            title: '<div style="display: flex; align-items: center; gap: 0.75rem;">' +
+                   '<i class="fas fa-envelope" style="color: #6366f1; font-size: 1.5em;"></i>' +
+                   '<span>إرسال رسالة خاصة</span>' +
+                   '</div>',
+            html: `<div style="text-align: right;">
+                <p style="color: var(--text-muted); margin-bottom: 1.5rem; font-size: 0.95rem;">
+                    اكتب رسالتك للمتقدم. سيتم إرسالها عبر Discord مباشرة.
+                </p>
+                <textarea 
+                    id="dmMessage" 
+                    placeholder="اكتب رسالتك هنا..." 
+                    style="width: 100%; min-height: 150px; padding: 1rem; border-radius: 12px; background: rgba(255, 255, 255, 0.05); border: 2px solid rgba(255, 255, 255, 0.1); color: var(--text-light); font-size: 1rem; resize: vertical;"
+                    autofocus
+                ></textarea>
+                <div style="display: flex; justify-content: space-between; align-items: center; margin-top: 1rem;">
+                    <span id="charCount" style="color: var(--text-muted); font-size: 0.9rem;">0/2000 حرف</span>
+                    <span style="color: var(--text-muted); font-size: 0.9rem;">
+                        <i class="fab fa-discord" style="color: #5865F2;"></i>
+                        سيتم الإرسال عبر Discord
+                    </span>
+                </div>
+            </div>`,
+            showCancelButton: true,
+            confirmButtonText: '<i class="fas fa-paper-plane"></i> إرسال',
+            cancelButtonText: '<i class="fas fa-times"></i> إلغاء',
+            confirmButtonColor: '#6366f1',
+            cancelButtonColor: '#94a3b8',
+            background: 'linear-gradient(145deg, rgba(30, 41, 59, 0.98), rgba(15, 23, 42, 0.98))',
+            color: '#e2e8f0',
+            width: 600,
+            showLoaderOnConfirm: true,
+            preConfirm: () => {
+                const textarea = document.getElementById('dmMessage');
+                const msg = textarea.value.trim();
+
+                if (!msg) {
+                    Swal.showValidationMessage('الرجاء كتابة الرسالة');
+                    return false;
+                }
+
+                if (msg.length > 2000) {
+                    Swal.showValidationMessage('الرسالة طويلة جداً (الحد الأقصى 2000 حرف)');
+                    return false;
+                }
+
+                return msg;
+            }
+        }).then((result) => {
+            if (result.isConfirmed) {
+                const msg = result.value;
+                showLoading();
+
+                // Create and submit form
+                const form = document.createElement('form');
+                form.method = 'POST';
+                form.action = `/admin/application/${appId}/action/`;
+                form.style.display = 'none';
+
+                const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]')?.value;
+                if (!csrfToken) {
+                    Swal.fire('خطأ', 'لم يتم العثور على رمز الحماية', 'error');
+                    hideLoading();
+                    return;
+                }
+
+                form.innerHTML = `
+                    <input type="hidden" name="csrfmiddlewaretoken" value="${csrfToken}">
+                    <input type="hidden" name="action" value="send_dm_custom">
+                    <input type="hidden" name="message" value="${msg.replace(/"/g, '&quot;')}">
+                `;
+
+                document.body.appendChild(form);
+                form.submit();
+            }
+        });
+
+        // Character counter
+        const textarea = document.querySelector('#dmMessage');
+        const charCount = document.querySelector('#charCount');
+        if (textarea && charCount) {
+            textarea.addEventListener('input', function() {
+                const length = this.value.length;
+                charCount.textContent = `${length}/2000 حرف`;
+                charCount.style.color = length > 1800 ? 'var(--danger)' : 
+                                      length > 1500 ? 'var(--warning)' : 'var(--text-muted)';
+            });
+        }
+    };
+
+    // Form submission loading states
+    document.querySelectorAll('form').forEach(form => {
+        form.addEventListener('submit', function(e) {
+            if (!this.hasAttribute('data-confirm')) {
+                const submitBtn = this.querySelector('button[type="submit"]');
+                if (submitBtn && !submitBtn.disabled) {
+                    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> جاري المعالجة...';
+                    submitBtn.disabled = true;
+                    showLoading();
+                }
+            }
+        });
+    });
+
+    // Smooth scroll to top on search
+    if (window.location.search.includes('q=')) {
+        setTimeout(() => {
+            document.querySelector('.apps-container').scrollIntoView({ 
+                behavior: 'smooth',
+                block: 'start'
+            });
+        }, 500);
+    }
+
+    // Add keyboard shortcuts
+    document.addEventListener('keydown', function(e) {
+        // Ctrl/Cmd + K for search
+        if ((e.ctrlKey || e.metaKey) && e.key === 'k') {
+            e.preventDefault();
+            const searchInput = document.querySelector('.search-input');
+            if (searchInput) {
+                searchInput.focus();
+                searchInput.select();
+            }
+        }
+
+        // Escape to clear search
+        if (e.key === 'Escape') {
+            const searchInput = document.querySelector('.search-input');
+            if (searchInput && searchInput.value) {
+                searchInput.value = '';
+                searchInput.focus();
+            }
+        }
+    });
+
+    // Performance optimization
+    let resizeTimer;
+    window.addEventListener('resize', function() {
+        clearTimeout(resizeTimer);
+        resizeTimer = setTimeout(() => {
+            const particlesContainer = document.getElementById('particles-js');
+            if (particlesContainer) {
+                particlesContainer.style.width = '100%';
+                particlesContainer.style.height = '100%';
+            }
+        }, 250);
+    });
+
+    // Removed beforeunload prompt to avoid annoying confirmation on this page
+
+    // Bulk actions: one request for all selected applications, then show the per-applicant report
+    const bulkItems = document.querySelectorAll('.bulk-item');
+    const bulkApply = document.getElementById('bulkApply');
+    const bulkCount = document.getElementById('bulkCount');
+    const escapeHtml = v => String(v).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+    const selectedIds = () => Array.from(bulkItems).filter(cb => cb.checked).map(cb => cb.value);
+    const refreshBulk = () => {
+        const n = selectedIds().length;
+        bulkCount.textContent = n;
+        bulkApply.disabled = n === 0;
+    };
+    bulkItems.forEach(cb => cb.addEventListener('change', refreshBulk));
+    document.getElementById('bulkSelectAll')?.addEventListener('change', function() {
+        bulkItems.forEach(cb => { cb.checked = this.checked; });
+        refreshBulk();
+    });
+
+    bulkApply?.addEventListener('click', async function() {
+        const ids = selectedIds();
+        const actionSelect = document.getElementById('bulkAction');
+        const action = actionSelect.value;
+        const label = actionSelect.options[actionSelect.selectedIndex].text;
+        let message = '';
+        if (action === 'close_with_message') {
+            const res = await Swal.fire({
+                title: 'رسالة الإغلاق',
+                input: 'textarea',
+                showCancelButton: true,
+                confirmButtonText: 'إغلاق',
+                cancelButtonText: 'إلغاء',
+                inputValidator: v => !v.trim() ? 'الرجاء كتابة الرسالة' : undefined
+            });
+            if (!res.isConfirmed) return;
+            message = res.value;
+        } else {
+            const res = await Swal.fire({
+                title: `${label} (${ids.length})`,
+                text: 'هل أنت متأكد من تنفيذ هذا الإجراء على جميع الطلبات المحددة؟',
+                icon: 'warning',
+                showCancelButton: true,
+                confirmButtonText: 'تنفيذ',
+                cancelButtonText: 'إلغاء'
+            });
+            if (!res.isConfirmed) return;
+        }
+
+        const body = new URLSearchParams({ action, message });
+        ids.forEach(id => body.append('ids', id));
+        bulkApply.disabled = true;
+        try {
+            const resp = await fetch(PAGE_CONFIG.bulkActionUrl, {
+                method: 'POST',
+                headers: { 'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]')?.value || '' },
+                body
+            });
+            const data = await resp.json();
+            if (!resp.ok) throw new Error(data.error || resp.status);
+            const failed = data.results.filter(r => !r.ok)
+                .map(r => `<li>${escapeHtml(r.name || ('#' + r.id))}: ${escapeHtml(r.error)}</li>`).join('');
+            await Swal.fire({
+                title: `نجح ${data.succeeded} / فشل ${data.failed}`,
+                html: failed ? `<ul style="text-align: right;">${failed}</ul>` : '',
+                icon: data.failed ? 'warning' : 'success'
+            });
+        } catch (err) {
+            await Swal.fire('خطأ', String(err.message || err), 'error');
+        }
+        location.reload();
+    });
+
+    // Initialize tooltips for buttons
+    document.querySelectorAll('.action-btn, .btn').forEach(btn => {
+        btn.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-2px)';
+        });
+
+        btn.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Add subtle animation to status badges
+    document.querySelectorAll('.status-badge').forEach(badge => {
+        badge.addEventListener('mouseenter', function() {
+            this.style.transform = 'scale(1.05)';
+        });
+
+        badge.addEventListener('mouseleave', function() {
+            this.style.transform = 'scale(1)';
+        });
+    });
+});
@@ -0,0 +1,164 @@
+document.addEventListener('DOMContentLoaded', function () {
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 80, density: { enable: true, value_area: 800 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { value: 0.3, random: true },
+            size: { value: 3, random: true },
+            line_linked: { enable: true, distance: 150, color: "#6366f1", opacity: 0.2, width: 1 },
+            move: { enable: true, speed: 2, direction: "none", random: true }
+        }
+    });
+
+    updateStats();
+    setupDeleteButtons();
+});
+
+function updateStats() {
+    const rows = document.querySelectorAll('.user-row');
+    let trainers = 0, cadets = 0, others = 0;
+
+    rows.forEach(row => {
+        const rank = row.getAttribute('data-rank');
+        if (rank === 'trainer') {
+            trainers++;
+        } else if (rank === 'cadet') {
+            cadets++;
+        } else {
+            others++;
+        }
+    });
+
+    animateCounter('trainersCount', trainers);
+    animateCounter('cadetsCount', cadets);
+    animateCounter('othersCount', others);
+}
+
+function animateCounter(elementId, finalValue) {
+    const element = document.getElementById(elementId);
+    if (!element) return;
+
+    const duration = 1000;
+    const start = 0;
+    const increment = finalValue / (duration / 16);
+    let current = start;
+
+    const timer = setInterval(() => {
+        current += increment;
+        if (current >= finalValue) {
+            element.textContent = finalValue;
+            clearInterval(timer);
+        } else {
+            element.textContent = Math.floor(current);
+        }
+    }, 16);
+}
+
+function filterUsers(filter) {
+    const buttons = document.querySelectorAll('.filter-btn');
+    const rows = document.querySelectorAll('.user-row');
+
+    // تحديث حالة الأزرار
+    buttons.forEach(btn => {
+        btn.classList.remove('active');
+        if (btn.getAttribute('data-filter') === filter) {
+            btn.classList.add('active');
+        }
+    });
+
+    // تصفية الصفوف
+    rows.forEach(row => {
+        const rank = row.getAttribute('data-rank');
+        let showRow = false;
+
+        switch(filter) {
+            case 'all':
+                showRow = true;
+                break;
+            case 'trainer':
+                showRow = (rank === 'trainer');
+                break;
+            case 'cadet':
+                showRow = (rank === 'cadet');
+                break;
+            case 'other':
+                showRow = (rank !== 'trainer' && rank !== 'cadet');
+                break;
+        }
+
+        if (showRow) {
+            row.style.display = '';
+            row.style.animation = 'fadeIn 0.5s ease';
+        } else {
+            row.style.display = 'none';
+        }
+    });
+}
+
+function setupDeleteButtons() {
+    document.querySelectorAll('.delete-btn').forEach(btn => {
+        btn.addEventListener('click', function(e) {
+            e.preventDefault();
+
+            const userId = this.getAttribute('data-user-id');
+            const userName = this.getAttribute('data-user-name');
+
+            showDeleteConfirmation(userId, userName);
+        });
+    });
+}
+
+function showDeleteConfirmation(userId, userName) {
+    Swal.fire({
+        title: 'حذف المستخدم',
+        html: `
+            <div style="text-align: center;">
+                <i class="fas fa-exclamation-triangle" style="font-size: 4rem; color: #ef4444; margin-bottom: 1rem;"></i>
+                <p style="font-size: 1.2rem; color: #e2e8f0; margin-bottom: 0.5rem;">
+                    هل أنت متأكد من حذف المستخدم؟
+                </p>
+                <p style="color: #94a3b8; margin-bottom: 1.5rem;">
+                    <strong style="color: #fca5a5;">${userName}</strong>
+                    <br>
+                    لا يمكن التراجع عن هذا الإجراء
+                </p>
+            </div>
+        `,
+        icon: 'warning',
+        showCancelButton: true,
+        confirmButtonText: 'نعم، احذف',
+        cancelButtonText: 'إلغاء',
+        reverseButtons: true,
+        customClass: {
+            confirmButton: 'swal2-confirm',
+            cancelButton: 'swal2-cancel',
+            actions: 'swal2-actions',
+            popup: 'swal2-popup'
+        },
+        buttonsStyling: false,
+        showClass: {
+            popup: 'animate__animated animate__fadeInDown'
+        },
+        hideClass: {
+            popup: 'animate__animated animate__fadeOutUp'
+        }
+    }).then((result) => {
+        if (result.isConfirmed) {
+            // عند تأكيد الحذف، نستخدم اسم URL من Django بدلاً من مسار ثابت
+            const deleteUrlTemplate = PAGE_CONFIG.deleteUserUrl; // يترجم إلى /user/delete/0/
+            // استبدال الجزء 0 بالمعرف الفعلي
+            window.location.href = deleteUrlTemplate.replace('/0/', '/' + userId + '/');
+        }
+    });
+}
+
+document.querySelectorAll('.stat-card').forEach(card => {
+    card.addEventListener('mouseenter', () => {
+        card.style.transform = 'translateY(-8px) scale(1.02)';
+    });
+
+    card.addEventListener('mouseleave', () => {
+        card.style.transform = 'translateY(0) scale(1)';
+    });
+});
@@ -0,0 +1,108 @@
+document.addEventListener('DOMContentLoaded', function () {
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 60, density: { enable: true, value_area: 800 } },
+            color: { value: "#8b5cf6" },
+            shape: { type: "circle" },
+            opacity: { value: 0.3, random: true },
+            size: { value: 3, random: true },
+            line_linked: {
+                enable: true,
+                distance: 150,
+                color: "#8b5cf6",
+                opacity: 0.2,
+                width: 1
+            },
+            move: { enable: true, speed: 1.5, direction: "none", random: true }
+        }
+    });
+
+    const sendBtn = document.getElementById('sendBtn');
+    const notificationForm = document.querySelector('.notification-form form');
+
+    if (notificationForm) {
+        notificationForm.addEventListener('submit', function (e) {
+            const originalText = sendBtn.innerHTML;
+            sendBtn.innerHTML = '<span class="loading"></span> Sending...';
+            sendBtn.disabled = true;
+
+            setTimeout(() => {
+                sendBtn.innerHTML = originalText;
+                sendBtn.disabled = false;
+            }, 2000);
+        });
+    }
+
+    document.querySelectorAll('.dashboard-card').forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.2}s`;
+        card.style.animation = 'slideUp 0.5s ease forwards';
+    });
+
+    const tableRows = document.querySelectorAll('table tbody tr');
+    tableRows.forEach((row, index) => {
+        row.style.animationDelay = `${index * 0.1}s`;
+    });
+
+    const chatItems = document.querySelectorAll('.chat-item');
+    chatItems.forEach((item, index) => {
+        item.style.animationDelay = `${index * 0.15}s`;
+    });
+
+    // Conversations load their messages only when opened, a page at a time
+    const targetId = PAGE_CONFIG.targetId;
+    const targetName = document.querySelector('.chat-container')?.dataset.targetName || '';
+
+    function renderMessage(msg, otherName) {
+        const isTarget = msg.sender_id === targetId;
+        const div = document.createElement('div');
+        div.className = `message ${isTarget ? 'message-sent' : 'message-received'}`;
+        const sender = document.createElement('div');
+        sender.className = 'message-sender';
+        sender.innerHTML = '<i class="fas fa-user"></i> ';
+        sender.append(`${isTarget ? targetName : otherName} :`);
+        const time = document.createElement('div');
+        time.className = 'timestamp';
+        time.innerHTML = '<i class="far fa-clock"></i> ';
+        time.append(new Date(msg.timestamp).toLocaleString('en-GB'));
+        div.append(sender, document.createTextNode(msg.content), time);
+        return div;
+    }
+
+    async function loadChatPage(item) {
+        const container = item.querySelector('.message-container');
+        const olderBtn = item.querySelector('.chat-older');
+        const oldest = container.querySelector('.message[data-id]');
+        const params = oldest ? `?before_id=${oldest.dataset.id}` : '';
+        const response = await fetch(item.dataset.url + params, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' }
+        });
+        if (!response.ok) return;
+        const data = await response.json();
+        const previousHeight = container.scrollHeight;
+        const fragment = document.createDocumentFragment();
+        data.messages.forEach(msg => {
+            const node = renderMessage(msg, item.dataset.otherName);
+            node.dataset.id = msg.id;
+            fragment.appendChild(node);
+        });
+        olderBtn.after(fragment);
+        olderBtn.hidden = !data.has_more;
+        if (oldest) {
+            container.scrollTop += container.scrollHeight - previousHeight;
+        } else {
+            container.scrollTop = container.scrollHeight;
+        }
+    }
+
+    chatItems.forEach(item => {
+        const container = item.querySelector('.message-container');
+        item.querySelector('.chat-toggle').addEventListener('click', function () {
+            container.hidden = !container.hidden;
+            if (!container.hidden && !item.dataset.loaded) {
+                item.dataset.loaded = '1';
+                loadChatPage(item);
+            }
+        });
+        item.querySelector('.chat-older').addEventListener('click', () => loadChatPage(item));
+    });
+});
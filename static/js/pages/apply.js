@@ -0,0 +1,251 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize Particles.js
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 50, density: { enable: true, value_area: 800 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { value: 0.2, random: true },
+            size: { value: 3, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#6366f1", 
+                opacity: 0.1, 
+                width: 1 
+            },
+            move: { 
+                enable: true, 
+                speed: 1, 
+                direction: "none", 
+                random: true,
+                out_mode: "out"
+            }
+        },
+        interactivity: {
+            detect_on: "canvas",
+            events: {
+                onhover: { enable: true, mode: "repulse" },
+                onclick: { enable: true, mode: "push" }
+            }
+        }
+    });
+
+    // Form Submission Handler
+    const applyForm = document.getElementById('applyForm');
+    if (applyForm) {
+        applyForm.addEventListener('submit', async function(e) {
+            e.preventDefault();
+
+            const submitBtn = document.getElementById('submitBtn');
+            const originalBtnHTML = submitBtn.innerHTML;
+
+            // Show loading state
+            submitBtn.innerHTML = '<span class="loading-spinner"></span> جاري معالجة طلبك...';
+            submitBtn.disabled = true;
+
+            try {
+                const formData = new FormData(this);
+                const response = await fetch(this.action, {
+                    method: 'POST',
+                    body: formData,
+                    headers: {
+                        'X-Requested-With': 'XMLHttpRequest'
+                    }
+                });
+
+                const data = await response.json();
+
+                if (data.ok && data.app_id) {
+                    // Show success message
+                    showMessage('success', '✅ تم إرسال طلبك بنجاح! يتم نقلك إلى صفحة الاختبارات...');
+
+                    // Redirect to test page after delay
+                    setTimeout(() => {
+                        window.location.href = `/apply/start/${data.app_id}/`;
+                    }, 2000);
+                } else {
+                    // Show error message
+                    showMessage('error', data.error || '❌ حدث خطأ أثناء معالجة طلبك');
+
+                    // Re-enable button
+                    submitBtn.innerHTML = originalBtnHTML;
+                    submitBtn.disabled = false;
+                }
+            } catch (error) {
+                console.error('Error:', error);
+                showMessage('error', '❌ حدث خطأ في الاتصال بالخادم');
+
+                // Re-enable button
+                submitBtn.innerHTML = originalBtnHTML;
+                submitBtn.disabled = false;
+            }
+        });
+    }
+
+    // Timer for reopen_at (if exists)
+    const reopenTimer = document.getElementById('reopenTimer');
+    if (reopenTimer) {
+        const ts = reopenTimer.dataset.ts;
+        let reopenDate = null;
+        if (ts) {
+            reopenDate = new Date(parseInt(ts, 10) * 1000);
+        } else {
+            try { reopenDate = new Date(reopenTimer.textContent); } catch (e) { reopenDate = null; }
+        }
+        // display scheduled open time in user's locale
+        const reopenAtDisplay = document.getElementById('reopenAtDisplay');
+        if (reopenAtDisplay && reopenDate) {
+            reopenAtDisplay.textContent = 'الموعد المحدد للفتح (بالتوقيت المحلي): ' + reopenDate.toLocaleString();
+        }
+        let timerInterval = null;
+        updateReopenTimer(reopenDate, null);
+        timerInterval = setInterval(() => {
+            updateReopenTimer(reopenDate, timerInterval);
+        }, 1000);
+    }
+
+    // Add focus effects to inputs
+    const inputs = document.querySelectorAll('.form-input');
+    inputs.forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'translateY(-5px)';
+            this.style.boxShadow = '0 10px 25px rgba(99, 102, 241, 0.2)';
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'translateY(0)';
+            this.style.boxShadow = '';
+        });
+    });
+
+    // Ensure particles canvas is properly sized
+    window.addEventListener('resize', function() {
+        const particlesContainer = document.getElementById('particles-js');
+        if (particlesContainer) {
+            particlesContainer.style.width = '100%';
+            particlesContainer.style.height = '100%';
+        }
+    });
+
+    // Auto focus on first input
+    const firstInput = document.querySelector('.form-input');
+    if (firstInput) {
+        setTimeout(() => {
+            firstInput.focus();
+        }, 300);
+    }
+});
+
+// Function to update reopen timer
+function updateReopenTimer(targetDate, intervalHandle) {
+    const timerElement = document.getElementById('reopenTimer');
+    if (!timerElement) return;
+
+    const now = new Date();
+    const diff = targetDate - now;
+
+    if (diff <= 0) {
+        timerElement.innerHTML = '<span style="color: #10b981;">✅ التقديم مفتوح الآن</span>';
+        timerElement.style.animation = 'pulse 2s infinite';
+        if (intervalHandle) clearInterval(intervalHandle);
+        // reload page so server can flip the state (auto-open)
+        setTimeout(() => { window.location.reload(); }, 1000);
+        return;
+    }
+
+    const days = Math.floor(diff / (1000 * 60 * 60 * 24));
+    const hours = Math.floor((diff % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
+    const minutes = Math.floor((diff % (1000 * 60 * 60)) / (1000 * 60));
+    const seconds = Math.floor((diff % (1000 * 60)) / 1000);
+
+    let timerString = '';
+    if (days > 0) timerString += `${days} يوم `;
+    if (hours > 0) timerString += `${hours} ساعة `;
+    if (minutes > 0) timerString += `${minutes} دقيقة `;
+    timerString += `${seconds} ثانية`;
+
+    timerElement.textContent = timerString;
+}
+
+// Poll server for changes (so admin close/open propagates without page refresh)
+(function startApplyStatusPolling(){
+    let lastReopen = null;
+    const poll = async () => {
+        try {
+            const res = await fetch(PAGE_CONFIG.statusUrl);
+            if (!res.ok) return;
+            const data = await res.json();
+
+            const isPageOpen = !!document.getElementById('applyFormContainer');
+            // If server says open but page shows closed -> reload
+            if (data.open && !isPageOpen) {
+                window.location.reload();
+                return;
+            }
+            // If server says closed but page shows open -> reload
+            if (!data.open && isPageOpen) {
+                window.location.reload();
+                return;
+            }
+
+            // If still closed and reopen_at changed, update timer display
+            if (!data.open && data.reopen_at) {
+                if (lastReopen !== data.reopen_at) {
+                    lastReopen = data.reopen_at;
+                    const timerEl = document.getElementById('reopenTimer');
+                    const displayEl = document.getElementById('reopenAtDisplay');
+                    if (timerEl) {
+                        const newDate = new Date(parseInt(data.reopen_at,10) * 1000);
+                        timerEl.dataset.ts = data.reopen_at;
+                        if (displayEl) displayEl.textContent = 'الموعد المحدد للفتح (بالتوقيت المحلي): ' + newDate.toLocaleString();
+                    }
+                }
+            }
+        } catch (e) {
+            // ignore network errors silently
+            console.debug('apply_status poll error', e);
+        }
+    };
+    // initial poll + periodic
+    poll();
+    setInterval(poll, 8000);
+})();
+
+// Function to show messages
+function showMessage(type, text) {
+    // Remove existing messages
+    const existingAlert = document.querySelector('.message-alert:not([id="errorAlert"])');
+    if (existingAlert) {
+        existingAlert.remove();
+    }
+
+    // Create new message
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message-alert ${type}`;
+    messageDiv.innerHTML = `
+        <i class="fas fa-${type === 'success' ? 'check-circle' : 'exclamation-circle'}"></i>
+        <span>${text}</span>
+    `;
+
+    // Add to container
+    const container = document.querySelector('.container');
+    if (container) {
+        container.insertBefore(messageDiv, container.children[1]);
+
+        // Remove message after 5 seconds
+        setTimeout(() => {
+            if (messageDiv.parentNode) {
+                messageDiv.style.opacity = '0';
+                messageDiv.style.transform = 'translateY(-10px)';
+                messageDiv.style.transition = 'all 0.3s';
+
+                setTimeout(() => {
+                    if (messageDiv.parentNode) {
+                        messageDiv.remove();
+                    }
+                }, 300);
+            }
+        }, 5000);
+    }
+}
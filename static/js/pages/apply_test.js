@@ -0,0 +1,370 @@
+// Global Variables
+const sessionId = PAGE_CONFIG.sessionId;
+const qids = PAGE_CONFIG.questionIds;
+// questions preloaded with the page; /api/question/ is only a fallback
+const questionBundle = new Map(
+    JSON.parse(document.getElementById('questionBundle').textContent).map(q => [q.id, q])
+);
+const questionTime = PAGE_CONFIG.questionTime;
+const initialCountdown = PAGE_CONFIG.initialCountdown;
+// Extract token from URL to use for verification
+const sessionToken = new URLSearchParams(window.location.search).get('token') || '';
+
+// Restore progress from localStorage if page was refreshed
+let currentIndex = 0;
+const savedProgress = localStorage.getItem(`test_session_${sessionId}_progress`);
+const savedToken = localStorage.getItem(`test_session_${sessionId}_token`);
+
+// Only restore if tokens match (security check)
+if (savedProgress && savedToken === sessionToken && sessionToken) {
+    const savedIndex = parseInt(savedProgress);
+    if (savedIndex >= 0 && savedIndex < qids.length) {
+        currentIndex = savedIndex;
+    }
+}
+
+let questionTimer = questionTime;
+let questionInterval = null;
+let initialTimer = initialCountdown;
+let initialInterval = null;
+let hasWarningShown = false;
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Store token in localStorage for refresh validation
+    localStorage.setItem(`test_session_${sessionId}_token`, sessionToken);
+
+    // Initialize Particles.js
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 40, density: { enable: true, value_area: 800 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { value: 0.2, random: true },
+            size: { value: 3, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#6366f1", 
+                opacity: 0.1, 
+                width: 1 
+            },
+            move: { 
+                enable: true, 
+                speed: 1, 
+                direction: "none", 
+                random: true,
+                out_mode: "out"
+            }
+        },
+        interactivity: {
+            detect_on: "canvas",
+            events: {
+                onhover: { enable: true, mode: "repulse" },
+                onclick: { enable: true, mode: "push" }
+            }
+        }
+    });
+
+    // Check application status periodically
+    setInterval(checkAppStatus, 30000);
+
+    // Start initial countdown
+    startInitialCountdown();
+
+    // Ensure particles canvas is properly sized
+    window.addEventListener('resize', function() {
+        const particlesContainer = document.getElementById('particles-js');
+        if (particlesContainer) {
+            particlesContainer.style.width = '100%';
+            particlesContainer.style.height = '100%';
+        }
+    });
+});
+
+// Check if application is still open
+async function checkAppStatus() {
+    try {
+        const response = await fetch(PAGE_CONFIG.statusUrl);
+        if (response.ok) {
+            const data = await response.json();
+            if (!data.open) {
+                Swal.fire({
+                    title: 'تم إغلاق التقديم',
+                    text: 'عذراً، تم إغلاق باب التقديم أثناء الاختبار. سيتم توجيهك للصفحة الرئيسية.',
+                    icon: 'warning',
+                    confirmButtonText: 'حسناً',
+                    confirmButtonColor: '#f59e0b',
+                    allowOutsideClick: false,
+                    allowEscapeKey: false,
+                    didOpen: () => {
+                        Swal.getPopup().style.direction = 'rtl';
+                    }
+                }).then(() => {
+                    window.location.href = PAGE_CONFIG.applyUrl;
+                });
+            }
+        }
+    } catch (error) {
+        console.error('Error checking app status:', error);
+    }
+}
+
+// Start initial countdown
+function startInitialCountdown() {
+    const initElem = document.getElementById('initialTimer');
+    const initialCountdownCard = document.getElementById('initialCountdown');
+
+    initialInterval = setInterval(() => {
+        initialTimer--;
+        initElem.textContent = initialTimer;
+
+        // Add pulse effect when time is running out
+        if (initialTimer <= 5) {
+            initElem.style.color = '#f59e0b';
+            initElem.style.animation = 'pulse 0.5s infinite';
+        }
+
+        if (initialTimer <= 0) {
+            clearInterval(initialInterval);
+
+            // Hide initial countdown with animation
+            initialCountdownCard.style.opacity = '0';
+            initialCountdownCard.style.transform = 'translateY(-20px)';
+            initialCountdownCard.style.transition = 'all 0.5s ease';
+
+            setTimeout(() => {
+                initialCountdownCard.style.display = 'none';
+                document.getElementById('testArea').style.display = 'block';
+                renderQuestion();
+            }, 500);
+        }
+    }, 1000);
+}
+
+// Render current question
+async function renderQuestion() {
+    const qid = qids[currentIndex];
+
+    try {
+        // Show loading state
+        document.getElementById('questionText').textContent = 'جاري تحميل السؤال...';
+        document.getElementById('optionsContainer').innerHTML = '';
+
+        // Question data (preloaded; fetch only if it is missing)
+        let data = questionBundle.get(qid);
+        if (!data) {
+            const response = await fetch(`/api/question/${qid}/`);
+            if (!response.ok) throw new Error('Failed to fetch question');
+            data = await response.json();
+            questionBundle.set(qid, data);
+        }
+
+        // Update question number
+        document.getElementById('currentQuestion').textContent = currentIndex + 1;
+        document.getElementById('totalQuestions').textContent = qids.length;
+
+        // Update progress
+        updateProgress();
+
+        // Display question
+        document.getElementById('questionText').textContent = data.text;
+
+        // Display options
+        const optionsContainer = document.getElementById('optionsContainer');
+        optionsContainer.innerHTML = '';
+
+        const letters = ['أ', 'ب', 'ج', 'د', 'هـ', 'و'];
+        data.options.forEach((opt, i) => {
+            if (i < letters.length) {
+                const optionBtn = document.createElement('button');
+                optionBtn.className = 'option-btn';
+                optionBtn.onclick = () => submitAnswer(qid, i);
+                optionBtn.style.animation = `slideUp 0.5s ease forwards ${i * 0.1}s`;
+                optionBtn.style.opacity = '0';
+
+                optionBtn.innerHTML = `
+                    <span>${opt}</span>
+                    <div class="option-letter">${letters[i]}</div>
+                `;
+
+                optionsContainer.appendChild(optionBtn);
+            }
+        });
+
+        // Start question timer
+        startQuestionTimer();
+
+    } catch (error) {
+        console.error('Error loading question:', error);
+        document.getElementById('questionText').textContent = 'حدث خطأ في تحميل السؤال. يُرجى المحاولة مرة أخرى.';
+
+        // Retry after 2 seconds
+        setTimeout(() => renderQuestion(), 2000);
+    }
+}
+
+// Start question timer
+function startQuestionTimer() {
+    questionTimer = questionTime;
+    const timerElem = document.getElementById('questionTimer');
+    timerElem.textContent = questionTimer;
+    timerElem.style.color = '#6366f1';
+
+    // Reset warning flag
+    hasWarningShown = false;
+    document.getElementById('timeWarning').style.display = 'none';
+
+    clearInterval(questionInterval);
+
+    questionInterval = setInterval(() => {
+        questionTimer--;
+        timerElem.textContent = questionTimer;
+
+        // Show warning when time is running out
+        if (questionTimer <= 10 && !hasWarningShown) {
+            hasWarningShown = true;
+            document.getElementById('timeWarning').style.display = 'flex';
+            timerElem.style.color = '#f59e0b';
+            timerElem.style.animation = 'pulse 0.5s infinite';
+        }
+
+        // Change to red when critical
+        if (questionTimer <= 5) {
+            timerElem.style.color = '#ef4444';
+        }
+
+        if (questionTimer <= 0) {
+            clearInterval(questionInterval);
+            timerElem.textContent = '0';
+
+            // Show time out message
+            document.getElementById('timeWarning').innerHTML = `
+                <i class="fas fa-exclamation-triangle"></i>
+                <span>انتهى الوقت! يتم التقدم للسؤال التالي...</span>
+            `;
+            document.getElementById('timeWarning').style.display = 'flex';
+
+            // Submit null answer after 1 second
+            setTimeout(() => {
+                submitAnswer(qids[currentIndex], null);
+            }, 1000);
+        }
+    }, 1000);
+}
+
+// Submit answer and move to next question
+async function submitAnswer(qid, idx) {
+    try {
+        // Show loading state on all buttons
+        const buttons = document.querySelectorAll('.option-btn');
+        buttons.forEach(btn => {
+            btn.disabled = true;
+            btn.style.opacity = '0.7';
+            btn.style.cursor = 'not-allowed';
+        });
+
+        // Highlight selected option
+        if (idx !== null) {
+            const selectedBtn = buttons[idx];
+            if (selectedBtn) {
+                selectedBtn.style.background = 'rgba(99, 102, 241, 0.2)';
+                selectedBtn.style.borderColor = '#6366f1';
+            }
+        }
+
+        // Send answer to server
+        const csrfToken = getCookie('csrftoken');
+        const formData = new URLSearchParams({
+            question_id: qid,
+            selected_index: idx === null ? '' : idx,
+            token: sessionToken
+        });
+
+        const response = await fetch(`/apply/test/${sessionId}/answer/`, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': csrfToken,
+                'Content-Type': 'application/x-www-form-urlencoded'
+            },
+            body: formData
+        });
+
+        const data = await response.json();
+
+        if (data.ok) {
+            // Move to next question
+            currentIndex++;
+
+            // Save progress to localStorage (so refresh doesn't lose progress)
+            localStorage.setItem(`test_session_${sessionId}_progress`, currentIndex.toString());
+
+            if (currentIndex >= qids.length) {
+                // Test finished - redirect to finished page immediately without confirmation
+                // Disable beforeunload warning before redirect
+                window.onbeforeunload = null;
+                const appId = PAGE_CONFIG.applicationId;
+                // Clear progress data
+                localStorage.removeItem(`test_session_${sessionId}_progress`);
+                localStorage.removeItem(`test_session_${sessionId}_token`);
+                window.location.href = `/apply/finished/${appId}/`;
+            } else {
+                // Render next question
+                renderQuestion();
+            }
+        } else {
+            // Show error
+            alert(data.error || 'حدث خطأ في الإجابة. يُرجى المحاولة مرة أخرى.');
+
+            // Re-enable buttons
+            buttons.forEach(btn => {
+                btn.disabled = false;
+                btn.style.opacity = '1';
+                btn.style.cursor = 'pointer';
+            });
+        }
+
+    } catch (error) {
+        console.error('Error submitting answer:', error);
+        alert('حدث خطأ في الاتصال بالخادم. يُرجى المحاولة مرة أخرى.');
+
+        // Re-enable buttons
+        const buttons = document.querySelectorAll('.option-btn');
+        buttons.forEach(btn => {
+            btn.disabled = false;
+            btn.style.opacity = '1';
+            btn.style.cursor = 'pointer';
+        });
+    }
+}
+
+// Update progress bar
+function updateProgress() {
+    const progress = ((currentIndex) / qids.length) * 100;
+    document.getElementById('progressFill').style.width = `${progress}%`;
+    document.getElementById('answeredQuestions').textContent = currentIndex;
+}
+
+// Get CSRF token from cookies
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+// Prevent accidental page refresh/close during test
+window.addEventListener('beforeunload', function(e) {
+    if (document.getElementById('testArea').style.display === 'block') {
+        e.preventDefault();
+        e.returnValue = 'هل أنت متأكد من مغادرة الصفحة؟ ستفقد تقدمك في الاختبار.';
+        return 'هل أنت متأكد من مغادرة الصفحة؟ ستفقد تقدمك في الاختبار.';
+    }
+});
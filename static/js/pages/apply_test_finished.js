@@ -0,0 +1,48 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize Particles.js
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 40, density: { enable: true, value_area: 800 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { value: 0.2, random: true },
+            size: { value: 3, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#6366f1", 
+                opacity: 0.1, 
+                width: 1 
+            },
+            move: { 
+                enable: true, 
+                speed: 1, 
+                direction: "none", 
+                random: true,
+                out_mode: "out"
+            }
+        },
+        interactivity: {
+            detect_on: "canvas",
+            events: {
+                onhover: { enable: true, mode: "repulse" },
+                onclick: { enable: true, mode: "push" }
+            }
+        }
+    });
+
+    // Prevent going back to previous page
+    history.pushState(null, null, location.href);
+    window.addEventListener('popstate', function() {
+        history.pushState(null, null, location.href);
+    });
+
+    // Ensure particles canvas is properly sized
+    window.addEventListener('resize', function() {
+        const particlesContainer = document.getElementById('particles-js');
+        if (particlesContainer) {
+            particlesContainer.style.width = '100%';
+            particlesContainer.style.height = '100%';
+        }
+    });
+});
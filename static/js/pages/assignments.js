@@ -0,0 +1,65 @@
+document.addEventListener('DOMContentLoaded', function () {
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 60, density: { enable: true, value_area: 800 } },
+            color: { value: "#10b981" },
+            shape: { type: "circle" },
+            opacity: { value: 0.3, random: true },
+            size: { value: 3, random: true },
+            line_linked: {
+                enable: true,
+                distance: 150,
+                color: "#10b981",
+                opacity: 0.2,
+                width: 1
+            },
+            move: { enable: true, speed: 1.5, direction: "none", random: true }
+        }
+    });
+
+    const form = document.getElementById('assignmentForm');
+    const submitBtn = document.getElementById('submitBtn');
+
+    form.addEventListener('submit', function (e) {
+        if (form.checkValidity()) {
+            const originalText = submitBtn.innerHTML;
+            submitBtn.innerHTML = '<span class="loading"></span> جاري إنشاء التعيين...';
+            submitBtn.disabled = true;
+
+            setTimeout(() => {
+                submitBtn.innerHTML = originalText;
+                submitBtn.disabled = false;
+            }, 2000);
+        }
+    });
+
+    document.querySelectorAll('select').forEach(select => {
+        select.addEventListener('focus', function () {
+            this.parentElement.style.transform = 'scale(1.02)';
+        });
+
+        select.addEventListener('blur', function () {
+            this.parentElement.style.transform = 'scale(1)';
+        });
+    });
+});
+
+function confirmDelete() {
+    return confirm('هل أنت متأكد من حذف هذا التعيين؟ لا يمكن التراجع عن هذا الإجراء.');
+}
+
+document.querySelectorAll('.dashboard-card').forEach(card => {
+    card.addEventListener('mouseenter', () => {
+        card.style.transform = 'translateY(-8px) scale(1.02)';
+    });
+
+    card.addEventListener('mouseleave', () => {
+        card.style.transform = 'translateY(0) scale(1)';
+    });
+});
+
+if (document.querySelectorAll('.assignment-item').length > 0) {
+    document.querySelectorAll('.assignment-item').forEach((item, index) => {
+        item.style.animationDelay = `${index * 0.1}s`;
+    });
+}
@@ -0,0 +1,383 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Enhanced Particles.js with golden theme
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 50, density: { enable: true, value_area: 1000 } },
+            color: { value: "#f59e0b" },
+            shape: { type: "circle" },
+            opacity: { 
+                value: 0.3, 
+                random: true,
+                anim: { enable: true, speed: 1, opacity_min: 0.1 }
+            },
+            size: { 
+                value: 3, 
+                random: true,
+                anim: { enable: true, speed: 2, size_min: 0.5 }
+            },
+            line_linked: {
+                enable: true,
+                distance: 180,
+                color: "#f59e0b",
+                opacity: 0.2,
+                width: 1.5
+            },
+            move: {
+                enable: true,
+                speed: 1.5,
+                direction: "none",
+                random: true,
+                out_mode: "out",
+                bounce: false
+            }
+        },
+        interactivity: {
+            detect_on: "canvas",
+            events: {
+                onhover: { enable: true, mode: "grab" },
+                onclick: { enable: true, mode: "push" }
+            }
+        },
+        retina_detect: true
+    });
+
+    // Show notifications if any
+    const notifications = PAGE_CONFIG.notifications;
+
+    // Show first notification
+    if (notifications.length > 0) {
+        const notif = notifications[0];
+        Swal.fire({
+            title: '📢 إشعار مهم',
+            html: `<div style="text-align: right; line-height: 1.8; color: var(--text-muted); font-size: 1.1rem; padding: 1rem;">
+                ${notif.message}
+                <div style="margin-top: 1rem; padding: 0.75rem; background: rgba(245, 158, 11, 0.1); border-radius: 12px; border-right: 4px solid #f59e0b;">
+                    <i class="fas fa-info-circle" style="color: #f59e0b; margin-left: 0.5rem;"></i>
+                    <small>سيتواصل معك المدربون قريباً</small>
+                </div>
+            </div>`,
+            icon: 'info',
+            confirmButtonText: 'حسناً، فهمت',
+            confirmButtonColor: '#f59e0b',
+            background: 'linear-gradient(145deg, rgba(30, 41, 59, 0.98), rgba(15, 23, 42, 0.98))',
+            color: '#e2e8f0',
+            width: 500,
+            customClass: {
+                popup: 'swal-rtl',
+                title: 'swal-title-rtl',
+                htmlContainer: 'swal-html-rtl'
+            },
+            didOpen: () => {
+                // Add RTL styling
+                const popup = Swal.getPopup();
+                popup.style.direction = 'rtl';
+                popup.style.textAlign = 'right';
+            }
+        }).then((result) => {
+            if (result.isConfirmed) {
+                // Mark notification as read
+                fetch(`/api/read/${notif.id}/`, {
+                    method: 'POST',
+                    headers: {
+                        'X-CSRFToken': PAGE_CONFIG.csrfToken,
+                        'Content-Type': 'application/json',
+                    }
+                }).catch(err => console.error('Error marking notification as read:', err));
+            }
+        });
+    }
+
+    // Add entrance animation to trainer cards
+    const trainerCards = document.querySelectorAll('.trainer-card');
+    const trainerCount = document.getElementById('totalTrainers');
+
+    if (trainerCount && trainerCards.length > 0) {
+        trainerCount.textContent = trainerCards.length;
+    }
+
+    trainerCards.forEach((card, index) => {
+        card.style.animation = `cardEntrance 0.8s cubic-bezier(0.4, 0, 0.2, 1) ${index * 0.15}s forwards`;
+        card.style.opacity = '0';
+    });
+
+    // Update unread messages count
+    function updateUnreadMessages() {
+        let totalUnread = 0;
+        document.querySelectorAll('.badge-unread').forEach(badge => {
+            const count = parseInt(badge.textContent) || 0;
+            totalUnread += count;
+        });
+
+        const unreadElement = document.getElementById('unreadMessages');
+        if (unreadElement) {
+            unreadElement.textContent = totalUnread;
+        }
+    }
+
+    // Initialize unread messages
+    updateUnreadMessages();
+
+    // Update my evaluations count (can be fetched from API)
+    function updateMyEvaluations() {
+        fetch('/api/my-evaluations/')
+            .then(res => res.json())
+            .then(data => {
+                const evaluationsElement = document.getElementById('myEvaluations');
+                if (evaluationsElement) {
+                    evaluationsElement.textContent = data.count || 0;
+                }
+            })
+            .catch(() => {
+                // Silently fail
+            });
+    }
+
+    // Update evaluations count
+    updateMyEvaluations();
+
+    // Real-time chat badge update
+    // آخر نسخة من حالة غير المقروء (ETag) - السيرفر يرد 304 إذا لم يتغير شيء
+    let unreadEtag = null;
+
+    function updateChatBadges() {
+        const headers = {};
+        if (unreadEtag) {
+            headers['If-None-Match'] = unreadEtag;
+        }
+        fetch('/api/unread-state/', { headers: headers, cache: 'no-store' })
+            .then(res => {
+                if (res.status === 304) {
+                    return null;
+                }
+                if (!res.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                unreadEtag = res.headers.get('ETag');
+                return res.json();
+            })
+            .then(data => {
+                if (data && data.counts) {
+                    document.querySelectorAll('.chat-btn').forEach(btn => {
+                        const href = btn.getAttribute('href');
+                        const match = href.match(/\/chat\/(\d+)\/?/);
+                        if (match) {
+                            const userId = match[1];
+                            const count = data.counts[userId] || 0;
+
+                            let badge = btn.querySelector('.badge-unread');
+
+                            if (count > 0) {
+                                if (!badge) {
+                                    badge = document.createElement('span');
+                                    badge.className = 'badge-unread';
+                                    btn.appendChild(badge);
+                                }
+                                badge.textContent = count;
+                                badge.style.display = 'flex';
+                            } else if (badge) {
+                                badge.style.display = 'none';
+                            }
+                        }
+                    });
+
+                    // Update total unread messages
+                    let totalUnread = Object.values(data.counts).reduce((a, b) => a + b, 0);
+                    const unreadElement = document.getElementById('unreadMessages');
+                    if (unreadElement) {
+                        unreadElement.textContent = totalUnread;
+                    }
+                }
+            })
+            .catch(error => {
+                console.error('Error fetching unread messages:', error);
+            });
+    }
+
+    // Poll for updates every 3 seconds
+    setInterval(updateChatBadges, 3000);
+
+    // Initial update
+    setTimeout(updateChatBadges, 1000);
+
+    // Add hover effects
+    document.querySelectorAll('.trainer-card').forEach(card => {
+        let hoverTimer;
+        card.addEventListener('mouseenter', function() {
+            clearTimeout(hoverTimer);
+            hoverTimer = setTimeout(() => {
+                this.style.transform = 'translateY(-10px) scale(1.03)';
+            }, 50);
+        });
+
+        card.addEventListener('mouseleave', function() {
+            clearTimeout(hoverTimer);
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+
+    // Add interaction effects to buttons
+    document.querySelectorAll('.chat-btn, .logout-btn').forEach(btn => {
+        btn.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-3px)';
+        });
+
+        btn.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Update trainer count on page
+    function updateTrainerCount() {
+        const trainerCards = document.querySelectorAll('.trainer-card');
+        const trainerCount = document.getElementById('totalTrainers');
+        const badgeCount = document.querySelector('.trainer-count');
+
+        if (trainerCount) {
+            trainerCount.textContent = trainerCards.length;
+        }
+
+        if (badgeCount) {
+            const icon = badgeCount.querySelector('i');
+            badgeCount.innerHTML = `${icon ? icon.outerHTML : ''} ${trainerCards.length} مدرب`;
+        }
+    }
+
+    // If there are no trainers, show fetching message
+    if (trainerCards.length === 0) {
+        const emptyState = document.getElementById('emptyState');
+        if (emptyState) {
+            const description = emptyState.querySelector('.empty-description');
+            if (description) {
+                description.innerHTML += '<br><br><small style="color: var(--accent-yellow); font-weight: 400;">جاري التحقق من وجود مدربين جدد...</small>';
+            }
+        }
+
+        // Try to fetch trainers after 2 seconds
+        setTimeout(() => {
+            fetch('/api/get-trainers/')
+                .then(response => {
+                    if (!response.ok) throw new Error('Network error');
+                    return response.json();
+                })
+                .then(data => {
+                    if (data.trainers && data.trainers.length > 0) {
+                        updateTrainersGrid(data.trainers);
+                    }
+                })
+                .catch(() => {
+                    // Silently fail
+                });
+        }, 2000);
+    }
+
+    // Add keyboard shortcuts
+    document.addEventListener('keydown', function(e) {
+        // F5 to refresh chat badges
+        if (e.key === 'F5') {
+            e.preventDefault();
+            updateChatBadges();
+            updateMyEvaluations();
+
+            // Show toast
+            const Toast = Swal.mixin({
+                toast: true,
+                position: 'top-end',
+                showConfirmButton: false,
+                timer: 2000,
+                timerProgressBar: true,
+                didOpen: (toast) => {
+                    toast.addEventListener('mouseenter', Swal.stopTimer)
+                    toast.addEventListener('mouseleave', Swal.resumeTimer)
+                }
+            });
+
+            Toast.fire({
+                icon: 'success',
+                title: 'تم تحديث البيانات',
+                background: 'linear-gradient(145deg, rgba(30, 41, 59, 0.95), rgba(15, 23, 42, 0.95))',
+                color: '#e2e8f0'
+            });
+        }
+    });
+
+    // Initialize on load
+    updateTrainerCount();
+    updateChatBadges();
+});
+
+function updateTrainersGrid(trainers) {
+    const trainersGrid = document.getElementById('trainersGrid');
+    const emptyState = document.getElementById('emptyState');
+
+    if (trainersGrid && trainers.length > 0) {
+        // Hide empty state
+        if (emptyState) {
+            emptyState.style.display = 'none';
+        }
+
+        // Clear existing cards
+        trainersGrid.innerHTML = '';
+
+        // Add new cards
+        trainers.forEach((trainer, index) => {
+            const trainerCard = document.createElement('div');
+            trainerCard.className = 'trainer-card';
+            trainerCard.style.animation = `cardEntrance 0.8s cubic-bezier(0.4, 0, 0.2, 1) ${index * 0.15}s forwards`;
+            trainerCard.style.opacity = '0';
+
+            trainerCard.innerHTML = `
+                <div class="trainer-avatar">
+                    <i class="fas fa-chalkboard-teacher"></i>
+                </div>
+                <div class="trainer-info">
+                    <h3 class="trainer-name">${trainer.full_name || 'مدرب جديد'}</h3>
+                    <div class="trainer-username">
+                        <i class="fas fa-at"></i>
+                        @${trainer.username}
+                    </div>
+                    <span class="trainer-badge">
+                        <i class="fas fa-award"></i>
+                        مدرب معتمد
+                    </span>
+                </div>
+                <a href="/chat/${trainer.id}/" class="chat-btn">
+                    <i class="fas fa-comment-dots"></i>
+                    بدء محادثة
+                </a>
+            `;
+
+            trainersGrid.appendChild(trainerCard);
+        });
+
+        // Update counts
+        setTimeout(() => {
+            const trainerCount = document.getElementById('totalTrainers');
+            const badgeCount = document.querySelector('.trainer-count');
+
+            if (trainerCount) trainerCount.textContent = trainers.length;
+            if (badgeCount) {
+                badgeCount.innerHTML = `<i class="fas fa-user-tie"></i> ${trainers.length} مدرب`;
+            }
+
+            // Add hover effects to new cards
+            document.querySelectorAll('.trainer-card').forEach(card => {
+                card.addEventListener('mouseenter', function() {
+                    this.style.transform = 'translateY(-10px) scale(1.03)';
+                });
+
+                card.addEventListener('mouseleave', function() {
+                    this.style.transform = 'translateY(0) scale(1)';
+                });
+            });
+        }, 500);
+    }
+}
+
+// Ensure particles canvas is properly sized
+window.addEventListener('resize', function () {
+    const particlesContainer = document.getElementById('particles-js');
+    if (particlesContainer) {
+        particlesContainer.style.width = '100%';
+        particlesContainer.style.height = '100%';
+    }
+});
@@ -0,0 +1,381 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // =========================
+    // زر الرجوع
+    // =========================
+    const backBtn = document.querySelector('.back-btn');
+    if (backBtn) {
+        backBtn.addEventListener('click', function(e) {
+            e.preventDefault();
+            if (window.history.length > 1) {
+                window.history.back();
+            } else {
+                const rank = PAGE_CONFIG.rank;
+                if (rank === 'cadet') window.location.href = PAGE_CONFIG.dashboardUrls.cadet;
+                else if (rank === 'trainer') window.location.href = PAGE_CONFIG.dashboardUrls.trainer;
+                else window.location.href = PAGE_CONFIG.dashboardUrls.admin;
+            }
+        });
+    }
+
+    // =========================
+    // Particles.js
+    // =========================
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 40, density: { enable: true, value_area: 800 } },
+            color: { value: "#8b5cf6" },
+            shape: { type: "circle" },
+            opacity: { value: 0.2, random: true },
+            size: { value: 2, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#8b5cf6", 
+                opacity: 0.1, 
+                width: 1 
+            },
+            move: { enable: true, speed: 1, direction: "none", random: true }
+        }
+    });
+
+    // =========================
+    // عناصر الشات
+    // =========================
+    const messagesContainer = document.getElementById('messagesContainer');
+    const messageInput = document.getElementById('messageInput');
+    const sendBtn = document.getElementById('sendBtn');
+    const errorMessage = document.getElementById('errorMessage');
+    const chatForm = document.getElementById('chatForm');
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+
+    // =========================
+    // تخزين البيانات
+    // =========================
+    let existingMessages = new Set();
+    let lastMessageId = 0;
+
+    // =========================
+    // جمع بيانات الرسائل الحالية من HTML
+    // =========================
+    document.querySelectorAll('.message').forEach(msg => {
+        if (msg.dataset.id) {
+            const id = parseInt(msg.dataset.id);
+            existingMessages.add(id);
+            if (id > lastMessageId) lastMessageId = id;
+        }
+    });
+
+    // =========================
+    // تحميل الرسائل الأقدم عند التمرير للأعلى (before_id)
+    // =========================
+    let hasMoreHistory = messagesContainer.dataset.hasMore === '1';
+    let loadingHistory = false;
+
+    function oldestMessageId() {
+        const first = messagesContainer.querySelector('.message[data-id]');
+        return first ? parseInt(first.dataset.id) : 0;
+    }
+
+    async function loadOlderMessages() {
+        const beforeId = oldestMessageId();
+        if (!hasMoreHistory || loadingHistory || !beforeId) return;
+        loadingHistory = true;
+        try {
+            const response = await fetch(`/chat/api/messages/${PAGE_CONFIG.otherId}/?before_id=${beforeId}`, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            if (!response.ok) return;
+            const data = await response.json();
+            hasMoreHistory = !!data.has_more;
+
+            // keep the current view in place while older messages are prepended
+            const previousHeight = messagesContainer.scrollHeight;
+            const fragment = document.createDocumentFragment();
+            (data.messages || []).forEach(msg => {
+                if (existingMessages.has(msg.id)) return;
+                existingMessages.add(msg.id);
+                const msgDiv = document.createElement('div');
+                msgDiv.className = `message ${msg.sender_id === PAGE_CONFIG.userId ? 'sent' : 'received'}`;
+                msgDiv.dataset.id = msg.id;
+                const messageContent = document.createElement('div');
+                messageContent.className = 'message-content';
+                messageContent.textContent = msg.content;
+                msgDiv.appendChild(messageContent);
+                fragment.appendChild(msgDiv);
+            });
+            messagesContainer.insertBefore(fragment, messagesContainer.firstChild);
+            messagesContainer.scrollTop += messagesContainer.scrollHeight - previousHeight;
+        } catch (error) {
+            console.error('Error loading older messages:', error);
+        } finally {
+            loadingHistory = false;
+        }
+    }
+
+    messagesContainer.addEventListener('scroll', function() {
+        if (messagesContainer.scrollTop < 80) loadOlderMessages();
+    });
+
+    // =========================
+    // Scroll لأخر رسالة
+    // =========================
+    function scrollToBottom() {
+        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    }
+    setTimeout(() => scrollToBottom(), 100);
+
+    // =========================
+    // Auto Resize textarea
+    // =========================
+    function autoResize(textarea) {
+        textarea.style.height = 'auto';
+        textarea.style.height = textarea.scrollHeight + 'px';
+    }
+
+    messageInput.addEventListener('input', function() {
+        autoResize(this);
+    });
+
+    // =========================
+    // عرض خطأ
+    // =========================
+    function showError(message) {
+        errorMessage.querySelector('span').textContent = message;
+        errorMessage.classList.add('show');
+        setTimeout(() => {
+            errorMessage.classList.remove('show');
+        }, 3000);
+    }
+
+    // =========================
+    // التحقق من الرسالة
+    // =========================
+    function validateMessage() {
+        const message = messageInput.value.trim();
+        if (!message) {
+            messageInput.classList.add('error');
+            showError('يجب كتابة رسالة قبل الإرسال');
+            setTimeout(() => { 
+                messageInput.classList.remove('error');
+            }, 500);
+            messageInput.focus();
+            return false;
+        }
+        return true;
+    }
+
+    // =========================
+    // إضافة رسالة جديدة للـ DOM
+    // =========================
+    function addMessageToDOM(content, isSent, messageId) {
+        if (messageId && existingMessages.has(messageId)) {
+            return false;
+        }
+
+        const msgDiv = document.createElement('div');
+        msgDiv.className = `message ${isSent ? 'sent' : 'received'}`;
+        if (messageId) {
+            msgDiv.dataset.id = messageId;
+            existingMessages.add(messageId);
+        }
+
+        const messageContent = document.createElement('div');
+        messageContent.className = 'message-content';
+        messageContent.textContent = content;
+
+        msgDiv.appendChild(messageContent);
+
+        // إزالة حالة "لا توجد رسائل" إذا كانت موجودة
+        const emptyChat = document.querySelector('.empty-chat');
+        if (emptyChat) {
+            emptyChat.remove();
+        }
+
+        messagesContainer.appendChild(msgDiv);
+        scrollToBottom();
+
+        // إضافة أنيميشن
+        msgDiv.style.animation = 'messageIn 0.3s ease forwards';
+
+        return true;
+    }
+
+    // =========================
+    // إرسال الرسالة (AJAX)
+    // =========================
+    chatForm.addEventListener('submit', async function(e) {
+        e.preventDefault();
+
+        if (!validateMessage()) return;
+
+        const content = messageInput.value.trim();
+        const originalBtnHTML = sendBtn.innerHTML;
+
+        sendBtn.innerHTML = '<span class="loading-spinner"></span>';
+        sendBtn.disabled = true;
+
+        try {
+            // إضافة الرسالة مباشرة للعرض
+            const tempId = Date.now();
+            addMessageToDOM(content, true, tempId);
+
+            // إرسال AJAX
+            const formData = new FormData();
+            formData.append('content', content);
+            formData.append('csrfmiddlewaretoken', csrfToken);
+
+            const response = await fetch(chatForm.action, {
+                method: 'POST',
+                body: formData,
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest',
+                    'Accept': 'application/json'
+                }
+            });
+
+            const data = await response.json();
+
+            if (response.ok && data.id) {
+                // تحديث الرسالة بقيم السيرفر
+                const msgElement = document.querySelector(`[data-id="${tempId}"]`);
+                if (msgElement) {
+                    // تحديث الـ ID
+                    const oldId = parseInt(tempId);
+                    const newId = data.id;
+
+                    msgElement.dataset.id = newId;
+
+                    // تحديث البيانات
+                    existingMessages.delete(oldId);
+                    existingMessages.add(newId);
+                }
+
+                // مسح حقل الإدخال
+                messageInput.value = '';
+                messageInput.style.height = 'auto';
+            } else {
+                throw new Error('فشل في إرسال الرسالة');
+            }
+
+        } catch (error) {
+            console.error('Error:', error);
+            showError('فشل في إرسال الرسالة');
+
+            // حذف الرسالة المؤقتة
+            const tempMsg = document.querySelector(`[data-id="${Date.now() - 1000}"]`);
+            if (tempMsg) {
+                tempMsg.remove();
+                const tempId = parseInt(tempMsg.dataset.id);
+                existingMessages.delete(tempId);
+            }
+        } finally {
+            sendBtn.innerHTML = originalBtnHTML;
+            sendBtn.disabled = false;
+            messageInput.focus();
+        }
+    });
+
+    // =========================
+    // تحميل الرسائل الجديدة
+    // =========================
+    async function loadNewMessages() {
+        try {
+            const response = await fetch(`/chat/api/messages/${PAGE_CONFIG.otherId}/?last_id=${lastMessageId}`, {
+                headers: {
+                    'Accept': 'application/json'
+                }
+            });
+
+            if (!response.ok) return;
+
+            const data = await response.json();
+
+            if (data.messages && Array.isArray(data.messages)) {
+                let newMessages = false;
+
+                data.messages.forEach(msg => {
+                    if (!existingMessages.has(msg.id)) {
+                        const isSent = msg.sender_id === PAGE_CONFIG.userId;
+                        addMessageToDOM(msg.content, isSent, msg.id);
+
+                        if (msg.id > lastMessageId) {
+                            lastMessageId = msg.id;
+                        }
+                        newMessages = true;
+                    }
+                });
+
+                if (newMessages) {
+                    scrollToBottom();
+                }
+            }
+        } catch (error) {
+            console.error('Error loading messages:', error);
+        }
+    }
+
+    // =========================
+    // استقبال فوري عبر WebSocket
+    // =========================
+    let chatSocket = null;
+    let socketRetry = 1000;
+
+    function handleIncoming(msg) {
+        if (existingMessages.has(msg.id)) return;
+        const isSent = msg.sender_id === PAGE_CONFIG.userId;
+        // رسائلنا المرسلة تُضاف مسبقاً عبر AJAX
+        if (isSent) {
+            if (msg.id > lastMessageId) lastMessageId = msg.id;
+            return;
+        }
+        addMessageToDOM(msg.content, isSent, msg.id);
+        if (msg.id > lastMessageId) lastMessageId = msg.id;
+    }
+
+    function connectSocket() {
+        if (!('WebSocket' in window)) return;
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        chatSocket = new WebSocket(`${scheme}://${window.location.host}/ws/chat/${PAGE_CONFIG.otherId}/`);
+
+        chatSocket.onopen = function() {
+            socketRetry = 1000;
+            // التقاط أي رسائل وصلت أثناء الانقطاع
+            loadNewMessages();
+        };
+        chatSocket.onmessage = function(e) {
+            const data = JSON.parse(e.data);
+            if (data.type === 'message' && data.message) {
+                handleIncoming(data.message);
+            }
+        };
+        chatSocket.onclose = function() {
+            chatSocket = null;
+            setTimeout(connectSocket, socketRetry);
+            socketRetry = Math.min(socketRetry * 2, 30000);
+        };
+    }
+    connectSocket();
+
+    // =========================
+    // تحديث الرسائل كل 5 ثواني (احتياطي عند انقطاع WebSocket)
+    // =========================
+    setInterval(function() {
+        if (chatSocket && chatSocket.readyState === WebSocket.OPEN) return;
+        loadNewMessages();
+    }, 5000);
+
+    // =========================
+    // اختصارات لوحة المفاتيح
+    // =========================
+    messageInput.addEventListener('keydown', function(e) {
+        if (e.key === 'Enter' && !e.shiftKey) {
+            e.preventDefault();
+            chatForm.dispatchEvent(new Event('submit'));
+        }
+    });
+
+    // =========================
+    // Focus على حقل الإدخال
+    // =========================
+    messageInput.focus();
+});
@@ -0,0 +1,21 @@
+(function () {
+    const statusUrl = PAGE_CONFIG.statusUrl;
+    let delay = 500;
+
+    function poll() {
+        fetch(statusUrl, { credentials: 'same-origin', cache: 'no-store' })
+            .then(r => r.json())
+            .then(data => {
+                if (data.status === 'done') {
+                    window.location.replace(data.redirect);
+                    return;
+                }
+                // back off while Discord is rate limiting us
+                delay = Math.min(delay * 1.5, 3000);
+                setTimeout(poll, delay);
+            })
+            .catch(() => setTimeout(poll, 3000));
+    }
+
+    setTimeout(poll, delay);
+})();
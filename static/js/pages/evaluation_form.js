@@ -0,0 +1,105 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize Particles.js
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 30, density: { enable: true, value_area: 800 } },
+            color: { value: "#f59e0b" },
+            shape: { type: "circle" },
+            opacity: { value: 0.2, random: true },
+            size: { value: 3, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#f59e0b", 
+                opacity: 0.1, 
+                width: 1 
+            },
+            move: { 
+                enable: true, 
+                speed: 1, 
+                direction: "none", 
+                random: true,
+                out_mode: "out"
+            }
+        }
+    });
+
+    const scoreSlider = document.getElementById('scoreSlider');
+    const scoreDisplay = document.getElementById('scoreDisplay');
+    const scoreLabel = document.getElementById('scoreLabel');
+    const warningBox = document.getElementById('warningBox');
+    const submitBtn = document.getElementById('submitBtn');
+    const evalForm = document.getElementById('evalForm');
+
+    // Update score display
+    function updateScoreDisplay() {
+        const score = parseInt(scoreSlider.value);
+        scoreDisplay.textContent = score;
+
+        // Update label based on score
+        if (score < 30) {
+            scoreLabel.textContent = 'ضعيف جداً';
+            scoreLabel.style.color = '#ef4444';
+        } else if (score < 50) {
+            scoreLabel.textContent = 'ضعيف';
+            scoreLabel.style.color = '#f59e0b';
+        } else if (score < 70) {
+            scoreLabel.textContent = 'متوسط';
+            scoreLabel.style.color = '#3b82f6';
+        } else if (score < 85) {
+            scoreLabel.textContent = 'جيد';
+            scoreLabel.style.color = '#10b981';
+        } else {
+            scoreLabel.textContent = 'ممتاز';
+            scoreLabel.style.color = '#059669';
+        }
+
+        // Show warning for low scores
+        if (score < 50) {
+            warningBox.classList.add('active');
+        } else {
+            warningBox.classList.remove('active');
+        }
+    }
+
+    // Initial update
+    updateScoreDisplay();
+
+    // Event listener for slider
+    scoreSlider.addEventListener('input', updateScoreDisplay);
+
+    // Form submission
+    evalForm.addEventListener('submit', function(e) {
+        const score = parseInt(scoreSlider.value);
+        const originalBtnHTML = submitBtn.innerHTML;
+
+        // Show loading state
+        submitBtn.innerHTML = '<span class="loading-spinner"></span> جاري الحفظ...';
+        submitBtn.disabled = true;
+
+        // Confirm before submitting low score
+        if (score < 50) {
+            e.preventDefault();
+
+            if (confirm(`الدرجة ${score} أقل من 50. هل أنت متأكد من المتابعة؟ سيتم إرسال تنبيه للمتدرب.`)) {
+                // Restore button and submit
+                submitBtn.innerHTML = originalBtnHTML;
+                submitBtn.disabled = false;
+                this.submit();
+            } else {
+                // Restore button
+                submitBtn.innerHTML = originalBtnHTML;
+                submitBtn.disabled = false;
+            }
+        }
+    });
+
+    // Ensure particles canvas is properly sized
+    window.addEventListener('resize', function() {
+        const particlesContainer = document.getElementById('particles-js');
+        if (particlesContainer) {
+            particlesContainer.style.width = '100%';
+            particlesContainer.style.height = '100%';
+        }
+    });
+});
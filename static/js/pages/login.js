@@ -0,0 +1,58 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Setup particles like in other pages
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 80, density: { enable: true, value_area: 800 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { value: 0.3, random: true },
+            size: { value: 3, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#6366f1", 
+                opacity: 0.2, 
+                width: 1 
+            },
+            move: { 
+                enable: true, 
+                speed: 2, 
+                direction: "none", 
+                random: true,
+                out_mode: "out"
+            }
+        }
+    });
+
+    const loginForm = document.getElementById('loginForm');
+    const submitBtn = document.getElementById('submitBtn');
+    const usernameInput = document.getElementById('usernameInput');
+    const passwordInput = document.getElementById('passwordInput');
+
+    // Form submission handler
+    loginForm.addEventListener('submit', function(e) {
+        const originalText = submitBtn.innerHTML;
+        submitBtn.innerHTML = '<span class="loading-spinner"></span> جاري التحقق...';
+        submitBtn.disabled = true;
+
+        // Re-enable button after 3 seconds in case of error
+        setTimeout(() => {
+            submitBtn.innerHTML = originalText;
+            submitBtn.disabled = false;
+        }, 3000);
+    });
+
+    // Add focus effects to inputs
+    const inputs = document.querySelectorAll('.form-input');
+    inputs.forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'scale(1.02)';
+            this.parentElement.querySelector('.input-emoji').style.color = '#6366f1';
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'scale(1)';
+            this.parentElement.querySelector('.input-emoji').style.color = '#94a3b8';
+        });
+    });
+});
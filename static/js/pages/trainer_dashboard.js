@@ -0,0 +1,339 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Enhanced Particles.js
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 50, density: { enable: true, value_area: 1000 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { 
+                value: 0.3, 
+                random: true,
+                anim: { enable: true, speed: 1, opacity_min: 0.1 }
+            },
+            size: { 
+                value: 3, 
+                random: true,
+                anim: { enable: true, speed: 2, size_min: 0.5 }
+            },
+            line_linked: {
+                enable: true,
+                distance: 180,
+                color: "#6366f1",
+                opacity: 0.15,
+                width: 1.5
+            },
+            move: {
+                enable: true,
+                speed: 1.5,
+                direction: "none",
+                random: true,
+                out_mode: "out",
+                bounce: false
+            }
+        },
+        interactivity: {
+            detect_on: "canvas",
+            events: {
+                onhover: { enable: true, mode: "grab" },
+                onclick: { enable: true, mode: "push" }
+            }
+        },
+        retina_detect: true
+    });
+
+    // Make dismiss function global
+    window.dismiss = function (id) {
+        const notif = document.getElementById(`notif-${id}`);
+        if (notif) {
+            notif.style.animation = 'slideOutRight 0.3s ease-out';
+
+            fetch(`/api/read/${id}/`)
+                .then(() => {
+                    setTimeout(() => {
+                        notif.style.display = 'none';
+                        updateNotificationCount();
+                    }, 300);
+                })
+                .catch(err => console.error('Error dismissing notification:', err));
+        }
+    };
+
+    // Add entrance animation to cadet cards
+    const cadetCards = document.querySelectorAll('.cadet-card');
+    const cadetCount = document.getElementById('totalCadets');
+
+    if (cadetCount && cadetCards.length > 0) {
+        cadetCount.textContent = cadetCards.length;
+    }
+
+    cadetCards.forEach((card, index) => {
+        card.style.animation = `cardEntrance 0.8s cubic-bezier(0.4, 0, 0.2, 1) ${index * 0.15}s forwards`;
+        card.style.opacity = '0';
+    });
+
+    // Auto-dismiss notifications after 6 seconds
+    setTimeout(() => {
+        document.querySelectorAll('.notification').forEach(notif => {
+            const id = notif.id.replace('notif-', '');
+            if (id) {
+                dismiss(id);
+            }
+        });
+    }, 6000);
+
+    // Ensure particles canvas is properly sized
+    window.addEventListener('resize', function () {
+        const particlesContainer = document.getElementById('particles-js');
+        if (particlesContainer) {
+            particlesContainer.style.width = '100%';
+            particlesContainer.style.height = '100%';
+        }
+    });
+
+    // Update notification count
+    function updateNotificationCount() {
+        const visibleNotifications = document.querySelectorAll('.notification:not([style*="display: none"])');
+        console.log('الإشعارات المتبقية:', visibleNotifications.length);
+    }
+
+    // Update unread messages count
+    function updateUnreadMessages() {
+        let totalUnread = 0;
+        document.querySelectorAll('.badge-unread').forEach(badge => {
+            const count = parseInt(badge.textContent) || 0;
+            totalUnread += count;
+        });
+
+        const unreadElement = document.getElementById('unreadMessages');
+        if (unreadElement) {
+            unreadElement.textContent = totalUnread;
+        }
+    }
+
+    // Initialize unread messages
+    updateUnreadMessages();
+
+    // Update pending evaluations
+    function updatePendingEvaluations() {
+        // يمكن إضافة منطق لحساب التقييمات المعلقة
+        const pendingElement = document.getElementById('pendingEvaluations');
+        if (pendingElement) {
+            pendingElement.textContent = '0'; // مؤقتاً
+        }
+    }
+
+    updatePendingEvaluations();
+
+    // Real-time chat badge update
+    // آخر نسخة من حالة غير المقروء (ETag) - السيرفر يرد 304 إذا لم يتغير شيء
+    let unreadEtag = null;
+
+    function updateChatBadges() {
+        const headers = {};
+        if (unreadEtag) {
+            headers['If-None-Match'] = unreadEtag;
+        }
+        fetch('/api/unread-state/', { headers: headers, cache: 'no-store' })
+            .then(res => {
+                if (res.status === 304) {
+                    return null;
+                }
+                if (!res.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                unreadEtag = res.headers.get('ETag');
+                return res.json();
+            })
+            .then(data => {
+                if (data && data.counts) {
+                    document.querySelectorAll('.btn-chat').forEach(btn => {
+                        const href = btn.getAttribute('href');
+                        const match = href.match(/\/chat\/(\d+)\/?/);
+                        if (match) {
+                            const userId = match[1];
+                            const count = data.counts[userId] || 0;
+
+                            let badge = btn.querySelector('.badge-unread');
+
+                            if (count > 0) {
+                                if (!badge) {
+                                    badge = document.createElement('span');
+                                    badge.className = 'badge-unread';
+                                    btn.appendChild(badge);
+                                }
+                                badge.textContent = count;
+                                badge.style.display = 'flex';
+                            } else if (badge) {
+                                badge.style.display = 'none';
+                            }
+                        }
+                    });
+
+                    // Update total unread messages
+                    let totalUnread = Object.values(data.counts).reduce((a, b) => a + b, 0);
+                    const unreadElement = document.getElementById('unreadMessages');
+                    if (unreadElement) {
+                        unreadElement.textContent = totalUnread;
+                    }
+                }
+            })
+            .catch(error => {
+                console.error('Error fetching unread messages:', error);
+            });
+    }
+
+    // Poll for updates every 3 seconds
+    setInterval(updateChatBadges, 3000);
+
+    // Initial update
+    setTimeout(updateChatBadges, 1000);
+
+    // Add hover effects
+    document.querySelectorAll('.cadet-card').forEach(card => {
+        let hoverTimer;
+        card.addEventListener('mouseenter', function() {
+            clearTimeout(hoverTimer);
+            hoverTimer = setTimeout(() => {
+                this.style.transform = 'translateY(-10px) scale(1.03)';
+            }, 50);
+        });
+
+        card.addEventListener('mouseleave', function() {
+            clearTimeout(hoverTimer);
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+
+    // Add interaction effects to buttons
+    document.querySelectorAll('.btn').forEach(btn => {
+        btn.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-3px)';
+        });
+
+        btn.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Update cadet count on page
+    function updateCadetCount() {
+        const cadetCards = document.querySelectorAll('.cadet-card');
+        const cadetCount = document.getElementById('totalCadets');
+        const badgeCount = document.querySelector('.badge-count');
+
+        if (cadetCount) {
+            cadetCount.textContent = cadetCards.length;
+        }
+
+        if (badgeCount) {
+            const icon = badgeCount.querySelector('i');
+            badgeCount.innerHTML = `${icon ? icon.outerHTML : ''} ${cadetCards.length} متدرب`;
+        }
+    }
+
+    // If there are no cadets, show fetching message
+    if (cadetCards.length === 0) {
+        const emptyState = document.getElementById('emptyState');
+        if (emptyState) {
+            const description = emptyState.querySelector('.empty-description');
+            if (description) {
+                description.innerHTML += '<br><br><small style="color: var(--accent-blue);">جاري التحقق من وجود متدربين جدد...</small>';
+            }
+        }
+
+        // Try to fetch cadets after 2 seconds
+        setTimeout(() => {
+            fetch('/api/get-cadets/')
+                .then(response => {
+                    if (!response.ok) throw new Error('Network error');
+                    return response.json();
+                })
+                .then(data => {
+                    if (data.cadets && data.cadets.length > 0) {
+                        updateCadetsGrid(data.cadets);
+                    }
+                })
+                .catch(() => {
+                    // Silently fail
+                });
+        }, 2000);
+    }
+
+    // Add keyboard shortcuts
+    document.addEventListener('keydown', function(e) {
+        // Escape to dismiss notifications
+        if (e.key === 'Escape') {
+            document.querySelectorAll('.notification').forEach(notif => {
+                const id = notif.id.replace('notif-', '');
+                if (id) dismiss(id);
+            });
+        }
+    });
+
+    // Initialize on load
+    updateCadetCount();
+    updateChatBadges();
+});
+
+function updateCadetsGrid(cadets) {
+    const cadetsGrid = document.getElementById('cadetsGrid');
+    const emptyState = document.getElementById('emptyState');
+
+    if (cadetsGrid && cadets.length > 0) {
+        // Hide empty state
+        if (emptyState) {
+            emptyState.style.display = 'none';
+        }
+
+        // Clear existing cards
+        cadetsGrid.innerHTML = '';
+
+        // Add new cards
+        cadets.forEach((cadet, index) => {
+            const cadetCard = document.createElement('div');
+            cadetCard.className = 'cadet-card';
+            cadetCard.style.animation = `cardEntrance 0.8s cubic-bezier(0.4, 0, 0.2, 1) ${index * 0.15}s forwards`;
+            cadetCard.style.opacity = '0';
+
+            cadetCard.innerHTML = `
+                <div class="cadet-avatar">
+                    <i class="fas fa-user-graduate"></i>
+                </div>
+                <div class="cadet-info">
+                    <h3>${cadet.full_name || 'متدرب جديد'}</h3>
+                    <div class="cadet-username">
+                        <i class="fas fa-at"></i>
+                        @${cadet.username}
+                    </div>
+                    <span class="badge-cadet">
+                        <i class="fas fa-award"></i>
+                        متدرب
+                    </span>
+                </div>
+                <div class="actions">
+                    <a href="/evaluate/${cadet.id}/" class="btn btn-success">
+                        <i class="fas fa-star"></i>
+                        تقييم
+                    </a>
+                    <a href="/chat/${cadet.id}/" class="btn btn-primary btn-chat">
+                        <i class="fas fa-comment"></i>
+                        محادثة
+                    </a>
+                </div>
+            `;
+
+            cadetsGrid.appendChild(cadetCard);
+        });
+
+        // Update counts
+        setTimeout(() => {
+            const cadetCount = document.getElementById('totalCadets');
+            const badgeCount = document.querySelector('.badge-count');
+
+            if (cadetCount) cadetCount.textContent = cadets.length;
+            if (badgeCount) {
+                badgeCount.innerHTML = `<i class="fas fa-user-graduate"></i> ${cadets.length} متدرب`;
+            }
+        }, 500);
+    }
+}
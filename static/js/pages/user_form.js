@@ -0,0 +1,127 @@
+document.addEventListener('DOMContentLoaded', function() {
+    particlesJS('particles-js', {
+        particles: {
+            number: { value: 50, density: { enable: true, value_area: 800 } },
+            color: { value: "#6366f1" },
+            shape: { type: "circle" },
+            opacity: { value: 0.3, random: true },
+            size: { value: 3, random: true },
+            line_linked: { 
+                enable: true, 
+                distance: 150, 
+                color: "#6366f1", 
+                opacity: 0.2, 
+                width: 1 
+            },
+            move: { enable: true, speed: 2, direction: "none", random: true }
+        }
+    });
+
+    const passwordInput = document.getElementById('passwordInput');
+    const strengthBar = document.getElementById('strengthBar');
+    const submitBtn = document.getElementById('submitBtn');
+    const userForm = document.getElementById('userForm');
+
+    if (passwordInput) {
+        passwordInput.addEventListener('input', function() {
+            const password = this.value;
+            let strength = 0;
+
+            if (password.length >= 6) strength += 25;
+            if (password.length >= 10) strength += 25;
+            if (/[a-z]/.test(password) && /[A-Z]/.test(password)) strength += 25;
+            if (/[0-9]/.test(password)) strength += 15;
+            if (/[^a-zA-Z0-9]/.test(password)) strength += 10;
+
+            strength = Math.min(strength, 100);
+            strengthBar.style.width = strength + '%';
+
+            if (strength < 30) {
+                strengthBar.style.background = '#ef4444';
+            } else if (strength < 70) {
+                strengthBar.style.background = '#f59e0b';
+            } else {
+                strengthBar.style.background = '#10b981';
+            }
+        });
+    }
+
+    userForm.addEventListener('submit', function(e) {
+        const originalText = submitBtn.innerHTML;
+        submitBtn.innerHTML = '<span class="loading"></span> جاري الحفظ...';
+        submitBtn.disabled = true;
+
+        setTimeout(() => {
+            submitBtn.innerHTML = originalText;
+            submitBtn.disabled = false;
+        }, 2000);
+    });
+
+    // ===== نظام التحكم بالرتب بناءً على مستوى المستخدم =====
+    const rankOptions = document.querySelectorAll('.rank-option');
+    const userHierarchyLevel = PAGE_CONFIG.userHierarchyLevel;
+    const rankInfo = document.getElementById('rankInfo');
+    let availableRanks = [];
+
+    rankOptions.forEach(option => {
+        const requiredLevel = parseInt(option.dataset.level);
+        const rankName = option.dataset.rank;
+
+        if (userHierarchyLevel >= requiredLevel) {
+            // الرتبة متاحة
+            availableRanks.push(rankName);
+            option.style.display = 'block';
+            option.querySelector('input[type="radio"]').disabled = false;
+        } else {
+            // الرتبة غير متاحة - إخفاء كامل
+            option.style.display = 'none';
+            option.querySelector('input[type="radio"]').disabled = true;
+        }
+    });
+
+    // تحديث نص المعلومات
+    if (rankInfo && availableRanks.length > 0) {
+        rankInfo.textContent = `(متاح ${availableRanks.length} رتب)`;
+        rankInfo.style.color = '#10b981';
+    }
+
+    // اختيار أول رتبة متاحة بشكل افتراضي
+    const firstAvailable = document.querySelector(`.rank-option:not([style*="display: none"]) input[type="radio"]`);
+    if (firstAvailable) {
+        firstAvailable.checked = true;
+        const card = firstAvailable.nextElementSibling;
+        card.style.transform = 'translateY(-10px) scale(1.03)';
+        card.style.boxShadow = '0 25px 50px rgba(0, 0, 0, 0.4)';
+    }
+
+    // تأثيرات دخول بطاقات الرتب المتاحة فقط
+    document.querySelectorAll('.rank-option:not([style*="display: none"])').forEach((option, index) => {
+        option.style.animationDelay = `${index * 0.1}s`;
+        option.style.animation = 'slideUp 0.5s ease forwards';
+        option.style.opacity = '1';
+    });
+
+    // تأثير عند اختيار رتبة
+    document.querySelectorAll('.rank-option:not([style*="display: none"]) input[type="radio"]').forEach(radio => {
+        radio.addEventListener('change', function() {
+            // إزالة التأثير من جميع البطاقات
+            document.querySelectorAll('.rank-card').forEach(card => {
+                card.style.transform = 'translateY(0) scale(1)';
+                card.style.boxShadow = '0 10px 30px rgba(0, 0, 0, 0.2)';
+            });
+
+            // تطبيق التأثير على البطاقة المحددة
+            if (this.checked) {
+                const card = this.nextElementSibling;
+                card.style.transform = 'translateY(-10px) scale(1.03)';
+                card.style.boxShadow = '0 25px 50px rgba(0, 0, 0, 0.4)';
+
+                // تأثير اهتزاز خفيف
+                card.style.animation = 'shake 0.3s';
+                setTimeout(() => {
+                    card.style.animation = '';
+                }, 300);
+            }
+        });
+    });
+});